@@ -9,7 +9,7 @@ import uvicorn
 if __name__ == "__main__":
     # Configurar para desenvolvimento
     os.environ.setdefault("DEBUG", "true")
-    os.environ.setdefault("LOG_LEVEL", "DEBUG")
+    os.environ.setdefault("LOG_LEVEL", "INFO")
     os.environ.setdefault("RELOAD", "true")
     
     # Carregar configurações do .env se existir
@@ -24,7 +24,9 @@ if __name__ == "__main__":
         "src.main:app",
         host="0.0.0.0",
         port=8000,
+        loop="uvloop",
+        http="httptools",
         reload=True,
-        log_level="debug",
-        access_log=True
+        log_level="info",
+        access_log=False
     ) 
\ No newline at end of file
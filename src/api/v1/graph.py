@@ -3,24 +3,150 @@ Graph API endpoints - Baixo nível.
 Endpoints para operações diretas no Knowledge Graph temporal do Zep.
 """
 
+import asyncio
+import hashlib
+import os
+import time
+import orjson
 import structlog
-from typing import Any, Dict, Optional
-from fastapi import APIRouter, HTTPException, Depends, Path, Query
+from typing import Annotated, Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Literal, Optional, Set, Union
+from fastapi import APIRouter, HTTPException, Depends, Path, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel, Field, ConfigDict
 
 from src.core.config import settings
-from src.core.zep_client.client import get_zep_client_sync, OptimizedZepClient
+from src.core.zep_client.client import OptimizedZepClient
 
 logger = structlog.get_logger(__name__)
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+
+# Acima deste Content-Length a serialização do payload sai do event loop
+_LARGE_PAYLOAD_BYTES = 64_000
+
+
+def _marshal_graph_data(data: Union[Dict[str, Any], List[Any], str]) -> str:
+    """Serializa dados estruturados para a string JSON aceita por graph.add."""
+    if isinstance(data, str):
+        return data
+    return orjson.dumps(data).decode()
+
+
+async def _prepare_graph_data(
+    http_request: Request, data: Union[Dict[str, Any], List[Any], str]
+) -> str:
+    """
+    Prepara o payload para o Zep sem bloquear o event loop.
+    
+    Payloads grandes são serializados no threadpool para não atrasar
+    requests pequenas concorrentes; os demais seguem inline.
+    """
+    content_length = http_request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > _LARGE_PAYLOAD_BYTES:
+        return await run_in_threadpool(_marshal_graph_data, data)
+    return _marshal_graph_data(data)
+
+
+# Queries fixas das listagens de entidades e fatos
+_ENTITIES_Q = "entities"
+_FACTS_Q = "facts"
+_WARMUP_USER_ID = "__warmup__"
+
+
+async def warmup(zep_client: OptimizedZepClient, timeout: float = 5.0) -> None:
+    """
+    Aquece conexões e o embedding das queries fixas no Zep na startup.
+    
+    Chama o SDK direto (sem retry nem cache local) para não atrasar a
+    startup; erros, como o usuário de warmup inexistente, são ignorados.
+    """
+    searches = (
+        zep_client.client.graph.search(user_id=_WARMUP_USER_ID, query=_ENTITIES_Q, limit=1),
+        zep_client.client.graph.search(user_id=_WARMUP_USER_ID, query=_FACTS_Q, limit=1),
+    )
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(*searches, return_exceptions=True),
+            timeout=timeout
+        )
+    except asyncio.TimeoutError:
+        logger.warning("graph_warmup_timeout", timeout=timeout)
+
+
+# Token do processo: ETags emitidas por outro worker ou antes de um restart
+# nunca coincidem com as atuais (a geração do graph é local ao processo)
+_ETAG_BOOT_TOKEN = os.urandom(8).hex()
+
+_GRAPH_CACHE_CONTROL = "private, max-age=30"
+
+
+def _graph_etag(zep_client: OptimizedZepClient, user_id: str, *params: Any) -> str:
+    """
+    ETag forte para leituras do graph de um usuário.
+    
+    Deriva de (usuário, geração do graph, parâmetros da query) e de uma
+    janela de tempo igual ao TTL do cache de busca, já que o Zep também
+    extrai fatos de forma assíncrona fora do add_graph_data.
+    """
+    generation = zep_client.graph_generation(user_id=user_id)
+    ttl = settings.graph_search_cache_ttl
+    window = int(time.time() // ttl) if ttl > 0 else time.time_ns()
+    raw = ":".join(map(str, (_ETAG_BOOT_TOKEN, user_id, generation, window) + params))
+    return '"' + hashlib.blake2b(raw.encode(), digest_size=16).hexdigest() + '"'
+
+
+def _etag_matches(http_request: Request, etag: str) -> bool:
+    """Verifica If-None-Match (lista de ETags ou '*')."""
+    if_none_match = http_request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = {tag.strip() for tag in if_none_match.split(",")}
+    return etag in candidates or "*" in candidates
+
+
+def _not_modified(etag: str) -> Response:
+    """Resposta 304 sem corpo, mantendo os headers de cache."""
+    return Response(
+        status_code=304,
+        headers={"ETag": etag, "Cache-Control": _GRAPH_CACHE_CONTROL}
+    )
+
+
+def _wants_stream(stream: bool) -> bool:
+    """Streaming NDJSON só quando pedido pelo cliente e habilitado no serviço."""
+    return stream and settings.enable_streaming
+
+
+def _ndjson_response(rows: Iterable[Any], total_count: int) -> StreamingResponse:
+    """
+    Resposta NDJSON: um objeto JSON por linha, serializado sob demanda.
+    
+    O cliente começa a consumir a partir da primeira linha em vez de
+    esperar o array inteiro; o total vai no header X-Total-Count.
+    """
+    async def generate() -> AsyncIterator[bytes]:
+        for row in rows:
+            # Objetos do SDK (pydantic) caem no jsonable_encoder
+            yield orjson.dumps(row, default=jsonable_encoder) + b"\n"
+    
+    return StreamingResponse(
+        generate(),
+        media_type="application/x-ndjson",
+        headers={"X-Total-Count": str(total_count)}
+    )
 
 
 # Modelos específicos para Graph API
 class GraphDataRequest(BaseModel):
     """Request para adicionar dados ao graph."""
     
-    data: Any = Field(description="Dados para adicionar ao graph")
+    # União concreta em vez de Any: pydantic-core valida direto em Rust
+    data: Union[Dict[str, Any], List[Any], str] = Field(
+        description="Dados para adicionar ao graph"
+    )
     data_type: str = Field(
         default="json",
         description="Tipo dos dados: 'json', 'text', 'message'"
@@ -65,15 +191,23 @@ class GraphSearchRequest(BaseModel):
     )
 
 
-async def get_zep_client() -> OptimizedZepClient:
-    """Dependency para obter cliente Zep."""
-    return await get_zep_client_sync()
+async def get_zep_client(request: Request) -> OptimizedZepClient:
+    """
+    Dependency para obter cliente Zep.
+    
+    Mantida como async para o FastAPI não despachar para o threadpool;
+    retorna o singleton criado no lifespan (app.state.zep).
+    """
+    return request.app.state.zep
 
 
-@router.post(
-    "/users/{user_id}/data",
-    summary="Adicionar dados ao graph do usuário",
-    description="""
+# Metadados por escopo: usuário (dados pessoais) ou grupo (dados compartilhados)
+_GraphScope = Literal["user", "group"]
+
+_ADD_ROUTE_DOCS: Dict[str, Dict[str, Any]] = {
+    "user": {
+        "summary": "Adicionar dados ao graph do usuário",
+        "description": """
     Adiciona dados estruturados ao Knowledge Graph de um usuário.
     
     **Knowledge Graph Temporal:**
@@ -93,76 +227,15 @@ async def get_zep_client() -> OptimizedZepClient:
     - Histórico de transações
     - Metadados de negócio
     """,
-    responses={
-        200: {"description": "Dados adicionados ao graph com sucesso"},
-        400: {"description": "Dados inválidos ou formato não suportado"},
-        500: {"description": "Erro interno do servidor"}
-    }
-)
-async def add_user_graph_data(
-    user_id: str = Path(
-        description="ID único do usuário",
-        min_length=1,
-        max_length=100
-    ),
-    request: GraphDataRequest = None,
-    zep_client: OptimizedZepClient = Depends(get_zep_client)
-):
-    """
-    Adiciona dados ao Knowledge Graph de um usuário.
-    
-    O Zep automaticamente:
-    - Extrai entidades e relacionamentos
-    - Organiza dados temporalmente
-    - Funde informações relacionadas
-    - Atualiza fatos existentes se necessário
-    """
-    try:
-        logger.info(
-            "graph_add_user_data_request",
-            user_id=user_id,
-            data_type=request.data_type,
-            data_size=len(str(request.data))
-        )
-        
-        # Adicionar dados ao graph
-        result = await zep_client.add_graph_data(
-            user_id=user_id,
-            data=request.data,
-            data_type=request.data_type
-        )
-        
-        logger.info(
-            "graph_add_user_data_success",
-            user_id=user_id,
-            data_type=request.data_type
-        )
-        
-        return {
-            "user_id": user_id,
-            "data_type": request.data_type,
-            "success": True,
-            "message": "Data added to user graph successfully"
+        "responses": {
+            200: {"description": "Dados adicionados ao graph com sucesso"},
+            400: {"description": "Dados inválidos ou formato não suportado"},
+            500: {"description": "Erro interno do servidor"}
         }
-        
-    except Exception as e:
-        logger.error(
-            "graph_add_user_data_failed",
-            user_id=user_id,
-            data_type=request.data_type,
-            error=str(e),
-            exc_info=True
-        )
-        raise HTTPException(
-            status_code=500,
-            detail=f"Failed to add data to user graph: {str(e)}"
-        )
-
-
-@router.post(
-    "/groups/{group_id}/data",
-    summary="Adicionar dados ao graph do grupo",
-    description="""
+    },
+    "group": {
+        "summary": "Adicionar dados ao graph do grupo",
+        "description": """
     Adiciona dados estruturados ao Knowledge Graph de um grupo/organização.
     
     **Grupos vs Usuários:**
@@ -175,67 +248,18 @@ async def add_user_graph_data(
     - Dados compartilhados de projetos
     - Knowledge base corporativo
     """,
-    responses={
-        200: {"description": "Dados adicionados ao graph do grupo"},
-        400: {"description": "Dados inválidos"},
-        500: {"description": "Erro interno"}
-    }
-)
-async def add_group_graph_data(
-    group_id: str = Path(
-        description="ID único do grupo/organização",
-        min_length=1,
-        max_length=100
-    ),
-    request: GraphDataRequest = None,
-    zep_client: OptimizedZepClient = Depends(get_zep_client)
-):
-    """Adiciona dados ao Knowledge Graph de um grupo."""
-    try:
-        logger.info(
-            "graph_add_group_data_request",
-            group_id=group_id,
-            data_type=request.data_type,
-            data_size=len(str(request.data))
-        )
-        
-        # Adicionar dados ao graph
-        result = await zep_client.add_graph_data(
-            group_id=group_id,
-            data=request.data,
-            data_type=request.data_type
-        )
-        
-        logger.info(
-            "graph_add_group_data_success",
-            group_id=group_id,
-            data_type=request.data_type
-        )
-        
-        return {
-            "group_id": group_id,
-            "data_type": request.data_type,
-            "success": True,
-            "message": "Data added to group graph successfully"
+        "responses": {
+            200: {"description": "Dados adicionados ao graph do grupo"},
+            400: {"description": "Dados inválidos"},
+            500: {"description": "Erro interno"}
         }
-        
-    except Exception as e:
-        logger.error(
-            "graph_add_group_data_failed",
-            group_id=group_id,
-            error=str(e),
-            exc_info=True
-        )
-        raise HTTPException(
-            status_code=500,
-            detail=f"Failed to add data to group graph: {str(e)}"
-        )
-
+    }
+}
 
-@router.post(
-    "/users/{user_id}/search",
-    summary="Buscar no graph do usuário",
-    description="""
+_SEARCH_ROUTE_DOCS: Dict[str, Dict[str, Any]] = {
+    "user": {
+        "summary": "Buscar no graph do usuário",
+        "description": """
     Busca híbrida no Knowledge Graph de um usuário.
     
     **Algoritmo de busca:**
@@ -254,71 +278,15 @@ async def add_group_graph_data(
     - "Histórico de problemas relatados"
     - "Dados de contato atualizados"
     """,
-    responses={
-        200: {"description": "Resultados da busca no graph"},
-        400: {"description": "Query inválida"},
-        500: {"description": "Erro na busca"}
-    }
-)
-async def search_user_graph(
-    user_id: str = Path(description="ID único do usuário"),
-    request: GraphSearchRequest = None,
-    zep_client: OptimizedZepClient = Depends(get_zep_client)
-):
-    """
-    Busca híbrida no Knowledge Graph de um usuário.
-    
-    Retorna entidades, relacionamentos e fatos relevantes
-    organizados por score de relevância.
-    """
-    try:
-        logger.info(
-            "graph_search_user_request",
-            user_id=user_id,
-            query=request.query,
-            limit=request.limit
-        )
-        
-        # Realizar busca no graph
-        result = await zep_client.search_graph(
-            user_id=user_id,
-            query=request.query,
-            limit=request.limit
-        )
-        
-        logger.info(
-            "graph_search_user_success",
-            user_id=user_id,
-            query=request.query,
-            results_count=result.get("total_count", 0)
-        )
-        
-        return {
-            "user_id": user_id,
-            "query": request.query,
-            "results": result.get("results", []),
-            "total_count": result.get("total_count", 0),
-            "success": True
+        "responses": {
+            200: {"description": "Resultados da busca no graph"},
+            400: {"description": "Query inválida"},
+            500: {"description": "Erro na busca"}
         }
-        
-    except Exception as e:
-        logger.error(
-            "graph_search_user_failed",
-            user_id=user_id,
-            query=request.query,
-            error=str(e),
-            exc_info=True
-        )
-        raise HTTPException(
-            status_code=500,
-            detail=f"Graph search failed: {str(e)}"
-        )
-
-
-@router.post(
-    "/groups/{group_id}/search",
-    summary="Buscar no graph do grupo",
-    description="""
+    },
+    "group": {
+        "summary": "Buscar no graph do grupo",
+        "description": """
     Busca híbrida no Knowledge Graph de um grupo/organização.
     
     **Diferenças da busca de usuário:**
@@ -331,60 +299,298 @@ async def search_user_graph(
     - Políticas e procedimentos
     - Dados de projetos compartilhados
     """,
-    responses={
-        200: {"description": "Resultados da busca no graph do grupo"},
-        404: {"description": "Grupo não encontrado"},
-        500: {"description": "Erro na busca"}
+        "responses": {
+            200: {"description": "Resultados da busca no graph do grupo"},
+            404: {"description": "Grupo não encontrado"},
+            500: {"description": "Erro na busca"}
+        }
     }
-)
-async def search_group_graph(
-    group_id: str = Path(description="ID único do grupo"),
-    request: GraphSearchRequest = None,
-    zep_client: OptimizedZepClient = Depends(get_zep_client)
-):
-    """Busca híbrida no Knowledge Graph de um grupo."""
-    try:
-        logger.info(
-            "graph_search_group_request",
-            group_id=group_id,
-            query=request.query,
-            limit=request.limit
-        )
+}
+
+class _AddBatcher:
+    """
+    Micro-batching das escritas no graph.
+    
+    Os handlers enfileiram (kwargs, future) e aguardam o future; um worker
+    agrupa até batch_size itens por janela de flush_interval e despacha
+    cada lote numa task própria via add_graph_data_batch. O worker não
+    espera o lote terminar, então um item lento (ou em retry) não atrasa
+    os lotes seguintes; no máximo max_in_flight lotes rodam ao mesmo tempo.
+    """
+    
+    def __init__(
+        self,
+        batch_size: int,
+        flush_interval: float,
+        concurrency: int,
+        max_in_flight: int
+    ) -> None:
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._concurrency = concurrency
+        self._max_in_flight = max_in_flight
+        self._queue: Optional["asyncio.Queue[Any]"] = None
+        self._worker: Optional["asyncio.Task[None]"] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._in_flight: Set["asyncio.Task[None]"] = set()
+    
+    async def submit(self, zep_client: OptimizedZepClient, **item: Any) -> Dict[str, Any]:
+        """Enfileira uma escrita e aguarda o resultado do lote."""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self._max_in_flight)
+            self._worker = asyncio.create_task(self._run())
         
-        # Realizar busca no graph
-        result = await zep_client.search_graph(
-            group_id=group_id,
-            query=request.query,
-            limit=request.limit
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((zep_client, item, future))
+        return await future
+    
+    async def _run(self) -> None:
+        """Worker: coleta um lote por janela e o despacha sem aguardar."""
+        queue = self._queue
+        slots = self._slots
+        while True:
+            batch = [await queue.get()]
+            try:
+                if queue.qsize() < self._batch_size - 1:
+                    await asyncio.sleep(self._flush_interval)
+                while len(batch) < self._batch_size and not queue.empty():
+                    batch.append(queue.get_nowait())
+                
+                # Backpressure: com max_in_flight lotes ativos, a fila acumula
+                await slots.acquire()
+            except asyncio.CancelledError:
+                self._fail(batch, RuntimeError("Graph add batcher closed"))
+                raise
+            
+            task = asyncio.create_task(self._dispatch(batch, slots))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+    
+    async def _dispatch(self, batch: List[Any], slots: asyncio.Semaphore) -> None:
+        """Executa um lote e libera a vaga de lote em andamento."""
+        try:
+            await self._flush(batch)
+        except asyncio.CancelledError:
+            self._fail(batch, RuntimeError("Graph add batcher closed"))
+            raise
+        except Exception as e:
+            # Falhas inesperadas vão para os callers do lote
+            logger.error("graph_add_batch_failed", batch_size=len(batch), error=str(e))
+            self._fail(batch, e)
+        finally:
+            slots.release()
+    
+    @staticmethod
+    def _fail(batch: List[Any], error: BaseException) -> None:
+        """Propaga um erro para os itens do lote ainda pendentes."""
+        for _, _, future in batch:
+            if not future.done():
+                future.set_exception(error)
+    
+    async def _flush(self, batch: List[Any]) -> None:
+        """Envia o lote ao Zep e resolve o future de cada item."""
+        # OptimizedZepClient é singleton: todos os itens usam o mesmo cliente
+        zep_client = batch[0][0]
+        results = await zep_client.add_graph_data_batch(
+            [item for _, item, _ in batch],
+            concurrency=self._concurrency
         )
+        for (_, _, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+    
+    async def close(self) -> None:
+        """Encerra o worker e os lotes em andamento e falha as escritas pendentes."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
         
-        logger.info(
-            "graph_search_group_success",
-            group_id=group_id,
-            query=request.query,
-            results_count=result.get("total_count", 0)
-        )
+        in_flight = list(self._in_flight)
+        for task in in_flight:
+            task.cancel()
+        await asyncio.gather(*in_flight, return_exceptions=True)
         
-        return {
-            "group_id": group_id,
-            "query": request.query,
-            "results": result.get("results", []),
-            "total_count": result.get("total_count", 0),
-            "success": True
-        }
+        while self._queue is not None and not self._queue.empty():
+            self._fail([self._queue.get_nowait()], RuntimeError("Graph add batcher closed"))
+
+
+add_batcher = _AddBatcher(
+    batch_size=settings.graph_add_batch_size,
+    flush_interval=settings.graph_add_batch_interval_ms / 1000,
+    concurrency=settings.graph_add_batch_concurrency,
+    max_in_flight=settings.graph_add_max_in_flight_batches
+)
+
+
+# Parâmetros de path/query reutilizáveis: um FieldInfo por alias em vez de
+# um descritor novo por endpoint
+UserId = Annotated[str, Path(
+    alias="user_id",
+    description="ID único do usuário",
+    min_length=1,
+    max_length=100
+)]
+GroupId = Annotated[str, Path(
+    alias="group_id",
+    description="ID único do grupo/organização",
+    min_length=1,
+    max_length=100
+)]
+Limit = Annotated[int, Query(ge=1, le=200, description="Limite de resultados")]
+Stream = Annotated[bool, Query(description="Retornar resultados como NDJSON (application/x-ndjson)")]
+
+_SCOPE_ID_TYPES = {"user": UserId, "group": GroupId}
+
+
+def _make_add_handler(scope: _GraphScope) -> Callable[..., Awaitable[Dict[str, Any]]]:
+    """
+    Cria o handler de adição de dados ao graph para o escopo informado.
+    
+    O parâmetro de path (user_id/group_id) é resolvido por alias, então
+    os dois escopos compartilham o mesmo código.
+    """
+    id_field = f"{scope}_id"
+    
+    async def add_graph_data(
+        http_request: Request,
+        target_id: _SCOPE_ID_TYPES[scope],
+        request: GraphDataRequest = None,
+        zep_client: OptimizedZepClient = Depends(get_zep_client)
+    ):
+        """
+        Adiciona dados ao Knowledge Graph do usuário ou grupo.
         
-    except Exception as e:
-        logger.error(
-            "graph_search_group_failed",
-            group_id=group_id,
-            query=request.query,
-            error=str(e),
-            exc_info=True
-        )
-        raise HTTPException(
-            status_code=500,
-            detail=f"Group graph search failed: {str(e)}"
-        )
+        O Zep automaticamente:
+        - Extrai entidades e relacionamentos
+        - Organiza dados temporalmente
+        - Funde informações relacionadas
+        - Atualiza fatos existentes se necessário
+        """
+        try:
+            # Adicionar dados ao graph
+            # Escrita agrupada em lote com outras requests concorrentes
+            await add_batcher.submit(
+                zep_client,
+                data=await _prepare_graph_data(http_request, request.data),
+                data_type=request.data_type,
+                **{id_field: target_id}
+            )
+            
+            # Campos extras para o registro único do middleware de logging
+            http_request.state.log_extra = {
+                "data_type": request.data_type
+            }
+            
+            return {
+                id_field: target_id,
+                "data_type": request.data_type,
+                "success": True,
+                "message": f"Data added to {scope} graph successfully"
+            }
+            
+        except Exception as e:
+            logger.error(
+                f"graph_add_{scope}_data_failed",
+                data_type=request.data_type,
+                error=str(e),
+                exc_info=True,
+                **{id_field: target_id}
+            )
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to add data to {scope} graph: {str(e)}"
+            )
+    
+    add_graph_data.__name__ = f"add_{scope}_graph_data"
+    return add_graph_data
+
+
+def _make_search_handler(scope: _GraphScope) -> Callable[..., Awaitable[Any]]:
+    """Cria o handler de busca híbrida no graph para o escopo informado."""
+    id_field = f"{scope}_id"
+    error_prefix = "Graph search" if scope == "user" else "Group graph search"
+    
+    async def search_graph(
+        http_request: Request,
+        target_id: _SCOPE_ID_TYPES[scope],
+        request: GraphSearchRequest = None,
+        stream: Stream = False,
+        zep_client: OptimizedZepClient = Depends(get_zep_client)
+    ):
+        """
+        Busca híbrida no Knowledge Graph do usuário ou grupo.
+        
+        Retorna entidades, relacionamentos e fatos relevantes
+        organizados por score de relevância.
+        """
+        try:
+            # Realizar busca no graph
+            result = await zep_client.search_graph(
+                query=request.query,
+                limit=request.limit,
+                **{id_field: target_id}
+            )
+            
+            # Campos extras para o registro único do middleware de logging
+            http_request.state.log_extra = {
+                "query": request.query,
+                "results_count": result.get("total_count", 0)
+            }
+            
+            if _wants_stream(stream):
+                return _ndjson_response(
+                    result.get("results") or (), result.get("total_count", 0)
+                )
+            
+            return {
+                id_field: target_id,
+                "query": request.query,
+                "results": result.get("results", []),
+                "total_count": result.get("total_count", 0),
+                "success": True
+            }
+            
+        except Exception as e:
+            logger.error(
+                f"graph_search_{scope}_failed",
+                query=request.query,
+                error=str(e),
+                exc_info=True,
+                **{id_field: target_id}
+            )
+            raise HTTPException(
+                status_code=500,
+                detail=f"{error_prefix} failed: {str(e)}"
+            )
+    
+    search_graph.__name__ = f"search_{scope}_graph"
+    return search_graph
+
+
+# Registro das rotas de adição e busca: um único código para os dois escopos
+for _scope in ("user", "group"):
+    _prefix = f"/{_scope}s/{{{_scope}_id}}"
+    router.add_api_route(
+        f"{_prefix}/data",
+        _make_add_handler(_scope),
+        methods=["POST"],
+        **_ADD_ROUTE_DOCS[_scope]
+    )
+    router.add_api_route(
+        f"{_prefix}/search",
+        _make_search_handler(_scope),
+        methods=["POST"],
+        **_SEARCH_ROUTE_DOCS[_scope]
+    )
 
 
 @router.get(
@@ -413,8 +619,10 @@ async def search_group_graph(
     }
 )
 async def list_user_entities(
-    user_id: str = Path(description="ID único do usuário"),
-    limit: int = Query(default=50, ge=1, le=200, description="Limite de entidades"),
+    http_request: Request,
+    response: Response,
+    user_id: UserId,
+    limit: Limit = 50,
     entity_type: Optional[str] = Query(default=None, description="Filtrar por tipo de entidade"),
     zep_client: OptimizedZepClient = Depends(get_zep_client)
 ):
@@ -424,32 +632,29 @@ async def list_user_entities(
     TODO: Implementar listagem específica de entidades quando
     o Zep SDK disponibilizar esta funcionalidade.
     """
+    etag = _graph_etag(zep_client, user_id, "entities", limit, entity_type)
+    if _etag_matches(http_request, etag):
+        return _not_modified(etag)
+    
     try:
-        logger.info(
-            "graph_list_user_entities_request",
-            user_id=user_id,
-            limit=limit,
-            entity_type=entity_type
-        )
-        
         # Por enquanto, usar busca geral para simular listagem
         # Em versão futura, implementar endpoint específico
         result = await zep_client.search_graph(
             user_id=user_id,
-            query="entities",  # Query genérica para entidades
-            limit=limit
+            query=_ENTITIES_Q,  # Query genérica para entidades
+            limit=limit,
+            entity_type=entity_type  # Filtro aplicado pelo Zep
         )
         
-        # Filtrar por tipo se especificado
         entities = result.get("results", [])
-        if entity_type:
-            entities = [e for e in entities if e.get("type") == entity_type]
         
-        logger.info(
-            "graph_list_user_entities_success",
-            user_id=user_id,
-            entities_count=len(entities)
-        )
+        # Campos extras para o registro único do middleware de logging
+        http_request.state.log_extra = {
+            "entities_count": len(entities)
+        }
+        
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = _GRAPH_CACHE_CONTROL
         
         return {
             "user_id": user_id,
@@ -497,10 +702,13 @@ async def list_user_entities(
     }
 )
 async def list_user_facts(
-    user_id: str = Path(description="ID único do usuário"),
-    limit: int = Query(default=50, ge=1, le=200, description="Limite de fatos"),
+    http_request: Request,
+    response: Response,
+    user_id: UserId,
+    limit: Limit = 50,
     min_confidence: float = Query(default=0.0, ge=0.0, le=1.0, description="Confiança mínima"),
     valid_only: bool = Query(default=True, description="Apenas fatos válidos atualmente"),
+    stream: Stream = False,
     zep_client: OptimizedZepClient = Depends(get_zep_client)
 ):
     """
@@ -509,41 +717,45 @@ async def list_user_facts(
     Fatos são informações estruturadas extraídas automaticamente
     das conversas e dados fornecidos.
     """
+    etag = _graph_etag(zep_client, user_id, "facts", limit, min_confidence, valid_only, stream)
+    if _etag_matches(http_request, etag):
+        return _not_modified(etag)
+    
     try:
-        logger.info(
-            "graph_list_user_facts_request",
-            user_id=user_id,
-            limit=limit,
-            min_confidence=min_confidence,
-            valid_only=valid_only
-        )
-        
         # Usar busca de memória para obter fatos relevantes
         result = await zep_client.search_memory(
             user_id=user_id,
-            query="facts",  # Query específica para fatos
+            query=_FACTS_Q,  # Query específica para fatos
             search_scope="facts",
-            limit=limit
+            limit=limit,
+            min_score=min_confidence or None
         )
         
-        facts = []
-        if result.get("results"):
-            for fact_result in result["results"]:
-                # Filtrar por confiança se especificado
-                confidence = fact_result.get("score", 1.0)
-                if confidence >= min_confidence:
-                    facts.append({
-                        "fact": fact_result.get("fact") or fact_result.get("content"),
-                        "confidence": confidence,
-                        "metadata": fact_result.get("metadata", {}),
-                        "valid": True  # TODO: Implementar check de validade temporal
-                    })
+        # Zep já aplica min_score; o filtro local cobre scores ausentes (1.0)
+        facts = [
+            {
+                "fact": fact_result.get("fact") or fact_result.get("content"),
+                "confidence": confidence,
+                "metadata": fact_result.get("metadata", {}),
+                "valid": True  # TODO: Implementar check de validade temporal
+            }
+            for fact_result in result.get("results") or ()
+            if (confidence := fact_result.get("score", 1.0)) >= min_confidence
+        ]
         
-        logger.info(
-            "graph_list_user_facts_success",
-            user_id=user_id,
-            facts_count=len(facts)
-        )
+        # Campos extras para o registro único do middleware de logging
+        http_request.state.log_extra = {
+            "facts_count": len(facts)
+        }
+        
+        if _wants_stream(stream):
+            streaming = _ndjson_response(facts, len(facts))
+            streaming.headers["ETag"] = etag
+            streaming.headers["Cache-Control"] = _GRAPH_CACHE_CONTROL
+            return streaming
+        
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = _GRAPH_CACHE_CONTROL
         
         return {
             "user_id": user_id,
@@ -5,20 +5,116 @@ Implementa probes para Kubernetes e monitoramento completo de dependências.
 
 import time
 import asyncio
+import orjson
 import psutil
-from typing import Dict, Any, List
+from typing import Awaitable, Callable, Dict, Any, List, Optional, Tuple
 import structlog
-from fastapi import APIRouter, HTTPException, Depends
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
+from fastapi.responses import ORJSONResponse
 
 from src.core.config import settings
-from src.core.zep_client.client import get_zep_client_sync
-from src.core.cache import get_cache_instance, CacheError
-from src.core.metrics import get_metrics
+from src.core.zep_client.client import OptimizedZepClient, ZepClientError
+from src.core.cache import RedisCache, get_cache_instance, CacheError
+from src.core.metrics import PrometheusMetrics, get_metrics
+from src.core.resilience import CircuitBreaker, get_circuit_breaker
 
 logger = structlog.get_logger(__name__)
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# Processo atual instanciado uma vez (evita reabrir /proc/self a cada check)
+_PROCESS = psutil.Process()
+
+# Último CPU% amostrado em background; a primeira chamada só fixa a base
+psutil.cpu_percent(interval=None)
+_last_cpu: float = 0.0
+
+
+async def cpu_sampler(
+    metrics: Optional[PrometheusMetrics] = None,
+    interval: float = 2.0
+) -> None:
+    """
+    Amostra o uso de CPU periodicamente sem bloquear o event loop.
+    
+    Iniciado no lifespan da aplicação; os checks leem _last_cpu em vez de
+    chamar psutil.cpu_percent(interval=1), que dorme 1s na thread do loop.
+    É o único chamador de cpu_percent (a base do psutil é compartilhada);
+    o valor também é publicado nas métricas Prometheus.
+    """
+    global _last_cpu
+    while True:
+        await asyncio.sleep(interval)
+        _last_cpu = psutil.cpu_percent(interval=None)
+        if metrics is not None:
+            metrics.set_cpu_percent(_last_cpu)
+
+
+# Leituras de recursos (disco, memória) memoizadas por TTL entre checks
+_resource_cache: Dict[str, Tuple[float, Any]] = {}
+
+_RESOURCE_READERS: Dict[str, Callable[[], Any]] = {
+    "virtual_memory": lambda: psutil.virtual_memory(),
+    "disk_usage": lambda: psutil.disk_usage('/'),
+    "process_memory": lambda: _PROCESS.memory_info(),
+}
+
+
+def _resource(name: str) -> Any:
+    """
+    Retorna a leitura do recurso, refazendo a syscall só após o TTL.
+    
+    Compartilhado entre /detailed e /metrics-summary; sem await, então
+    não há corrida entre requests concorrentes.
+    """
+    now = time.monotonic()
+    cached = _resource_cache.get(name)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+    
+    value = _RESOURCE_READERS[name]()
+    if settings.resource_cache_ttl > 0:
+        _resource_cache[name] = (now + settings.resource_cache_ttl, value)
+    return value
+
+
+_SERVICE_NAME = "zep-ai-memory-api"
+
+# Falhas esperadas de dependências: logadas sem traceback (formatá-lo custa
+# caro quando um upstream oscila e os probes repetem a cada segundo)
+_EXPECTED_ERRORS = (TimeoutError, asyncio.TimeoutError, ConnectionError, CacheError, ZepClientError)
+
+# URL do Redis sem credenciais, calculada uma vez
+_MASKED_REDIS_URL = settings.redis_url.rsplit('@', 1)[-1] if settings.redis_url else ""
+
+# Limites de recursos do sistema (%)
+_CPU_THRESHOLD = 80.0
+_MEMORY_THRESHOLD = 85.0
+_DISK_THRESHOLD = 90.0
+
+# Blocos estáticos das respostas, montados uma vez no import
+_ENV = {
+    "debug": settings.debug,
+    "log_level": settings.log_level,
+    "prometheus_enabled": settings.prometheus_enabled,
+    "cache_enabled": settings.cache_enabled,
+    "auth_enabled": settings.auth_enabled,
+    "rate_limit_enabled": settings.rate_limit_enabled
+}
+
+_SERVICES = {
+    "zep_configured": bool(settings.zep_api_url and settings.zep_api_key),
+    "cache_enabled": settings.cache_enabled,
+    "auth_enabled": settings.auth_enabled,
+    "rate_limit_enabled": settings.rate_limit_enabled,
+    "prometheus_enabled": settings.prometheus_enabled
+}
+
+# Corpo do liveness pré-serializado; só o timestamp é anexado por request
+_LIVE_PREFIX = (
+    b'{"status":"alive","version":' + orjson.dumps(settings.api_version)
+    + b',"service":' + orjson.dumps(_SERVICE_NAME) + b',"timestamp":'
+)
 
 
 @router.get(
@@ -39,7 +135,8 @@ router = APIRouter()
     responses={
         200: {"description": "Aplicação funcionando"},
         500: {"description": "Aplicação com problemas críticos"}
-    }
+    },
+    response_class=Response
 )
 async def liveness_probe():
     """
@@ -47,20 +144,12 @@ async def liveness_probe():
     
     Este endpoint deve responder rapidamente e apenas verificar
     se o processo está funcionando, sem verificar dependências externas.
+    Responde bytes pré-montados, sem dict nem serialização JSON.
     """
-    try:
-        return {
-            "status": "alive",
-            "timestamp": time.time(),
-            "version": settings.api_version,
-            "service": "zep-ai-memory-api"
-        }
-    except Exception as e:
-        logger.error("liveness_probe_failed", error=str(e))
-        raise HTTPException(
-            status_code=500,
-            detail="Liveness check failed"
-        )
+    return Response(
+        content=_LIVE_PREFIX + repr(time.time()).encode() + b"}",
+        media_type="application/json"
+    )
 
 
 @router.get(
@@ -70,8 +159,8 @@ async def liveness_probe():
     Endpoint de readiness probe para Kubernetes.
     
     **Verificações:**
-    - Conectividade com Zep
-    - Status das dependências críticas
+    - Startup concluída
+    - Circuit breaker do Zep (sem chamadas de rede)
     - Configurações essenciais
     
     **Uso:**
@@ -84,60 +173,38 @@ async def liveness_probe():
         503: {"description": "Aplicação não pronta - dependências indisponíveis"}
     }
 )
-async def readiness_probe():
+async def readiness_probe(request: Request):
     """
     Readiness probe - verifica se a aplicação está pronta para tráfego.
     
-    Verifica todas as dependências críticas antes de aceitar requests.
+    Usa apenas estado local: a flag de startup (app.state.is_ready), as
+    configurações essenciais e o circuit breaker do Zep, alimentado pelas
+    chamadas reais. Não faz chamadas de rede, então uma oscilação
+    transitória de dependência não tira todos os pods do balanceamento.
+    Checks profundos ficam no /detailed.
     """
-    health_checks = {}
-    overall_healthy = True
+    started = getattr(request.app.state, "is_ready", False)
+    config_check = await _check_configuration()
+    zep_breaker = get_circuit_breaker("zep").snapshot()
+    zep_available = zep_breaker["status"] != CircuitBreaker.OPEN
     
-    try:
-        # 1. Verificar configurações essenciais
-        config_check = await _check_configuration()
-        health_checks["configuration"] = config_check
-        if not config_check["healthy"]:
-            overall_healthy = False
-        
-        # 2. Verificar conectividade com Zep
-        zep_check = await _check_zep_connectivity()
-        health_checks["zep"] = zep_check
-        if not zep_check["healthy"]:
-            overall_healthy = False
-        
-        # 3. Verificar dependências opcionais (não afetam readiness)
-        cache_check = await _check_cache_connectivity()
-        health_checks["cache"] = cache_check
-        # Cache não afeta readiness - apenas warning
-        
-        response = {
-            "status": "ready" if overall_healthy else "not_ready",
-            "timestamp": time.time(),
-            "version": settings.api_version,
-            "checks": health_checks,
-            "healthy": overall_healthy
-        }
-        
-        if overall_healthy:
-            return response
-        else:
-            return JSONResponse(
-                status_code=503,
-                content=response
-            )
-            
-    except Exception as e:
-        logger.error("readiness_probe_failed", error=str(e), exc_info=True)
-        return JSONResponse(
-            status_code=503,
-            content={
-                "status": "not_ready",
-                "timestamp": time.time(),
-                "error": str(e),
-                "healthy": False
-            }
-        )
+    overall_healthy = started and config_check["healthy"] and zep_available
+    
+    response = {
+        "status": "ready" if overall_healthy else "not_ready",
+        "timestamp": time.time(),
+        "version": settings.api_version,
+        "checks": {
+            "startup": {"healthy": started},
+            "configuration": config_check,
+            "zep": {"healthy": zep_available, "circuit_breaker": zep_breaker},
+            # Cache não afeta readiness - apenas informativo
+            "cache": {"circuit_breaker": get_circuit_breaker("cache").snapshot()}
+        },
+        "healthy": overall_healthy
+    }
+    
+    return ORJSONResponse(status_code=200 if overall_healthy else 503, content=response)
 
 
 @router.get(
@@ -162,100 +229,55 @@ async def readiness_probe():
         200: {"description": "Status detalhado do sistema"}
     }
 )
-async def detailed_health_check():
+async def detailed_health_check(request: Request):
     """
     Health check detalhado com informações completas do sistema.
     
     Inclui métricas, dependências e configurações para debugging.
     """
-    start_time = time.time()
+    start_time = time.monotonic_ns()
     
     try:
-        # Executar todos os checks em paralelo para performance
-        config_task = _check_configuration()
-        zep_task = _check_zep_connectivity()
-        cache_task = _check_cache_connectivity()
-        system_task = _check_system_resources()
-        database_task = _check_database_connectivity()
-        
-        # Aguardar todos os checks
-        config_check, zep_check, cache_check, system_check, database_check = await asyncio.gather(
-            config_task, zep_task, cache_task, system_task, database_task,
+        # Executar todos os checks em paralelo, cada um com seu próprio timeout
+        # (funções resolvidas a cada request, não congeladas no import)
+        check_fns = {
+            "configuration": _check_configuration,
+            "zep": lambda: _check_zep_connectivity(getattr(request.app.state, "zep", None)),
+            "cache": _check_cache_connectivity,
+            "system": _check_system_resources,
+            "database": _check_database_connectivity
+        }
+        results = await asyncio.gather(
+            *(_with_timeout(name, check_fns[name]()) for name in _ACTIVE_CHECKS),
             return_exceptions=True
         )
         
         # Processar resultados (handle exceptions)
-        checks = {}
-        
-        # Configuration Check
-        if isinstance(config_check, Exception):
-            checks["configuration"] = {
-                "healthy": False,
-                "error": str(config_check),
-                "response_time": None
-            }
-        else:
-            checks["configuration"] = config_check
-        
-        # Zep Check
-        if isinstance(zep_check, Exception):
-            checks["zep"] = {
-                "healthy": False, 
-                "error": str(zep_check),
-                "response_time": None
-            }
-        else:
-            checks["zep"] = zep_check
-            
-        # Cache Check
-        if isinstance(cache_check, Exception):
-            checks["cache"] = {
-                "healthy": False,
-                "error": str(cache_check), 
-                "response_time": None
-            }
-        else:
-            checks["cache"] = cache_check
-            
-        # System Check
-        if isinstance(system_check, Exception):
-            checks["system"] = {
+        checks = {
+            name: result if not isinstance(result, BaseException) else {
                 "healthy": False,
-                "error": str(system_check),
-                "response_time": None
+                "error": str(result),
+                "response_time_ns": None
             }
-        else:
-            checks["system"] = system_check
-            
-        # Database Check
-        if isinstance(database_check, Exception):
-            checks["database"] = {
-                "healthy": False,
-                "error": str(database_check),
-                "response_time": None
-            }
-        else:
-            checks["database"] = database_check
-        
-        # Calcular status geral baseado em serviços críticos
-        critical_services = ["configuration", "zep"]
-        optional_services = ["cache", "database"]
-        system_services = ["system"]
+            for name, result in zip(_ACTIVE_CHECKS, results)
+        }
+        checks.update(_SKIPPED_CHECKS)
         
-        # Críticos devem estar 100% saudáveis
-        critical_healthy = all(
-            checks.get(service, {}).get("healthy", False) 
-            for service in critical_services
+        # Calcular status geral: nomes fixos, booleanos locais sem geradores
+        critical_healthy = (
+            checks["configuration"].get("healthy", False)
+            and checks["zep"].get("healthy", False)
         )
         
-        # Sistema deve estar em níveis aceitáveis  
-        system_healthy = checks.get("system", {}).get("healthy", True)
+        # Sistema deve estar em níveis aceitáveis
+        system_healthy = checks["system"].get("healthy", True)
         
         # Opcionais podem estar degradados sem afetar status geral
-        optional_issues = [
-            service for service in optional_services
-            if not checks.get(service, {}).get("healthy", True)
-        ]
+        optional_issues = []
+        if not checks["cache"].get("healthy", True):
+            optional_issues.append("cache")
+        if not checks["database"].get("healthy", True):
+            optional_issues.append("database")
         
         # Status geral
         if critical_healthy and system_healthy:
@@ -266,40 +288,41 @@ async def detailed_health_check():
         else:
             overall_status = "unhealthy"
         
-        total_time = time.time() - start_time
+        total_time_ns = _elapsed_ns(start_time)
+        
+        # Timestamp de parede único para a resposta
+        now = time.time()
         
         # Obter métricas adicionais
         try:
-            metrics = get_metrics()
-            uptime_seconds = time.time() - metrics._start_time
+            metrics = _app_metrics(request)
+            uptime_seconds = time.perf_counter() - metrics._start_time
         except Exception:
             uptime_seconds = 0
         
-        return {
+        # ORJSONResponse direto: evita o jsonable_encoder do FastAPI sobre o dict aninhado
+        return ORJSONResponse(content={
             "status": overall_status,
-            "timestamp": time.time(),
+            "timestamp": now,
             "version": settings.api_version,
-            "service": "zep-ai-memory-api",
-            "environment": {
-                "debug": settings.debug,
-                "log_level": settings.log_level,
-                "prometheus_enabled": settings.prometheus_enabled,
-                "cache_enabled": settings.cache_enabled,
-                "auth_enabled": settings.auth_enabled,
-                "rate_limit_enabled": settings.rate_limit_enabled
-            },
+            "service": _SERVICE_NAME,
+            "environment": _ENV,
             "checks": checks,
             "overall_healthy": overall_status in ["healthy", "degraded"],
             "critical_services_healthy": critical_healthy,
             "system_healthy": system_healthy,
             "optional_issues": optional_issues,
-            "response_time_ms": round(total_time * 1000, 2),
+            "response_time_ns": total_time_ns,
             "uptime_seconds": round(uptime_seconds, 2),
-        }
+        })
         
     except Exception as e:
-        logger.error("detailed_health_check_failed", error=str(e), exc_info=True)
-        return JSONResponse(
+        logger.error(
+            "detailed_health_check_failed",
+            error=str(e),
+            exc_info=not isinstance(e, _EXPECTED_ERRORS)
+        )
+        return ORJSONResponse(
             status_code=500,
             content={
                 "status": "error",
@@ -310,69 +333,102 @@ async def detailed_health_check():
         )
 
 
-async def _check_configuration() -> Dict[str, Any]:
-    """Verifica se as configurações essenciais estão presentes."""
-    check_start = time.time()
+# Cache resolvido na startup (lifespan); None cai no factory get_cache_instance()
+_CACHE: Optional[RedisCache] = None
+
+
+def bind_cache(cache: Optional[RedisCache]) -> None:
+    """Fixa a instância de cache usada pelos checks que não recebem o Request."""
+    global _CACHE
+    _CACHE = cache
+
+
+def _app_metrics(request: Request) -> PrometheusMetrics:
+    """Métricas fixadas em app.state na startup, com fallback para o singleton."""
+    return getattr(request.app.state, "metrics", None) or get_metrics()
+
+
+def _gauge_value(gauge: Any) -> float:
+    """Valor atual de um Gauge (ou child com labels) do prometheus_client."""
+    return gauge._value.get()
+
+
+def _elapsed_ns(start_ns: int) -> int:
+    """Tempo decorrido em ns (int) desde um time.monotonic_ns(); sem arredondamento por request."""
+    return time.monotonic_ns() - start_ns
+
+
+# Checks do health detalhado, na ordem de execução
+_CHECK_NAMES = ("configuration", "zep", "cache", "system", "database")
+
+# Features desligadas no startup têm resultado fixo: nenhuma coroutine agendada por request
+_SKIPPED_CHECKS: Dict[str, Dict[str, Any]] = {}
+if not settings.cache_enabled:
+    _SKIPPED_CHECKS["cache"] = {
+        "healthy": True,
+        "response_time_ns": 0,
+        "details": {"status": "disabled", "cache_enabled": False}
+    }
+if not settings.database_url:
+    _SKIPPED_CHECKS["database"] = {
+        "healthy": True,
+        "response_time_ns": 0,
+        "details": {"status": "not_configured", "message": "No database configured"}
+    }
+
+_ACTIVE_CHECKS = tuple(name for name in _CHECK_NAMES if name not in _SKIPPED_CHECKS)
+
+
+async def _with_timeout(name: str, check: Awaitable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Executa um check limitado ao seu timeout em settings.check_timeouts.
     
+    Um check lento vira falha em vez de segurar o endpoint inteiro; o
+    timeout aplicado vai na resposta para facilitar o ajuste.
+    """
+    timeout = settings.check_timeouts.get(name, settings.health_check_timeout)
     try:
-        # Verificar configurações críticas
-        missing_configs = []
-        
-        if not settings.zep_api_key:
-            missing_configs.append("ZEP_API_KEY")
-        
-        if not settings.zep_api_url:
-            missing_configs.append("ZEP_API_URL")
-            
-        if not settings.api_secret_key or len(settings.api_secret_key) < 32:
-            missing_configs.append("API_SECRET_KEY (must be 32+ chars)")
-        
-        healthy = len(missing_configs) == 0
-        
-        response_time = time.time() - check_start
-        
-        result = {
-            "healthy": healthy,
-            "response_time": round(response_time * 1000, 2),
-            "details": {
-                "missing_configs": missing_configs if missing_configs else None,
-                "zep_url_configured": bool(settings.zep_api_url),
-                "api_key_configured": bool(settings.zep_api_key),
-                "secret_key_length": len(settings.api_secret_key) if settings.api_secret_key else 0
-            }
-        }
-        
-        if not healthy:
-            result["error"] = f"Missing required configurations: {', '.join(missing_configs)}"
-        
-        return result
-        
-    except Exception as e:
+        result = await asyncio.wait_for(check, timeout=timeout)
+    except asyncio.TimeoutError:
         return {
             "healthy": False,
-            "response_time": round((time.time() - check_start) * 1000, 2),
-            "error": str(e),
-            "details": None
+            "error": "timeout",
+            "timeout_s": timeout,
+            "response_time_ns": None
         }
+    result["timeout_s"] = timeout
+    return result
+
+
+async def _check_configuration() -> Dict[str, Any]:
+    """Verifica se as configurações essenciais estão presentes."""
+    # Snapshot calculado uma vez em Settings; cópia rasa pois o chamador pode anotar o dict
+    return dict(settings.health_config_snapshot)
+
 
+_zep_check_sem = asyncio.Semaphore(settings.max_concurrent_zep_health_checks)
 
-async def _check_zep_connectivity() -> Dict[str, Any]:
-    """Verifica conectividade com o Zep com timeout e retry."""
-    check_start = time.time()
+
+async def _check_zep_connectivity(zep_client: Optional[OptimizedZepClient]) -> Dict[str, Any]:
+    """Verifica conectividade com o Zep (cliente de app.state) com timeout."""
+    check_start = time.monotonic_ns()
     
     try:
         # Usar timeout específico para health check
         async with asyncio.timeout(settings.health_check_timeout):
-            zep_client = await get_zep_client_sync()
+            if zep_client is None:
+                raise ZepClientError("Zep client not initialized")
             
             # Realizar um health check real fazendo uma operação leve
             try:
                 # Use a method that definitely exists - try to get memory for a test session
                 # This will verify Zep connectivity without relying on user management APIs
-                await asyncio.wait_for(
-                    zep_client.get_memory("health_check_session"),
-                    timeout=5.0
-                )
+                # Limita checks simultâneos para um pico de probes não virar carga no Zep
+                async with _zep_check_sem:
+                    await asyncio.wait_for(
+                        zep_client.get_memory("health_check_session"),
+                        timeout=5.0
+                    )
                 zep_operational = True
                 zep_error = None
             except Exception as e:
@@ -380,11 +436,11 @@ async def _check_zep_connectivity() -> Dict[str, Any]:
                 zep_operational = False
                 zep_error = str(e)
             
-            response_time = time.time() - check_start
+            response_time_ns = _elapsed_ns(check_start)
             
             return {
                 "healthy": zep_operational,
-                "response_time": round(response_time * 1000, 2),
+                "response_time_ns": response_time_ns,
                 "details": {
                     "zep_url": settings.zep_api_url,
                     "client_initialized": zep_client is not None,
@@ -397,7 +453,7 @@ async def _check_zep_connectivity() -> Dict[str, Any]:
     except asyncio.TimeoutError:
         return {
             "healthy": False,
-            "response_time": round((time.time() - check_start) * 1000, 2),
+            "response_time_ns": _elapsed_ns(check_start),
             "error": "Health check timeout",
             "details": {
                 "zep_url": settings.zep_api_url,
@@ -408,7 +464,7 @@ async def _check_zep_connectivity() -> Dict[str, Any]:
     except Exception as e:
         return {
             "healthy": False,
-            "response_time": round((time.time() - check_start) * 1000, 2),
+            "response_time_ns": _elapsed_ns(check_start),
             "error": str(e),
             "details": {
                 "zep_url": settings.zep_api_url,
@@ -417,39 +473,25 @@ async def _check_zep_connectivity() -> Dict[str, Any]:
         }
 
 
+# Chave usada pelo check profundo do cache (write/read/delete)
+_HEALTH_CHECK_KEY = "zep_api:health:check"
+
+
 async def _check_cache_connectivity() -> Dict[str, Any]:
     """Verifica conectividade com o cache (Redis) com operações reais."""
-    check_start = time.time()
+    check_start = time.monotonic_ns()
     
     try:
-        if not settings.cache_enabled:
-            return {
-                "healthy": True,
-                "response_time": 0,
-                "details": {
-                    "status": "disabled",
-                    "cache_enabled": False
-                }
-            }
-        
         # Realizar operações reais no Redis
-        cache = await get_cache_instance()
-        
-        # Teste de conectividade básica
-        await cache.redis.ping()
-        
-        # Teste de operações read/write
-        test_key = "health_check_test"
-        test_value = f"test_{int(time.time())}"
+        cache = _CACHE or await get_cache_instance()
         
-        # Write test
-        await cache.set("health", test_key, value=test_value, ttl=60)
-        
-        # Read test
-        cached_value = await cache.get("health", test_key)
-        
-        # Cleanup
-        await cache.delete("health", test_key)
+        # Write/read/cleanup em um único round-trip (pipeline sem MULTI)
+        test_value = b"test_%d" % int(time.time())
+        pipe = cache.redis.pipeline(transaction=False)
+        pipe.set(_HEALTH_CHECK_KEY, test_value, ex=60)
+        pipe.get(_HEALTH_CHECK_KEY)
+        pipe.delete(_HEALTH_CHECK_KEY)
+        _, cached_value, _ = await pipe.execute()
         
         # Verificar se operações funcionaram
         operations_working = cached_value == test_value
@@ -457,13 +499,13 @@ async def _check_cache_connectivity() -> Dict[str, Any]:
         # Obter estatísticas do cache
         cache_stats = await cache.get_cache_stats()
         
-        response_time = time.time() - check_start
+        response_time_ns = _elapsed_ns(check_start)
         
         return {
             "healthy": operations_working,
-            "response_time": round(response_time * 1000, 2),
+            "response_time_ns": response_time_ns,
             "details": {
-                "redis_url": settings.redis_url.split('@')[-1],  # Remove credenciais
+                "redis_url": _MASKED_REDIS_URL,
                 "cache_enabled": settings.cache_enabled,
                 "cache_ttl": settings.cache_ttl,
                 "operations_working": operations_working,
@@ -478,10 +520,10 @@ async def _check_cache_connectivity() -> Dict[str, Any]:
     except CacheError as e:
         return {
             "healthy": False,
-            "response_time": round((time.time() - check_start) * 1000, 2),
+            "response_time_ns": _elapsed_ns(check_start),
             "error": f"Cache error: {str(e)}",
             "details": {
-                "redis_url": settings.redis_url.split('@')[-1],
+                "redis_url": _MASKED_REDIS_URL,
                 "cache_enabled": settings.cache_enabled,
                 "error_type": "CacheError"
             }
@@ -489,10 +531,10 @@ async def _check_cache_connectivity() -> Dict[str, Any]:
     except Exception as e:
         return {
             "healthy": False,
-            "response_time": round((time.time() - check_start) * 1000, 2),
+            "response_time_ns": _elapsed_ns(check_start),
             "error": str(e),
             "details": {
-                "redis_url": settings.redis_url.split('@')[-1],
+                "redis_url": _MASKED_REDIS_URL,
                 "cache_enabled": settings.cache_enabled,
                 "error_type": type(e).__name__
             }
@@ -501,57 +543,56 @@ async def _check_cache_connectivity() -> Dict[str, Any]:
 
 async def _check_system_resources() -> Dict[str, Any]:
     """Verifica recursos do sistema (CPU, memória, disco)."""
-    check_start = time.time()
+    check_start = time.monotonic_ns()
     
     try:
-        # CPU
-        cpu_percent = psutil.cpu_percent(interval=1)
+        # CPU (amostrado em background por cpu_sampler)
+        cpu_percent = _last_cpu
         
         # Memória
-        memory = psutil.virtual_memory()
+        memory = _resource("virtual_memory")
         
         # Disco
-        disk = psutil.disk_usage('/')
+        disk = _resource("disk_usage")
         
         # Processo atual
-        process = psutil.Process()
-        process_memory = process.memory_info()
+        process_memory = _resource("process_memory")
         
         # Verificar se recursos estão em níveis saudáveis
-        cpu_healthy = cpu_percent < 80.0
-        memory_healthy = memory.percent < 85.0
-        disk_healthy = (disk.used / disk.total) * 100 < 90.0
+        cpu_healthy = cpu_percent < _CPU_THRESHOLD
+        memory_healthy = memory.percent < _MEMORY_THRESHOLD
+        disk_healthy = (disk.used / disk.total) * 100 < _DISK_THRESHOLD
         
         overall_healthy = cpu_healthy and memory_healthy and disk_healthy
         
-        response_time = time.time() - check_start
+        response_time_ns = _elapsed_ns(check_start)
         
         return {
             "healthy": overall_healthy,
-            "response_time": round(response_time * 1000, 2),
+            "response_time_ns": response_time_ns,
             "details": {
                 "cpu": {
                     "percent": cpu_percent,
                     "healthy": cpu_healthy,
-                    "threshold": 80.0
+                    "threshold": _CPU_THRESHOLD
                 },
                 "memory": {
                     "total_gb": round(memory.total / (1024**3), 2),
                     "available_gb": round(memory.available / (1024**3), 2),
                     "percent": memory.percent,
                     "healthy": memory_healthy,
-                    "threshold": 85.0
+                    "threshold": _MEMORY_THRESHOLD
                 },
                 "disk": {
                     "total_gb": round(disk.total / (1024**3), 2),
                     "free_gb": round(disk.free / (1024**3), 2),
                     "percent": round((disk.used / disk.total) * 100, 2),
                     "healthy": disk_healthy,
-                    "threshold": 90.0
+                    "threshold": _DISK_THRESHOLD
                 },
                 "process": {
                     "memory_mb": round(process_memory.rss / (1024**2), 2),
-                    "memory_percent": round(process.memory_percent(), 2)
+                    "memory_percent": round(process_memory.rss / memory.total * 100, 2)
                 }
             }
         }
@@ -559,7 +600,7 @@ async def _check_system_resources() -> Dict[str, Any]:
     except Exception as e:
         return {
             "healthy": False,
-            "response_time": round((time.time() - check_start) * 1000, 2),
+            "response_time_ns": _elapsed_ns(check_start),
             "error": str(e),
             "details": {
                 "error_type": type(e).__name__
@@ -569,26 +610,15 @@ async def _check_system_resources() -> Dict[str, Any]:
 
 async def _check_database_connectivity() -> Dict[str, Any]:
     """Verifica conectividade com banco de dados (se configurado)."""
-    check_start = time.time()
+    check_start = time.monotonic_ns()
     
     try:
-        # Se não há database_url configurada, considerar saudável
-        if not hasattr(settings, 'database_url') or not settings.database_url:
-            return {
-                "healthy": True,
-                "response_time": 0,
-                "details": {
-                    "status": "not_configured",
-                    "message": "No database configured"
-                }
-            }
-        
         # TODO: Implementar verificação real do banco quando necessário
-        response_time = time.time() - check_start
+        response_time_ns = _elapsed_ns(check_start)
         
         return {
             "healthy": True,
-            "response_time": round(response_time * 1000, 2),
+            "response_time_ns": response_time_ns,
             "details": {
                 "status": "simulated",
                 "message": "Database check not implemented yet"
@@ -598,7 +628,7 @@ async def _check_database_connectivity() -> Dict[str, Any]:
     except Exception as e:
         return {
             "healthy": False,
-            "response_time": round((time.time() - check_start) * 1000, 2),
+            "response_time_ns": _elapsed_ns(check_start),
             "error": str(e),
             "details": {
                 "error_type": type(e).__name__
@@ -624,30 +654,32 @@ async def _check_database_connectivity() -> Dict[str, Any]:
         200: {"description": "Resumo das métricas"}
     }
 )
-async def metrics_summary():
+async def metrics_summary(request: Request):
     """Resumo das métricas principais em formato JSON com dados reais."""
     try:
-        metrics = get_metrics()
-        
-        # Atualizar métricas do sistema
-        await metrics.update_system_metrics()
+        metrics = _app_metrics(request)
         
         # Obter estatísticas do cache se disponível
         cache_stats = {}
         if settings.cache_enabled:
             try:
-                cache = await get_cache_instance()
+                cache = _CACHE or await get_cache_instance()
                 cache_stats = await cache.get_cache_stats()
             except Exception:
                 cache_stats = {"error": "Cache unavailable"}
         
-        # Coleta de métricas básicas do sistema
-        cpu_percent = psutil.cpu_percent()
-        memory = psutil.virtual_memory()
-        process = psutil.Process()
+        # Gauges mantidos pela task de background das métricas (sem syscalls de psutil aqui)
+        memory_total = _gauge_value(metrics.system_memory_usage.labels(type='total'))
+        memory_available = _gauge_value(metrics.system_memory_usage.labels(type='available'))
+        process_rss = _gauge_value(metrics.process_memory_usage.labels(type='rss'))
+        memory_percent = (
+            round((memory_total - memory_available) / memory_total * 100, 1)
+            if memory_total else 0.0
+        )
+        now = time.time()
         
         return {
-            "timestamp": time.time(),
+            "timestamp": now,
             "metrics": {
                 "api": {
                     "status": "operational",
@@ -655,21 +687,15 @@ async def metrics_summary():
                     "debug": settings.debug
                 },
                 "system": {
-                    "cpu_percent": cpu_percent,
-                    "memory_percent": memory.percent,
-                    "memory_total_gb": round(memory.total / (1024**3), 2),
-                    "memory_available_gb": round(memory.available / (1024**3), 2),
-                    "process_memory_mb": round(process.memory_info().rss / (1024**2), 2),
-                    "uptime_seconds": round(time.time() - metrics._start_time, 2)
+                    "cpu_percent": _gauge_value(metrics.system_cpu_usage),
+                    "memory_percent": memory_percent,
+                    "memory_total_gb": round(memory_total / (1024**3), 2),
+                    "memory_available_gb": round(memory_available / (1024**3), 2),
+                    "process_memory_mb": round(process_rss / (1024**2), 2),
+                    "uptime_seconds": round(_gauge_value(metrics.app_uptime), 2)
                 },
                 "cache": cache_stats,
-                "services": {
-                    "zep_configured": bool(settings.zep_api_url and settings.zep_api_key),
-                    "cache_enabled": settings.cache_enabled,
-                    "auth_enabled": settings.auth_enabled,
-                    "rate_limit_enabled": settings.rate_limit_enabled,
-                    "prometheus_enabled": settings.prometheus_enabled
-                }
+                "services": _SERVICES
             }
         }
         
@@ -697,53 +723,29 @@ async def metrics_summary():
     }
 )
 async def circuit_breaker_status():
-    """Status dos circuit breakers para serviços críticos."""
+    """
+    Status dos circuit breakers para serviços críticos.
+    
+    Zep e cache leem o estado dos breakers alimentados pelas chamadas
+    reais (sem I/O); o sistema usa apenas recursos locais.
+    """
     try:
-        # Executar health checks críticos em paralelo
-        zep_task = _check_zep_connectivity()
-        cache_task = _check_cache_connectivity()
-        system_task = _check_system_resources()
-        
-        zep_check, cache_check, system_check = await asyncio.gather(
-            zep_task, cache_task, system_task,
-            return_exceptions=True
-        )
-        
-        # Processar resultados
-        circuit_breakers = {}
-        
-        # Zep Circuit Breaker
-        if isinstance(zep_check, Exception):
-            circuit_breakers["zep"] = {"status": "open", "error": str(zep_check)}
-        else:
-            circuit_breakers["zep"] = {
-                "status": "closed" if zep_check["healthy"] else "open",
-                "response_time": zep_check["response_time"],
-                "last_check": time.time()
-            }
-        
-        # Cache Circuit Breaker
-        if isinstance(cache_check, Exception):
-            circuit_breakers["cache"] = {"status": "open", "error": str(cache_check)}
-        else:
-            circuit_breakers["cache"] = {
-                "status": "closed" if cache_check["healthy"] else "half_open",
-                "response_time": cache_check["response_time"],
-                "last_check": time.time()
-            }
+        circuit_breakers = {
+            name: get_circuit_breaker(name).snapshot()
+            for name in ("zep", "cache")
+        }
         
         # System Circuit Breaker
-        if isinstance(system_check, Exception):
-            circuit_breakers["system"] = {"status": "open", "error": str(system_check)}
-        else:
-            circuit_breakers["system"] = {
-                "status": "closed" if system_check["healthy"] else "half_open",
-                "response_time": system_check["response_time"],
-                "last_check": time.time()
-            }
+        system_check = await _check_system_resources()
+        now = time.time()
+        circuit_breakers["system"] = {
+            "status": "closed" if system_check["healthy"] else "half_open",
+            "response_time_ns": system_check["response_time_ns"],
+            "last_check": now
+        }
         
         return {
-            "timestamp": time.time(),
+            "timestamp": now,
             "circuit_breakers": circuit_breakers,
             "overall_status": "healthy" if all(
                 cb.get("status") == "closed" 
@@ -3,15 +3,23 @@ Memory API endpoints - Alto nível.
 Endpoints para operações de memória conversacional otimizadas para AI agents.
 """
 
+import logging
+import orjson
 import structlog
-from typing import Optional
-from fastapi import APIRouter, HTTPException, Depends, Query, Path
-from fastapi.responses import JSONResponse
+from structlog.contextvars import bind_contextvars
+from dataclasses import dataclass
+from itertools import islice
+from operator import attrgetter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from fastapi import APIRouter, HTTPException, Depends, Query, Path, Request
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
 
 from zep_python.types import Message
 
 from src.core.config import settings
-from src.core.zep_client.client import get_zep_client_sync, OptimizedZepClient
+from src.core.cache import RedisCache
+from src.core.zep_client.client import OptimizedZepClient
 from src.core.models.memory import (
     MemoryAddRequest,
     MemoryAddResponse,
@@ -25,17 +33,149 @@ from src.core.models.memory import (
 
 logger = structlog.get_logger(__name__)
 
-router = APIRouter()
+# Logs INFO de entrada/sucesso só montam kwargs se o nível configurado os emite
+_INFO_ENABLED = logging.getLevelName(settings.log_level.upper()) <= logging.INFO
 
+# Handlers ligam session_id uma vez via bind_contextvars; cada request roda
+# na própria task (cópia de contexto), então a ligação não vaza entre requests
 
-async def get_zep_client() -> OptimizedZepClient:
-    """Dependency para obter cliente Zep."""
-    return await get_zep_client_sync()
+# Message sem revalidação: os campos vêm de MessageCreate, já validado pelo FastAPI
+_build_message = getattr(Message, "model_construct", None) or Message.construct
+
+
+
+@dataclass(slots=True)
+class MessageOut:
+    """Mensagem de saída; dataclass com slots é serializada pelo orjson em C."""
+    
+    role: str
+    role_type: str
+    content: str
+    metadata: Optional[Dict[str, Any]]
+    created_at: Any = None
+
+
+@dataclass(slots=True)
+class FactOut:
+    """Fato relevante de saída, serializado nativamente pelo orjson."""
+    
+    fact: str
+    entity: Optional[str] = None
+    valid_at: Any = None
+    invalid_at: Any = None
+    confidence: Optional[float] = None
+
+
+@dataclass(slots=True)
+class SearchResultOut:
+    """Resultado de busca de saída, serializado nativamente pelo orjson."""
+    
+    content: str
+    score: Optional[float]
+    metadata: Dict[str, Any]
+    fact: Optional[str]
+
+
+def _field_extractor(*names: str) -> Callable[[Any], Tuple[Any, ...]]:
+    """
+    Extrai vários atributos de uma vez com attrgetter (em C).
+    
+    Tipos sem algum dos atributos são lembrados e passam a usar getattr
+    com default None, sem pagar a exceção a cada objeto.
+    """
+    fast = attrgetter(*names)
+    partial_types: set = set()
+    
+    def extract(obj: Any) -> Tuple[Any, ...]:
+        cls = type(obj)
+        if cls not in partial_types:
+            try:
+                return fast(obj)
+            except AttributeError:
+                partial_types.add(cls)
+        return tuple(getattr(obj, name, None) for name in names)
+    
+    return extract
+
+
+_fact_fields = _field_extractor("fact", "entity", "valid_at", "invalid_at", "confidence")
+_result_fields = _field_extractor("content", "score", "metadata", "fact")
+
+
+def _to_fact_out(fact: Any) -> FactOut:
+    text, entity, valid_at, invalid_at, confidence = _fact_fields(fact)
+    return FactOut(
+        text if text is not None else str(fact),
+        entity,
+        valid_at,
+        invalid_at,
+        confidence
+    )
+
+
+def _to_search_result(res: Any) -> SearchResultOut:
+    content, score, metadata, fact = _result_fields(res)
+    return SearchResultOut(
+        content if content is not None else str(res),
+        score,
+        metadata if metadata is not None else {},
+        fact
+    )
+
+
+def _row_dict(row: Any) -> Dict[str, Any]:
+    """Dict raso de uma dataclass com slots (sem a cópia profunda do asdict)."""
+    return {name: getattr(row, name) for name in row.__slots__}
+
+
+def _session_cache_keys(session_id: str) -> List[tuple]:
+    """Chaves de cache de uma sessão, na ordem context/messages/facts."""
+    return [("context", session_id), ("messages", session_id), ("facts", session_id)]
+
+
+def _orjson_default(obj: Any) -> Any:
+    """Fallback do orjson para objetos do SDK Zep (pydantic) e tipos desconhecidos."""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    return str(obj)
+
+
+class MemoryJSONResponse(ORJSONResponse):
+    """
+    Resposta serializada direto pelo orjson.
+    
+    Os endpoints retornam dicts prontos nesta classe, pulando o
+    jsonable_encoder e qualquer validação de response_model.
+    """
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=_orjson_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+
+
+router = APIRouter(default_response_class=MemoryJSONResponse)
+
+
+async def get_zep_client(request: Request) -> OptimizedZepClient:
+    """
+    Dependency para obter cliente Zep.
+    
+    Retorna o singleton criado no lifespan (app.state.zep), sem await;
+    mantida async para o FastAPI não despachar para o threadpool.
+    """
+    return request.app.state.zep
+
+
+async def get_cache(request: Request) -> Optional[RedisCache]:
+    """Dependency para o cache resolvido no lifespan (None se desabilitado/indisponível)."""
+    return getattr(request.app.state, "cache", None)
 
 
 @router.post(
     "/sessions/{session_id}/messages",
-    response_model=MemoryAddResponse,
     summary="Adicionar mensagens à memória",
     description="""
     Adiciona mensagens à memória de uma sessão. 
@@ -51,7 +191,7 @@ async def get_zep_client() -> OptimizedZepClient:
     - Diálogos de assistentes virtuais
     """,
     responses={
-        200: {"description": "Mensagens adicionadas com sucesso"},
+        200: {"model": MemoryAddResponse, "description": "Mensagens adicionadas com sucesso"},
         400: {"description": "Dados inválidos ou mensagens muito grandes"},
         500: {"description": "Erro interno do servidor ou Zep"}
     }
@@ -63,8 +203,9 @@ async def add_memory(
         max_length=100
     ),
     request: MemoryAddRequest = None,
-    zep_client: OptimizedZepClient = Depends(get_zep_client)
-) -> MemoryAddResponse:
+    zep_client: OptimizedZepClient = Depends(get_zep_client),
+    cache: Optional[RedisCache] = Depends(get_cache)
+) -> MemoryJSONResponse:
     """
     Adiciona mensagens à memória de uma sessão.
     
@@ -73,24 +214,26 @@ async def add_memory(
     - Contexto imediato com return_context=True
     - Validação de tamanho de mensagens
     """
+    bind_contextvars(session_id=session_id)
+    
     try:
-        logger.info(
-            "memory_add_request",
-            session_id=session_id,
-            message_count=len(request.messages),
-            return_context=request.return_context
-        )
+        if _INFO_ENABLED:
+            logger.info(
+                "memory_add_request",
+                message_count=len(request.messages),
+                return_context=request.return_context
+            )
         
-        # Converter mensagens para formato Zep
-        zep_messages = []
-        for msg in request.messages:
-            zep_message = Message(
+        # Converter mensagens para formato Zep (já validadas em MessageCreate)
+        zep_messages = [
+            _build_message(
                 role=msg.role,
                 role_type=msg.role_type,
                 content=msg.content,
                 metadata=msg.metadata or {}
             )
-            zep_messages.append(zep_message)
+            for msg in request.messages
+        ]
         
         # Adicionar à memória
         result = await zep_client.add_memory(
@@ -99,24 +242,27 @@ async def add_memory(
             return_context=request.return_context
         )
         
-        logger.info(
-            "memory_add_success",
-            session_id=session_id,
-            messages_added=result["messages_added"],
-            has_context=bool(result.get("context"))
-        )
+        # Estatísticas e memória cacheadas da sessão mudaram: um único DEL
+        if cache is not None:
+            await cache.delete_many([("stats", session_id), *_session_cache_keys(session_id)])
         
-        return MemoryAddResponse(
-            session_id=session_id,
-            messages_added=result["messages_added"],
-            context=result.get("context"),
-            success=True
-        )
+        if _INFO_ENABLED:
+            logger.info(
+                "memory_add_success",
+                messages_added=result["messages_added"],
+                has_context=bool(result.get("context"))
+            )
+        
+        return MemoryJSONResponse(content={
+            "session_id": session_id,
+            "messages_added": result["messages_added"],
+            "context": result.get("context"),
+            "success": True
+        })
         
     except Exception as e:
         logger.error(
             "memory_add_failed",
-            session_id=session_id,
             error=str(e),
             exc_info=True
         )
@@ -128,7 +274,6 @@ async def add_memory(
 
 @router.get(
     "/sessions/{session_id}/context",
-    response_model=MemoryResponse,
     summary="Obter contexto da memória",
     description="""
     Recupera o contexto completo da memória de uma sessão.
@@ -144,7 +289,7 @@ async def add_memory(
     - Cache automático para sessões ativas
     """,
     responses={
-        200: {"description": "Contexto recuperado com sucesso"},
+        200: {"model": MemoryResponse, "description": "Contexto recuperado com sucesso"},
         404: {"description": "Sessão não encontrada"},
         500: {"description": "Erro interno do servidor"}
     }
@@ -161,20 +306,40 @@ async def get_memory_context(
         le=100,
         description="Número de mensagens recentes para incluir"
     ),
-    zep_client: OptimizedZepClient = Depends(get_zep_client)
-) -> MemoryResponse:
+    zep_client: OptimizedZepClient = Depends(get_zep_client),
+    cache: Optional[RedisCache] = Depends(get_cache)
+) -> MemoryJSONResponse:
     """
     Recupera o contexto completo da memória de uma sessão.
     
     Otimizado para uso em prompts de LLM com context string
-    pré-formatada e fatos relevantes organizados.
+    pré-formatada e fatos relevantes organizados. Sem last_n, as três
+    partes vêm do cache em um único MGET quando presentes.
     """
+    bind_contextvars(session_id=session_id)
+    
     try:
-        logger.info(
-            "memory_get_request",
-            session_id=session_id,
-            last_n=last_n
+        if _INFO_ENABLED:
+            logger.info(
+                "memory_get_request",
+                last_n=last_n
+            )
+        
+        use_cache = (
+            cache is not None and last_n is None and settings.memory_context_cache_ttl > 0
         )
+        if use_cache:
+            cached_context, cached_messages, cached_facts = await cache.get_many(
+                _session_cache_keys(session_id)
+            )
+            if None not in (cached_context, cached_messages, cached_facts):
+                return MemoryJSONResponse(content={
+                    "session_id": session_id,
+                    "context": cached_context["value"],
+                    "messages": cached_messages,
+                    "relevant_facts": cached_facts,
+                    "success": True
+                })
         
         # Obter memória do Zep
         result = await zep_client.get_memory(
@@ -182,50 +347,53 @@ async def get_memory_context(
             last_n=last_n
         )
         
-        # Converter mensagens para formato de resposta
-        messages = []
-        if result.get("messages"):
-            for msg in result["messages"]:
-                messages.append({
-                    "role": msg.role,
-                    "role_type": msg.role_type,
-                    "content": msg.content,
-                    "metadata": msg.metadata,
-                    "created_at": getattr(msg, 'created_at', None)
-                })
+        # Converter para structs de saída (sem dicts intermediários)
+        messages = [
+            MessageOut(
+                msg.role,
+                msg.role_type,
+                msg.content,
+                msg.metadata,
+                getattr(msg, 'created_at', None)
+            )
+            for msg in result.get("messages") or ()
+        ]
         
-        # Converter fatos relevantes
-        facts = []
-        if result.get("relevant_facts"):
-            for fact in result["relevant_facts"]:
-                facts.append({
-                    "fact": fact.fact if hasattr(fact, 'fact') else str(fact),
-                    "entity": getattr(fact, 'entity', None),
-                    "valid_at": getattr(fact, 'valid_at', None),
-                    "invalid_at": getattr(fact, 'invalid_at', None),
-                    "confidence": getattr(fact, 'confidence', None)
-                })
+        facts = [_to_fact_out(fact) for fact in result.get("relevant_facts") or ()]
         
-        logger.info(
-            "memory_get_success",
-            session_id=session_id,
-            has_context=bool(result.get("context")),
-            message_count=len(messages),
-            facts_count=len(facts)
-        )
+        if use_cache:
+            await cache.set_many(
+                list(zip(
+                    _session_cache_keys(session_id),
+                    (
+                        # Envolvido em dict: um contexto None precisa sobreviver ao cache
+                        {"value": result.get("context")},
+                        [_row_dict(msg) for msg in messages],
+                        [_row_dict(fact) for fact in facts]
+                    )
+                )),
+                ttl=settings.memory_context_cache_ttl
+            )
         
-        return MemoryResponse(
-            session_id=session_id,
-            context=result.get("context"),
-            messages=messages,
-            relevant_facts=facts,
-            success=True
-        )
+        if _INFO_ENABLED:
+            logger.info(
+                "memory_get_success",
+                has_context=bool(result.get("context")),
+                message_count=len(messages),
+                facts_count=len(facts)
+            )
+        
+        return MemoryJSONResponse(content={
+            "session_id": session_id,
+            "context": result.get("context"),
+            "messages": messages,
+            "relevant_facts": facts,
+            "success": True
+        })
         
     except Exception as e:
         logger.error(
             "memory_get_failed",
-            session_id=session_id,
             error=str(e),
             exc_info=True
         )
@@ -244,7 +412,6 @@ async def get_memory_context(
 
 @router.get(
     "/sessions/{session_id}/messages",
-    response_model=dict,
     summary="Listar mensagens da sessão",
     description="""
     Lista as mensagens de uma sessão com paginação.
@@ -267,40 +434,50 @@ async def list_session_messages(
     zep_client: OptimizedZepClient = Depends(get_zep_client)
 ):
     """Lista mensagens de uma sessão com paginação."""
+    bind_contextvars(session_id=session_id)
+    
     try:
         # Por enquanto, usar get_memory com last_n
         # Em implementação futura, adicionar paginação específica
         result = await zep_client.get_memory(session_id=session_id, last_n=limit)
         
-        messages = []
-        if result.get("messages"):
-            for msg in result["messages"]:
-                if role is None or msg.role == role:
-                    messages.append({
-                        "role": msg.role,
-                        "role_type": msg.role_type,
-                        "content": msg.content,
-                        "metadata": msg.metadata,
-                        "created_at": getattr(msg, 'created_at', None)
-                    })
+        raw_messages = result.get("messages") or []
         
-        return {
+        # Só a página vira dict; o total é contado sem materializar o restante
+        if role is None:
+            filtered = iter(raw_messages)
+            total_count = len(raw_messages)
+        else:
+            filtered = (msg for msg in raw_messages if msg.role == role)
+            total_count = sum(1 for msg in raw_messages if msg.role == role)
+        
+        messages = [
+            {
+                "role": msg.role,
+                "role_type": msg.role_type,
+                "content": msg.content,
+                "metadata": msg.metadata,
+                "created_at": getattr(msg, 'created_at', None)
+            }
+            for msg in islice(filtered, offset, offset + limit)
+        ]
+        
+        return MemoryJSONResponse(content={
             "session_id": session_id,
-            "messages": messages[offset:offset+limit],
-            "total_count": len(messages),
+            "messages": messages,
+            "total_count": total_count,
             "limit": limit,
             "offset": offset,
-            "has_more": len(messages) > offset + limit
-        }
+            "has_more": total_count > offset + limit
+        })
         
     except Exception as e:
-        logger.error("list_messages_failed", session_id=session_id, error=str(e))
+        logger.error("list_messages_failed", error=str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post(
     "/users/{user_id}/search",
-    response_model=MemorySearchResponse,
     summary="Buscar na memória do usuário",
     description="""
     Busca híbrida (semântica + BM25) na memória de um usuário.
@@ -316,7 +493,7 @@ async def list_session_messages(
     - Cache automático para queries frequentes
     """,
     responses={
-        200: {"description": "Busca realizada com sucesso"},
+        200: {"model": MemorySearchResponse, "description": "Busca realizada com sucesso"},
         400: {"description": "Query inválida ou muito longa"}
     }
 )
@@ -324,20 +501,21 @@ async def search_user_memory(
     user_id: str = Path(description="ID único do usuário"),
     request: MemorySearchRequest = None,
     zep_client: OptimizedZepClient = Depends(get_zep_client)
-) -> MemorySearchResponse:
+) -> MemoryJSONResponse:
     """
     Busca híbrida na memória de um usuário.
     
     Combina busca semântica e BM25 para máxima relevância.
     """
     try:
-        logger.info(
-            "memory_search_request",
-            user_id=user_id,
-            query=request.query,
-            search_scope=request.search_scope,
-            limit=request.limit
-        )
+        if _INFO_ENABLED:
+            logger.info(
+                "memory_search_request",
+                user_id=user_id,
+                query=request.query,
+                search_scope=request.search_scope,
+                limit=request.limit
+            )
         
         # Realizar busca
         result = await zep_client.search_memory(
@@ -348,30 +526,23 @@ async def search_user_memory(
         )
         
         # Converter resultados
-        search_results = []
-        if result.get("results"):
-            for res in result["results"]:
-                search_results.append({
-                    "content": res.content if hasattr(res, 'content') else str(res),
-                    "score": getattr(res, 'score', None),
-                    "metadata": getattr(res, 'metadata', {}),
-                    "fact": getattr(res, 'fact', None)
-                })
+        search_results = list(map(_to_search_result, result.get("results") or ()))
         
-        logger.info(
-            "memory_search_success",
-            user_id=user_id,
-            query=request.query,
-            results_count=len(search_results)
-        )
+        if _INFO_ENABLED:
+            logger.info(
+                "memory_search_success",
+                user_id=user_id,
+                query=request.query,
+                results_count=len(search_results)
+            )
         
-        return MemorySearchResponse(
-            user_id=user_id,
-            query=request.query,
-            results=search_results,
-            total_count=len(search_results),
-            success=True
-        )
+        return MemoryJSONResponse(content={
+            "user_id": user_id,
+            "query": request.query,
+            "results": search_results,
+            "total_count": len(search_results),
+            "success": True
+        })
         
     except Exception as e:
         logger.error(
@@ -415,19 +586,16 @@ async def delete_session(
     
     ATENÇÃO: Operação irreversível!
     """
+    bind_contextvars(session_id=session_id)
+    
     try:
-        logger.warning(
-            "session_delete_request",
-            session_id=session_id
-        )
+        logger.warning("session_delete_request")
         
         # TODO: Implementar delete session no Zep client wrapper
         # Por enquanto, retornar placeholder
         
-        logger.info(
-            "session_delete_success",
-            session_id=session_id
-        )
+        if _INFO_ENABLED:
+            logger.info("session_delete_success")
         
         return {
             "session_id": session_id,
@@ -438,7 +606,6 @@ async def delete_session(
     except Exception as e:
         logger.error(
             "session_delete_failed",
-            session_id=session_id,
             error=str(e),
             exc_info=True
         )
@@ -450,7 +617,6 @@ async def delete_session(
 
 @router.get(
     "/sessions/{session_id}/stats",
-    response_model=MemoryStatsResponse,
     summary="Estatísticas da sessão",
     description="""
     Retorna estatísticas detalhadas de uma sessão.
@@ -463,33 +629,47 @@ async def delete_session(
     - Distribuição por roles
     """,
     responses={
-        200: {"description": "Estatísticas recuperadas"},
+        200: {"model": MemoryStatsResponse, "description": "Estatísticas recuperadas"},
         404: {"description": "Sessão não encontrada"}
     }
 )
 async def get_session_stats(
     session_id: str = Path(description="ID único da sessão"),
-    zep_client: OptimizedZepClient = Depends(get_zep_client)
-) -> MemoryStatsResponse:
-    """Recupera estatísticas detalhadas de uma sessão."""
+    zep_client: OptimizedZepClient = Depends(get_zep_client),
+    cache: Optional[RedisCache] = Depends(get_cache)
+) -> MemoryJSONResponse:
+    """
+    Recupera estatísticas detalhadas de uma sessão.
+    
+    Cacheadas por settings.session_stats_cache_ttl e invalidadas em
+    add_memory, evitando buscar a memória inteira a cada polling.
+    """
+    bind_contextvars(session_id=session_id)
+    
     try:
-        # Obter dados da sessão
-        result = await zep_client.get_memory(session_id=session_id)
+        if cache is not None:
+            stats = await cache.get("stats", session_id)
+            if stats is not None:
+                return MemoryJSONResponse(content=stats)
         
-        message_count = len(result.get("messages", []))
-        facts_count = len(result.get("relevant_facts", []))
-        context_length = len(result.get("context", ""))
+        # Só contagens: sem transferir todas as mensagens da sessão
+        counts = await zep_client.get_memory_counts(session_id=session_id)
         
-        return MemoryStatsResponse(
-            session_id=session_id,
-            total_messages=message_count,
-            total_facts=facts_count,
-            context_length=context_length,
-            last_activity=None  # TODO: Implementar tracking de última atividade
-        )
+        stats = {
+            "session_id": session_id,
+            "total_messages": counts["message_count"],
+            "total_facts": counts["facts_count"],
+            "context_length": counts["context_length"],
+            "last_activity": None  # TODO: Implementar tracking de última atividade
+        }
+        
+        if cache is not None:
+            await cache.set("stats", session_id, value=stats, ttl=settings.session_stats_cache_ttl)
+        
+        return MemoryJSONResponse(content=stats)
         
     except Exception as e:
-        logger.error("session_stats_failed", session_id=session_id, error=str(e))
+        logger.error("session_stats_failed", error=str(e))
         if "not found" in str(e).lower():
             raise HTTPException(status_code=404, detail="Session not found")
         raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
@@ -4,12 +4,12 @@ Gerenciamento de usuários no sistema Zep.
 """
 
 import structlog
-from fastapi import APIRouter, HTTPException, Depends, Path
+from fastapi import APIRouter, HTTPException, Depends, Path, Request
 from pydantic import BaseModel, Field, ConfigDict
 from typing import Optional, Dict, Any
 
 from src.core.config import settings
-from src.core.zep_client.client import get_zep_client_sync, OptimizedZepClient
+from src.core.zep_client.client import OptimizedZepClient
 
 logger = structlog.get_logger(__name__)
 router = APIRouter()
@@ -35,9 +35,14 @@ class UserCreateRequest(BaseModel):
     )
 
 
-async def get_zep_client() -> OptimizedZepClient:
-    """Dependency para obter cliente Zep."""
-    return await get_zep_client_sync()
+async def get_zep_client(request: Request) -> OptimizedZepClient:
+    """
+    Dependency para obter cliente Zep.
+    
+    Retorna o singleton criado no lifespan (app.state.zep), sem await;
+    mantida async para o FastAPI não despachar para o threadpool.
+    """
+    return request.app.state.zep
 
 
 @router.post("/{user_id}", summary="Criar usuário")
@@ -6,6 +6,7 @@ from .jwt_auth import (
     create_access_token,
     verify_token,
     get_current_user,
+    current_user_dependency,
     get_current_admin_user,
     create_api_key,
     TokenData,
@@ -21,6 +22,7 @@ __all__ = [
     "create_access_token",
     "verify_token", 
     "get_current_user",
+    "current_user_dependency",
     "get_current_admin_user",
     "create_api_key",
     "TokenData",
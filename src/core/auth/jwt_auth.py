@@ -3,9 +3,15 @@ Sistema de autenticação JWT para a API.
 Implementa geração, validação e middleware de autenticação.
 """
 
+import base64
+import hashlib
+import hmac
+import time
+import orjson
 from jose import jwt, JWTError
+from jose.exceptions import ExpiredSignatureError
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from fastapi import HTTPException, Security, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import structlog
@@ -16,8 +22,81 @@ logger = structlog.get_logger(__name__)
 
 # Configuração do JWT
 ALGORITHM = "HS256"
+_ALGORITHMS = [ALGORITHM]
 security = HTTPBearer()
 
+# Header HS256 é o mesmo para todo token: serializado e codificado uma vez
+# (mesmos bytes que o python-jose gera)
+_HEADER_B64 = base64.urlsafe_b64encode(
+    orjson.dumps({"alg": ALGORITHM, "typ": "JWT"})
+).rstrip(b"=")
+
+# Claims emitidos por create_access_token; outros formatos vão para o python-jose
+_FAST_PATH_CLAIMS = frozenset({"sub", "scopes", "exp", "iat"})
+
+
+# HMAC com o key schedule (ipad/opad) já aplicado; .copy() por token
+_hmac_template: Tuple[Optional[str], Any] = (None, None)
+
+
+def _new_hmac(secret: str) -> "hmac.HMAC":
+    """HMAC-SHA256 pronto para update, reaproveitando o key schedule do secret atual."""
+    global _hmac_template
+    cached_secret, template = _hmac_template
+    if cached_secret is not secret:
+        template = hmac.new(secret.encode(), None, hashlib.sha256)
+        _hmac_template = (secret, template)
+    return template.copy()
+
+
+def _b64decode(segment: bytes) -> bytes:
+    return base64.urlsafe_b64decode(segment + b"=" * (-len(segment) % 4))
+
+
+def _sign(claims: Dict[str, Any], secret: str) -> str:
+    """Assina claims em HS256 sem passar pelas camadas do python-jose."""
+    body = base64.urlsafe_b64encode(orjson.dumps(claims)).rstrip(b"=")
+    signing_input = _HEADER_B64 + b"." + body
+    mac = _new_hmac(secret)
+    mac.update(signing_input)
+    signature = mac.digest()
+    return (signing_input + b"." + base64.urlsafe_b64encode(signature).rstrip(b"=")).decode()
+
+
+def _decode(token: str, secret: str) -> Dict[str, Any]:
+    """
+    Decodifica um token HS256 no formato emitido por _sign.
+    
+    Qualquer token fora desse formato (header diferente, claims extras,
+    encoding inválido) é delegado ao python-jose, que mantém as mesmas
+    exceções e mensagens de erro.
+    """
+    try:
+        header, body, signature = token.encode().split(b".")
+        if header != _HEADER_B64:
+            raise ValueError("unexpected header")
+        payload = orjson.loads(_b64decode(body))
+        signature = _b64decode(signature)
+        if not (isinstance(payload, dict)
+                and payload.keys() <= _FAST_PATH_CLAIMS
+                and isinstance(payload.get("sub"), str)
+                and isinstance(payload.get("exp", 0), int)
+                and isinstance(payload.get("iat", 0), int)):
+            raise ValueError("unexpected claims")
+    except ValueError:
+        return jwt.decode(token, secret, algorithms=_ALGORITHMS)
+    
+    mac = _new_hmac(secret)
+    mac.update(header + b"." + body)
+    if not hmac.compare_digest(signature, mac.digest()):
+        raise JWTError("Signature verification failed.")
+    
+    exp = payload.get("exp")
+    if exp is not None and exp < int(time.time()):
+        raise ExpiredSignatureError("Signature has expired.")
+    
+    return payload
+
 
 class AuthError(Exception):
     """Erro customizado para operações JWT."""
@@ -30,6 +109,8 @@ class TokenData:
     def __init__(self, user_id: str, scopes: list = None, exp: datetime = None):
         self.user_id = user_id
         self.scopes = scopes or []
+        # Versão hasheada para checagens de escopo em C (sem varrer a lista)
+        self.scope_set = frozenset(self.scopes)
         self.exp = exp
 
 
@@ -58,18 +139,17 @@ def create_access_token(
         if scopes:
             to_encode["scopes"] = scopes
             
+        # Epoch inteiro direto (formato canônico do JWT), sem objetos datetime
+        now = int(time.time())
         if expires_delta:
-            expire = datetime.utcnow() + expires_delta
+            expire = now + int(expires_delta.total_seconds())
         else:
-            expire = datetime.utcnow() + timedelta(hours=settings.token_expire_hours)
+            expire = now + settings.token_expire_hours * 3600
             
-        to_encode.update({"exp": expire, "iat": datetime.utcnow()})
+        to_encode["exp"] = expire
+        to_encode["iat"] = now
         
-        encoded_jwt = jwt.encode(
-            to_encode,
-            settings.api_secret_key,
-            algorithm=ALGORITHM
-        )
+        encoded_jwt = _sign(to_encode, settings.api_secret_key)
         
         logger.info(
             "jwt_token_created",
@@ -85,10 +165,17 @@ def create_access_token(
         raise AuthError(f"Failed to create token: {e}")
 
 
+# Tokens já verificados: token -> (TokenData, válido até [epoch], secret usado)
+_token_cache: Dict[str, Tuple[TokenData, float, str]] = {}
+
+
 def verify_token(token: str) -> TokenData:
     """
     Verifica e decodifica um token JWT.
     
+    Tokens válidos ficam em cache por até settings.token_cache_ttl
+    (nunca além do exp), evitando HMAC e parse a cada request.
+    
     Args:
         token: Token JWT para verificar
         
@@ -98,19 +185,26 @@ def verify_token(token: str) -> TokenData:
     Raises:
         JWTError: Se o token for inválido
     """
+    secret = settings.api_secret_key
+    now = time.time()
+    
+    cached = _token_cache.get(token)
+    if cached is not None:
+        token_data, valid_until, cached_secret = cached
+        if now < valid_until and cached_secret is secret:
+            return token_data
+        del _token_cache[token]
+    
     try:
-        payload = jwt.decode(
-            token,
-            settings.api_secret_key,
-            algorithms=[ALGORITHM]
-        )
+        payload = _decode(token, secret)
         
         user_id: str = payload.get("sub")
         if user_id is None:
             raise AuthError("Token missing user ID")
             
         scopes: list = payload.get("scopes", [])
-        exp: datetime = datetime.fromtimestamp(payload.get("exp", 0))
+        exp_ts = payload.get("exp", 0)
+        exp: datetime = datetime.fromtimestamp(exp_ts)
         
         logger.debug(
             "jwt_token_verified",
@@ -119,7 +213,18 @@ def verify_token(token: str) -> TokenData:
             expires_at=exp
         )
         
-        return TokenData(user_id=user_id, scopes=scopes, exp=exp)
+        token_data = TokenData(user_id=user_id, scopes=scopes, exp=exp)
+        
+        if settings.token_cache_ttl > 0:
+            # Limite simples: descarta o token mais antigo (ordem de inserção)
+            if len(_token_cache) >= settings.token_cache_size:
+                del _token_cache[next(iter(_token_cache))]
+            valid_until = now + settings.token_cache_ttl
+            if exp_ts:
+                valid_until = min(valid_until, exp_ts)
+            _token_cache[token] = (token_data, valid_until, secret)
+        
+        return token_data
         
     except jwt.ExpiredSignatureError:
         logger.warning("jwt_token_expired", token_prefix=token[:20])
@@ -149,8 +254,7 @@ async def get_current_user(
     """
     if not settings.auth_enabled:
         # Modo desenvolvimento sem autenticação
-        logger.debug("auth_disabled_dev_mode")
-        return TokenData(user_id="dev_user", scopes=["admin"])
+        return _DEV_USER
     
     try:
         token = credentials.credentials
@@ -173,8 +277,21 @@ async def get_current_user(
         )
 
 
+# Usuário fixo do modo sem autenticação, criado uma vez
+_DEV_USER = TokenData(user_id="dev_user", scopes=["admin", "read", "write"])
+
+
+async def _get_dev_user() -> TokenData:
+    """Dependency do modo sem auth: não lê o header Authorization."""
+    return _DEV_USER
+
+
+# Escolhida no import: com auth desabilitada o FastAPI nem passa pelo HTTPBearer
+current_user_dependency = get_current_user if settings.auth_enabled else _get_dev_user
+
+
 async def get_current_admin_user(
-    current_user: TokenData = Depends(get_current_user)
+    current_user: TokenData = Depends(current_user_dependency)
 ) -> TokenData:
     """
     Dependency para verificar se usuário tem permissões de admin.
@@ -188,7 +305,7 @@ async def get_current_admin_user(
     Raises:
         HTTPException: Se usuário não for admin
     """
-    if "admin" not in current_user.scopes:
+    if "admin" not in current_user.scope_set:
         logger.warning(
             "admin_access_denied",
             user_id=current_user.user_id,
@@ -264,15 +381,16 @@ class RequireScopes:
     
     def __init__(self, required_scopes: list):
         self.required_scopes = required_scopes
+        self._required = frozenset(required_scopes)
     
-    def __call__(self, current_user: TokenData = Depends(get_current_user)) -> TokenData:
+    def __call__(self, current_user: TokenData = Depends(current_user_dependency)) -> TokenData:
         """Verifica se usuário tem escopos necessários."""
-        missing_scopes = [
-            scope for scope in self.required_scopes 
-            if scope not in current_user.scopes
-        ]
-        
-        if missing_scopes:
+        if not self._required <= current_user.scope_set:
+            # Caminho de erro: lista na ordem declarada para a mensagem
+            missing_scopes = [
+                scope for scope in self.required_scopes
+                if scope not in current_user.scope_set
+            ]
             logger.warning(
                 "insufficient_scopes",
                 user_id=current_user.user_id,
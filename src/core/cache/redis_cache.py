@@ -3,18 +3,97 @@ Sistema de cache Redis para a API.
 Implementa cache inteligente para respostas frequentes e sessões ativas.
 """
 
-import json
+import asyncio
 import hashlib
-from typing import Any, Optional, Dict, List, Union
+import inspect
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Optional, Dict, List, Tuple
 from datetime import datetime, timedelta
+import orjson
 import structlog
 import redis.asyncio as redis
+from redis.utils import HIREDIS_AVAILABLE
 from contextlib import asynccontextmanager
+from functools import lru_cache
 
-from src.core.config import settings
+from src.core.config import settings, on_settings_change
+from src.core.resilience import get_circuit_breaker
 
 logger = structlog.get_logger(__name__)
 
+# Circuit breaker do cache: com ele aberto as operações respondem sem I/O
+# (default/False/0) em vez de esperar o Redis durante uma falha de rede
+_breaker = get_circuit_breaker("cache")
+
+# Flags lidas em toda operação, copiadas para globais do módulo
+_CACHE_ENABLED = settings.cache_enabled
+_CACHE_TTL = settings.cache_ttl
+_COMPRESSION_MIN_SIZE = settings.cache_compression_min_size
+_LOCAL_TTL = settings.cache_local_ttl
+_LOCAL_SIZE = settings.cache_local_size
+
+
+def reload_settings() -> None:
+    """Recarrega as flags do cache a partir de settings."""
+    global _CACHE_ENABLED, _CACHE_TTL, _COMPRESSION_MIN_SIZE, _LOCAL_TTL, _LOCAL_SIZE
+    _CACHE_ENABLED = settings.cache_enabled
+    _CACHE_TTL = settings.cache_ttl
+    _COMPRESSION_MIN_SIZE = settings.cache_compression_min_size
+    _LOCAL_TTL = settings.cache_local_ttl
+    _LOCAL_SIZE = settings.cache_local_size
+
+
+on_settings_change(
+    ("cache_enabled", "cache_ttl", "cache_compression_min_size", "cache_local_ttl", "cache_local_size"),
+    reload_settings
+)
+
+# Chaves não-string (ex: int) viram string, como fazia o json.dumps
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+# Hash com os contadores de hit/miss
+_STATS_KEY = "zep_api:stats:cache"
+_STATS_KEYS = (_STATS_KEY,)
+
+# Multiplicadores de TTL por tipo de dados (prefixo da chave)
+_TTL_MULTIPLIERS = {
+    "memory": 1.5,    # Contextos de memória duram mais
+    "session": 2.0,   # Sessões ativas duram ainda mais
+    "user": 3.0,      # Dados de usuário são mais estáveis
+    "health": 0.1,    # Health checks são muito voláteis
+    "metrics": 0.5,   # Métricas mudam rapidamente
+}
+
+# Incremento dos contadores de hit/miss + expiração (24h) executados no servidor
+_STATS_SCRIPT = """
+if tonumber(ARGV[1]) > 0 then redis.call('HINCRBY', KEYS[1], 'hits', ARGV[1]) end
+if tonumber(ARGV[2]) > 0 then redis.call('HINCRBY', KEYS[1], 'misses', ARGV[2]) end
+redis.call('EXPIRE', KEYS[1], 86400)
+"""
+
+# Canal onde o Redis publica invalidações do client tracking (modo REDIRECT)
+_INVALIDATE_CHANNEL = "__redis__:invalidate"
+
+# Tamanho dos lotes de SCAN/UNLINK em clear_pattern
+_CLEAR_BATCH_SIZE = 500
+
+# Prefixo dos valores comprimidos; JSON nunca começa com esse byte, então
+# valores pequenos (e os gravados antes da compressão) seguem sem marcação
+_COMPRESSED_TAG = b"\x01"
+
+
+@lru_cache(maxsize=10_000)
+def _build_key(prefix: str, key_parts: tuple) -> str:
+    """Monta a chave de cache; memoizado para sessões quentes (acesso Zipf)."""
+    key_hash = hashlib.blake2b(":".join(key_parts).encode(), digest_size=8).hexdigest()
+    return f"zep_api:{prefix}:{key_hash}"
+
+
+# Serializa a criação do pool entre chamadas concorrentes de initialize()
+_pool_lock = asyncio.Lock()
+
 
 class CacheError(Exception):
     """Erro customizado para operações de cache."""
@@ -34,6 +113,18 @@ class RedisCache:
     
     _instance: Optional["RedisCache"] = None
     _redis_pool: Optional[redis.Redis] = None
+    _stats_script = None
+    # Contadores de hit/miss acumulados em processo até o próximo flush
+    _hits: int = 0
+    _misses: int = 0
+    _stats_flush_task: Optional[asyncio.Task] = None
+    # L1 em processo: chave -> (expira_em, valor serializado)
+    _local: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+    # Conexões dedicadas (listener, tracker) e task de invalidação do L1
+    _tracking_connections: Tuple = ()
+    _tracking_task: Optional[asyncio.Task] = None
+    # Último INFO lido: (expira_em, campos)
+    _info_cache: Tuple[float, Dict[str, Any]] = (0.0, {})
     
     def __new__(cls) -> "RedisCache":
         """Implementa singleton pattern."""
@@ -43,40 +134,143 @@ class RedisCache:
     
     async def initialize(self) -> None:
         """Inicializa o pool de conexões Redis."""
-        if self._redis_pool is None:
+        if self._redis_pool is not None:
+            return
+        
+        # Double-checked: chamadas concorrentes criam um único pool
+        async with _pool_lock:
+            if self._redis_pool is not None:
+                return
+            
+            if not HIREDIS_AVAILABLE:
+                # Sem hiredis o redis-py usa o parser RESP em Python puro
+                logger.warning("redis_hiredis_unavailable")
+            
+            # Keepalive só existe em conexões TCP; unix:// usa socket local
+            tcp_options: Dict[str, Any] = {}
+            if not settings.redis_url.startswith("unix://"):
+                tcp_options = {"socket_keepalive": True, "socket_keepalive_options": {}}
+            
             try:
-                self._redis_pool = redis.from_url(
+                # Pool bloqueante: sob pico, aguarda conexão livre em vez de
+                # falhar com ConnectionError
+                pool = redis.BlockingConnectionPool.from_url(
                     settings.redis_url,
                     password=settings.redis_password,
                     db=settings.redis_db,
                     encoding="utf-8",
-                    decode_responses=True,
-                    max_connections=20,
+                    max_connections=settings.redis_pool_size,
+                    timeout=settings.redis_pool_timeout,
                     retry_on_timeout=True,
-                    socket_keepalive=True,
-                    socket_keepalive_options={},
-                    health_check_interval=30
+                    health_check_interval=30,
+                    **tcp_options
                 )
+                client = redis.Redis.from_pool(pool)
                 
-                # Testar conexão
-                await self._redis_pool.ping()
+                # Testar conexão antes de publicar o cliente
+                await client.ping()
+                self._redis_pool = client
                 
                 logger.info(
                     "redis_cache_initialized",
                     redis_url=settings.redis_url.split('@')[-1],  # Remove credenciais do log
                     db=settings.redis_db,
-                    max_connections=20
+                    max_connections=settings.redis_pool_size,
+                    hiredis=HIREDIS_AVAILABLE
                 )
                 
             except Exception as e:
                 logger.error("redis_initialization_failed", error=str(e))
                 raise CacheError(f"Failed to initialize Redis: {e}")
+            
+            if settings.cache_client_tracking and _LOCAL_TTL > 0:
+                await self._start_tracking()
+            
+            self._stats_flush_task = asyncio.create_task(self._flush_stats_loop())
+    
+    async def _start_tracking(self) -> None:
+        """
+        Liga o client tracking do Redis (BCAST) para invalidar o L1.
+        
+        Uma conexão dedicada assina o canal de invalidações e outra ativa o
+        tracking redirecionado para ela; escritas de qualquer processo em
+        chaves zep_api:* chegam como push e removem a entrada local. Sem
+        suporte no servidor (Redis < 6), o L1 segue limitado apenas pelo TTL.
+        """
+        pool = self.redis.connection_pool
+        listener = pool.make_connection()
+        tracker = pool.make_connection()
+        
+        try:
+            await listener.connect()
+            await listener.send_command("CLIENT", "ID")
+            listener_id = await listener.read_response()
+            await listener.send_command("SUBSCRIBE", _INVALIDATE_CHANNEL)
+            await listener.read_response()
+            
+            await tracker.connect()
+            await tracker.send_command(
+                "CLIENT", "TRACKING", "ON", "REDIRECT", listener_id, "BCAST", "PREFIX", "zep_api:"
+            )
+            await tracker.read_response()
+            
+        except Exception as e:
+            await listener.disconnect()
+            await tracker.disconnect()
+            logger.warning("cache_client_tracking_unavailable", error=str(e))
+            return
+        
+        self._tracking_connections = (listener, tracker)
+        self._tracking_task = asyncio.create_task(self._listen_invalidations(listener))
+        logger.info("cache_client_tracking_enabled")
+    
+    async def _listen_invalidations(self, listener) -> None:
+        """Consome as invalidações publicadas pelo Redis e limpa o L1."""
+        try:
+            while True:
+                message = await listener.read_response()
+                if message and message[0] == b"message":
+                    self._invalidate_local(message[2])
+        
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Sem invalidações o L1 pode ficar defasado: descarta e segue só com TTL
+            self._local.clear()
+            logger.warning("cache_client_tracking_lost", error=str(e))
+    
+    def _invalidate_local(self, keys: Optional[List[bytes]]) -> None:
+        """Remove chaves invalidadas do L1 (None = FLUSHDB/FLUSHALL no servidor)."""
+        if keys is None:
+            self._local.clear()
+            return
+        
+        for key in keys:
+            self._local.pop(key.decode(), None)
+    
+    async def _stop_tracking(self) -> None:
+        """Encerra a task e as conexões do client tracking."""
+        if self._tracking_task is not None:
+            self._tracking_task.cancel()
+            self._tracking_task = None
+        
+        for connection in self._tracking_connections:
+            await connection.disconnect()
+        self._tracking_connections = ()
     
     async def close(self) -> None:
         """Fecha o pool de conexões."""
         if self._redis_pool:
+            if self._stats_flush_task is not None:
+                self._stats_flush_task.cancel()
+                self._stats_flush_task = None
+            await self._flush_stats()
+            await self._stop_tracking()
             await self._redis_pool.close()
             self._redis_pool = None
+            self._stats_script = None
+            self._local.clear()
+            self._info_cache = (0.0, {})
             logger.info("redis_cache_closed")
     
     @property
@@ -95,14 +289,11 @@ class RedisCache:
             *args: Argumentos para compor a chave
             
         Returns:
-            Chave de cache SHA256 com prefixo legível
+            Chave de cache BLAKE2b (64 bits) com prefixo legível
         """
-        key_parts = [str(arg) for arg in args]
-        key_string = ":".join(key_parts)
-        key_hash = hashlib.sha256(key_string.encode()).hexdigest()[:16]
-        return f"zep_api:{prefix}:{key_hash}"
+        return _build_key(prefix, tuple(map(str, args)))
     
-    def _serialize_data(self, data: Any) -> str:
+    def _serialize_data(self, data: Any) -> bytes:
         """
         Serializa dados para armazenamento.
         
@@ -110,53 +301,109 @@ class RedisCache:
             data: Dados para serializar
             
         Returns:
-            String JSON serializada
+            Bytes JSON serializados (orjson), comprimidos com zlib acima de
+            settings.cache_compression_min_size
         """
         try:
-            if isinstance(data, (dict, list)):
-                return json.dumps(data, default=str, ensure_ascii=False)
-            else:
-                return str(data)
-        except Exception as e:
+            payload = orjson.dumps(data, default=str, option=_ORJSON_OPTIONS)
+        except (orjson.JSONEncodeError, TypeError) as e:
             logger.warning("serialization_failed", error=str(e), data_type=type(data))
-            return str(data)
+            payload = orjson.dumps(str(data))
+        
+        if _COMPRESSION_MIN_SIZE and len(payload) > _COMPRESSION_MIN_SIZE:
+            return _COMPRESSED_TAG + zlib.compress(payload, 1)
+        return payload
     
-    def _deserialize_data(self, data: str) -> Any:
+    def _deserialize_data(self, data: bytes) -> Any:
         """
         Deserializa dados do cache.
         
         Args:
-            data: String serializada
+            data: Bytes lidos do Redis
             
         Returns:
             Dados deserializados
         """
         try:
-            return json.loads(data)
-        except (json.JSONDecodeError, TypeError):
-            return data
+            if data[:1] == _COMPRESSED_TAG:
+                data = zlib.decompress(data[1:])
+            return orjson.loads(data)
+        except (orjson.JSONDecodeError, zlib.error, TypeError):
+            # Valores antigos gravados como str(data), sem JSON
+            return data.decode("utf-8", "replace") if isinstance(data, bytes) else data
     
-    async def get(self, prefix: str, *key_parts: Any) -> Optional[Any]:
+    def _local_get(self, cache_key: str) -> Optional[bytes]:
+        """Retorna o valor serializado do cache local se ainda válido."""
+        entry = self._local.get(cache_key)
+        if entry is None:
+            return None
+        
+        expires_at, data = entry
+        if expires_at < time.monotonic():
+            self._local.pop(cache_key, None)
+            return None
+        
+        self._local.move_to_end(cache_key)
+        return data
+    
+    def _local_set(self, cache_key: str, data: bytes, ttl: Optional[float] = None) -> None:
+        """Armazena no cache local (nunca além do TTL do Redis), removendo os mais antigos (LRU)."""
+        local_ttl = _LOCAL_TTL if ttl is None else min(_LOCAL_TTL, ttl)
+        if local_ttl <= 0:
+            return
+        
+        self._local[cache_key] = (time.monotonic() + local_ttl, data)
+        self._local.move_to_end(cache_key)
+        while len(self._local) > _LOCAL_SIZE:
+            self._local.popitem(last=False)
+    
+    async def get(
+        self,
+        prefix: str,
+        *key_parts: Any,
+        default: Any = None,
+        count_stats: bool = True
+    ) -> Optional[Any]:
         """
         Recupera dados do cache.
         
         Args:
             prefix: Prefixo da chave
             *key_parts: Partes da chave
+            default: Retorno para chave ausente; um sentinela permite
+                distinguir ausência de um None armazenado
+            count_stats: Contabiliza hit/miss; False para releituras da mesma
+                consulta lógica (ex.: espera do lock de preenchimento)
             
         Returns:
-            Dados do cache ou None se não encontrado
+            Dados do cache ou default se não encontrado
         """
-        if not settings.cache_enabled:
-            return None
+        if not _CACHE_ENABLED:
+            return default
         
         try:
             cache_key = self._generate_key(prefix, *key_parts)
+            
+            # Chaves quentes são servidas do L1 sem round-trip ao Redis
+            local_data = self._local_get(cache_key)
+            if local_data is not None:
+                if count_stats:
+                    self._hits += 1
+                return self._deserialize_data(local_data)
+            
+            # Breaker aberto: responde sem I/O em vez de esperar o Redis
+            if not _breaker.allow_request():
+                return default
+            
             cached_data = await self.redis.get(cache_key)
+            _breaker.record_success()
             
             if cached_data is not None:
+                self._local_set(cache_key, cached_data)
+                
                 # Atualizar estatísticas de hit
-                await self._update_hit_stats(cache_key, hit=True)
+                if count_stats:
+                    self._hits += 1
                 
                 logger.debug(
                     "cache_hit",
@@ -168,21 +415,24 @@ class RedisCache:
                 return self._deserialize_data(cached_data)
             else:
                 # Atualizar estatísticas de miss
-                await self._update_hit_stats(cache_key, hit=False)
+                if count_stats:
+                    self._misses += 1
                 
                 logger.debug("cache_miss", prefix=prefix, key=cache_key)
-                return None
+                return default
                 
         except Exception as e:
+            _breaker.record_failure()
             logger.warning("cache_get_failed", error=str(e), prefix=prefix)
-            return None
+            return default
     
     async def set(
         self,
         prefix: str,
         *key_parts: Any,
         value: Any,
-        ttl: Optional[int] = None
+        ttl: Optional[int] = None,
+        only_if_absent: bool = False
     ) -> bool:
         """
         Armazena dados no cache.
@@ -192,11 +442,12 @@ class RedisCache:
             *key_parts: Partes da chave
             value: Valor para armazenar
             ttl: TTL em segundos (padrão: settings.cache_ttl)
+            only_if_absent: Grava apenas se a chave não existir (SET NX)
             
         Returns:
             True se armazenado com sucesso
         """
-        if not settings.cache_enabled:
+        if not _CACHE_ENABLED:
             return False
         
         try:
@@ -206,7 +457,18 @@ class RedisCache:
             # TTL dinâmico baseado no tipo de dados
             cache_ttl = ttl or self._calculate_dynamic_ttl(prefix, len(serialized_value))
             
-            await self.redis.setex(cache_key, cache_ttl, serialized_value)
+            if not _breaker.allow_request():
+                return False
+            
+            if only_if_absent:
+                written = await self.redis.set(cache_key, serialized_value, ex=cache_ttl, nx=True)
+                _breaker.record_success()
+                if not written:
+                    return False
+            else:
+                await self.redis.setex(cache_key, cache_ttl, serialized_value)
+                _breaker.record_success()
+            self._local_set(cache_key, serialized_value, cache_ttl)
             
             logger.debug(
                 "cache_set",
@@ -219,6 +481,7 @@ class RedisCache:
             return True
             
         except Exception as e:
+            _breaker.record_failure()
             logger.warning("cache_set_failed", error=str(e), prefix=prefix)
             return False
     
@@ -233,12 +496,17 @@ class RedisCache:
         Returns:
             True se removido com sucesso
         """
-        if not settings.cache_enabled:
+        if not _CACHE_ENABLED:
             return False
         
         try:
             cache_key = self._generate_key(prefix, *key_parts)
+            self._local.pop(cache_key, None)
+            if not _breaker.allow_request():
+                return False
+            
             deleted = await self.redis.delete(cache_key)
+            _breaker.record_success()
             
             logger.debug(
                 "cache_delete",
@@ -250,9 +518,160 @@ class RedisCache:
             return bool(deleted)
             
         except Exception as e:
+            _breaker.record_failure()
             logger.warning("cache_delete_failed", error=str(e), prefix=prefix)
             return False
     
+    async def get_many(self, keys: List[tuple]) -> List[Optional[Any]]:
+        """
+        Recupera várias chaves em um único round-trip (MGET).
+        
+        Args:
+            keys: Tuplas (prefix, *key_parts), como em get()
+            
+        Returns:
+            Valores na mesma ordem das chaves (None para miss ou erro)
+        """
+        if not _CACHE_ENABLED or not keys:
+            return [None] * len(keys)
+        
+        try:
+            cache_keys = [self._generate_key(*key) for key in keys]
+            values = [self._local_get(cache_key) for cache_key in cache_keys]
+            missing = [i for i, value in enumerate(values) if value is None]
+            self._hits += len(keys) - len(missing)
+            
+            # MGET apenas das chaves ausentes no L1
+            if missing and _breaker.allow_request():
+                fetched = await self.redis.mget([cache_keys[i] for i in missing])
+                _breaker.record_success()
+                
+                for i, value in zip(missing, fetched):
+                    if value is not None:
+                        values[i] = value
+                        self._local_set(cache_keys[i], value)
+                
+                hits = sum(value is not None for value in fetched)
+                self._hits += hits
+                self._misses += len(fetched) - hits
+            
+            return [
+                self._deserialize_data(value) if value is not None else None
+                for value in values
+            ]
+            
+        except Exception as e:
+            _breaker.record_failure()
+            logger.warning("cache_get_many_failed", error=str(e), keys=len(keys))
+            return [None] * len(keys)
+    
+    async def set_many(self, items: List[tuple], ttl: int) -> bool:
+        """
+        Armazena várias chaves em um único round-trip (pipeline de SETEX).
+        
+        Args:
+            items: Pares ((prefix, *key_parts), value)
+            ttl: TTL em segundos aplicado a todas as chaves
+            
+        Returns:
+            True se armazenado com sucesso
+        """
+        if not _CACHE_ENABLED or not items:
+            return False
+        
+        try:
+            serialized = [
+                (self._generate_key(*key), self._serialize_data(value))
+                for key, value in items
+            ]
+            if not _breaker.allow_request():
+                return False
+            
+            pipe = self.redis.pipeline(transaction=False)
+            for cache_key, data in serialized:
+                pipe.setex(cache_key, ttl, data)
+            await pipe.execute()
+            _breaker.record_success()
+            
+            for cache_key, data in serialized:
+                self._local_set(cache_key, data, ttl)
+            return True
+            
+        except Exception as e:
+            _breaker.record_failure()
+            logger.warning("cache_set_many_failed", error=str(e), keys=len(items))
+            return False
+    
+    async def delete_many(self, keys: List[tuple]) -> int:
+        """
+        Remove várias chaves com um único DEL.
+        
+        Args:
+            keys: Tuplas (prefix, *key_parts), como em delete()
+            
+        Returns:
+            Número de chaves removidas
+        """
+        if not _CACHE_ENABLED or not keys:
+            return 0
+        
+        try:
+            cache_keys = [self._generate_key(*key) for key in keys]
+            for cache_key in cache_keys:
+                self._local.pop(cache_key, None)
+            if not _breaker.allow_request():
+                return 0
+            
+            deleted = await self.redis.delete(*cache_keys)
+            _breaker.record_success()
+            return deleted
+            
+        except Exception as e:
+            _breaker.record_failure()
+            logger.warning("cache_delete_many_failed", error=str(e), keys=len(keys))
+            return 0
+    
+    async def acquire_fill_lock(self, prefix: str, *key_parts: Any) -> Any:
+        """
+        Tenta obter o lock de preenchimento de uma chave (SET NX EX).
+        
+        Garante que, em um miss concorrente, apenas um request recalcula o
+        valor enquanto os demais aguardam o resultado no cache.
+        
+        Returns:
+            Lock adquirido; False se outro request já está preenchendo a
+            chave; True se o lock não está disponível (segue sem lock)
+        """
+        if not _CACHE_ENABLED or not _breaker.allow_request():
+            return True
+        
+        try:
+            lock = self.redis.lock(
+                self._generate_key(prefix, *key_parts) + ":fill",
+                timeout=_FILL_LOCK_TTL,
+                blocking=False,
+                thread_local=False
+            )
+            acquired = await lock.acquire()
+            _breaker.record_success()
+            return lock if acquired else False
+            
+        except Exception as e:
+            _breaker.record_failure()
+            logger.debug("cache_fill_lock_failed", error=str(e), prefix=prefix)
+            return True
+    
+    async def release_fill_lock(self, lock: Any) -> None:
+        """Libera o lock de acquire_fill_lock (apenas se ainda for o dono)."""
+        if isinstance(lock, bool):
+            return
+        
+        try:
+            await lock.release()
+        except Exception as e:
+            # Lock já expirou ou foi tomado por outro request
+            logger.debug("cache_fill_lock_release_failed", error=str(e))
+    
     async def clear_pattern(self, pattern: str) -> int:
         """
         Remove todas as chaves que correspondem ao padrão.
@@ -264,18 +683,33 @@ class RedisCache:
             Número de chaves removidas
         """
         try:
-            keys = []
-            async for key in self.redis.scan_iter(match=pattern):
-                keys.append(key)
-            
-            if keys:
-                deleted = await self.redis.delete(*keys)
+            # UNLINK em lotes conforme o SCAN avança: trabalho limitado por
+            # comando e liberação de memória em background no Redis
+            # Padrões são globais; mais simples descartar todo o L1
+            self._local.clear()
+            
+            if not _breaker.allow_request():
+                return 0
+            
+            deleted = 0
+            batch = []
+            async for key in self.redis.scan_iter(match=pattern, count=_CLEAR_BATCH_SIZE):
+                batch.append(key)
+                if len(batch) >= _CLEAR_BATCH_SIZE:
+                    deleted += await self.redis.unlink(*batch)
+                    batch.clear()
+            
+            if batch:
+                deleted += await self.redis.unlink(*batch)
+            _breaker.record_success()
+            
+            if deleted:
                 logger.info("cache_pattern_cleared", pattern=pattern, deleted=deleted)
-                return deleted
             
-            return 0
+            return deleted
             
         except Exception as e:
+            _breaker.record_failure()
             logger.warning("cache_clear_pattern_failed", error=str(e), pattern=pattern)
             return 0
     
@@ -290,18 +724,10 @@ class RedisCache:
         Returns:
             TTL em segundos
         """
-        base_ttl = settings.cache_ttl
+        base_ttl = _CACHE_TTL
         
         # TTLs específicos por tipo de dados
-        ttl_multipliers = {
-            "memory": 1.5,    # Contextos de memória duram mais
-            "session": 2.0,   # Sessões ativas duram ainda mais
-            "user": 3.0,      # Dados de usuário são mais estáveis
-            "health": 0.1,    # Health checks são muito voláteis
-            "metrics": 0.5,   # Métricas mudam rapidamente
-        }
-        
-        multiplier = ttl_multipliers.get(prefix, 1.0)
+        multiplier = _TTL_MULTIPLIERS.get(prefix, 1.0)
         
         # Ajustar baseado no tamanho (dados maiores duram menos)
         if data_size > 10000:  # 10KB
@@ -311,28 +737,37 @@ class RedisCache:
         
         return int(base_ttl * multiplier)
     
-    async def _update_hit_stats(self, cache_key: str, hit: bool) -> None:
+    async def _flush_stats_loop(self) -> None:
+        """Envia os contadores locais ao Redis a cada settings.cache_stats_flush_interval."""
+        while True:
+            await asyncio.sleep(settings.cache_stats_flush_interval)
+            await self._flush_stats()
+    
+    async def _flush_stats(self) -> None:
         """
-        Atualiza estatísticas de cache hit/miss.
+        Soma os hits/misses acumulados ao hash de estatísticas no Redis.
         
-        Args:
-            cache_key: Chave do cache
-            hit: True para hit, False para miss
+        Os contadores são incrementados em memória no hot path (sem await);
+        o Redis recebe uma única chamada do script por intervalo.
         """
+        hits, misses = self._hits, self._misses
+        if not (hits or misses):
+            return
+        self._hits = self._misses = 0
+        
         try:
-            stats_key = "zep_api:stats:cache"
+            # EVALSHA com recarga automática do script em caso de NOSCRIPT
+            if self._stats_script is None:
+                self._stats_script = self.redis.register_script(_STATS_SCRIPT)
             
-            if hit:
-                await self.redis.hincrby(stats_key, "hits", 1)
-            else:
-                await self.redis.hincrby(stats_key, "misses", 1)
-            
-            # Expirar estatísticas após 24h
-            await self.redis.expire(stats_key, 86400)
+            await self._stats_script(keys=_STATS_KEYS, args=[hits, misses])
             
         except Exception as e:
-            # Ignorar erros de estatísticas para não afetar funcionalidade principal
-            logger.debug("cache_stats_update_failed", error=str(e), cache_key=cache_key[:100])
+            # Devolve os contadores para o próximo flush; estatísticas nunca
+            # afetam a funcionalidade principal
+            self._hits += hits
+            self._misses += misses
+            logger.debug("cache_stats_flush_failed", error=str(e))
     
     async def get_cache_stats(self) -> Dict[str, Any]:
         """
@@ -342,19 +777,16 @@ class RedisCache:
             Dict com estatísticas de hit/miss ratio, keys ativas, etc.
         """
         try:
-            stats_key = "zep_api:stats:cache"
-            stats = await self.redis.hgetall(stats_key)
+            stats = await self.redis.hgetall(_STATS_KEY)
             
-            hits = int(stats.get("hits", 0))
-            misses = int(stats.get("misses", 0))
+            hits = int(stats.get(b"hits", 0))
+            misses = int(stats.get(b"misses", 0))
             total = hits + misses
             
             hit_ratio = hits / total if total > 0 else 0.0
             
-            # Contar chaves ativas
-            active_keys = 0
-            async for _ in self.redis.scan_iter(match="zep_api:*"):
-                active_keys += 1
+            # Contar chaves ativas (O(1); o banco do Redis é dedicado à API)
+            active_keys = await self.redis.dbsize()
             
             return {
                 "hits": hits,
@@ -362,6 +794,7 @@ class RedisCache:
                 "total_requests": total,
                 "hit_ratio": round(hit_ratio, 3),
                 "active_keys": active_keys,
+                "pool": self._get_pool_stats(),
                 "redis_info": await self._get_redis_info()
             }
             
@@ -369,11 +802,35 @@ class RedisCache:
             logger.warning("cache_stats_failed", error=str(e))
             return {"error": str(e)}
     
+    def _get_pool_stats(self) -> Dict[str, Any]:
+        """Retorna a ocupação do pool de conexões (saturação visível)."""
+        pool = self.redis.connection_pool
+        return {
+            "max_connections": pool.max_connections,
+            "in_use": len(getattr(pool, "_in_use_connections", ())),
+            "available": len(getattr(pool, "_available_connections", ()))
+        }
+    
     async def _get_redis_info(self) -> Dict[str, Any]:
-        """Retorna informações básicas do Redis."""
+        """
+        Retorna informações básicas do Redis.
+        
+        O resultado fica em cache por settings.redis_info_cache_ttl, já que
+        health/metrics podem consultar as estatísticas a cada segundo.
+        """
+        now = time.monotonic()
+        expires_at, cached_info = self._info_cache
+        if now < expires_at:
+            return cached_info
+        
         try:
-            info = await self.redis.info()
-            return {
+            try:
+                # Apenas as seções usadas (Redis 7+ aceita várias seções)
+                info = await self.redis.info("server", "clients", "memory")
+            except redis.ResponseError:
+                info = await self.redis.info()
+            
+            redis_info = {
                 "version": info.get("redis_version"),
                 "connected_clients": info.get("connected_clients"),
                 "used_memory_human": info.get("used_memory_human"),
@@ -381,6 +838,10 @@ class RedisCache:
             }
         except Exception:
             return {}
+        
+        if settings.redis_info_cache_ttl > 0:
+            self._info_cache = (now + settings.redis_info_cache_ttl, redis_info)
+        return redis_info
 
 
 # Context manager para uso fácil
@@ -404,6 +865,7 @@ async def get_cache():
 
 # Singleton instance global
 _cache_instance: Optional[RedisCache] = None
+_instance_lock = asyncio.Lock()
 
 
 async def get_cache_instance() -> RedisCache:
@@ -414,12 +876,26 @@ async def get_cache_instance() -> RedisCache:
     global _cache_instance
     
     if _cache_instance is None:
-        _cache_instance = RedisCache()
-        await _cache_instance.initialize()
+        # Requests concorrentes no startup aguardam a mesma inicialização
+        async with _instance_lock:
+            if _cache_instance is None:
+                cache = RedisCache()
+                await cache.initialize()
+                _cache_instance = cache
     
     return _cache_instance
 
 
+# Sentinela de chave ausente para o decorador
+_MISS = object()
+
+# Single-flight do decorador: validade do lock de preenchimento e espera
+# dos requests concorrentes (polling até o lock expirar)
+_FILL_LOCK_TTL = 5
+_FILL_WAIT_INTERVAL = 0.05
+_FILL_WAIT_ATTEMPTS = int(_FILL_LOCK_TTL / _FILL_WAIT_INTERVAL)
+
+
 # Decorador para cache automático
 def cached(prefix: str, ttl: Optional[int] = None):
     """
@@ -432,20 +908,49 @@ def cached(prefix: str, ttl: Optional[int] = None):
             return expensive_operation(session_id)
     """
     def decorator(func):
+        # Nome e ordem dos parâmetros são fixos: resolvidos uma vez na decoração
+        func_name = func.__name__
+        param_names = tuple(inspect.signature(func).parameters)
+        known_params = frozenset(param_names)
+        
         async def wrapper(*args, **kwargs):
             cache = await get_cache_instance()
             
             # Gerar chave baseada em argumentos
-            cache_key_parts = [func.__name__] + list(args) + [f"{k}={v}" for k, v in sorted(kwargs.items())]
-            
-            # Tentar obter do cache
-            cached_result = await cache.get(prefix, *cache_key_parts)
-            if cached_result is not None:
+            cache_key_parts = (func_name, *args)
+            if kwargs:
+                if known_params.issuperset(kwargs):
+                    cache_key_parts += tuple(
+                        f"{name}={kwargs[name]}" for name in param_names if name in kwargs
+                    )
+                else:
+                    # **kwargs livres: ordem só é determinística ordenando
+                    cache_key_parts += tuple(f"{k}={v}" for k, v in sorted(kwargs.items()))
+            
+            # Tentar obter do cache (None armazenado também é hit)
+            cached_result = await cache.get(prefix, *cache_key_parts, default=_MISS)
+            if cached_result is not _MISS:
                 return cached_result
             
+            # Apenas o dono do lock recalcula; os demais aguardam o valor
+            lock = await cache.acquire_fill_lock(prefix, *cache_key_parts)
+            if lock is False:
+                for _ in range(_FILL_WAIT_ATTEMPTS):
+                    await asyncio.sleep(_FILL_WAIT_INTERVAL)
+                    # Releitura da mesma consulta: o miss já foi contado acima
+                    cached_result = await cache.get(
+                        prefix, *cache_key_parts, default=_MISS, count_stats=False
+                    )
+                    if cached_result is not _MISS:
+                        return cached_result
+            
             # Executar função e cachear resultado
-            result = await func(*args, **kwargs)
-            await cache.set(prefix, *cache_key_parts, value=result, ttl=ttl)
+            try:
+                result = await func(*args, **kwargs)
+                await cache.set(prefix, *cache_key_parts, value=result, ttl=ttl, only_if_absent=True)
+            finally:
+                if lock is not False:
+                    await cache.release_fill_lock(lock)
             
             return result
         
@@ -3,7 +3,8 @@ Configuração centralizada da aplicação usando Pydantic Settings.
 Todas as configurações de ambiente são definidas aqui.
 """
 
-from typing import List, Optional
+from functools import cached_property
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional
 from pydantic import Field, field_validator, ConfigDict
 from pydantic_settings import BaseSettings
 
@@ -24,9 +25,9 @@ class Settings(BaseSettings):
     )
     debug: bool = Field(default=False, description="Modo debug")
     log_level: str = Field(default="INFO", description="Nível de log")
-    cors_origins: List[str] = Field(
-        default=["http://localhost:3000", "http://localhost:8080"],
-        description="Origens permitidas para CORS"
+    cors_origins: FrozenSet[str] = Field(
+        default=frozenset({"http://localhost:3000", "http://localhost:8080"}),
+        description="Origens permitidas para CORS (conjunto: checagem O(1) por request)"
     )
     
     # Server Configuration
@@ -45,6 +46,38 @@ class Settings(BaseSettings):
         default=20,
         description="Tamanho do pool de conexões do Zep"
     )
+    zep_keepalive_connections: int = Field(
+        default=20,
+        description="Conexões keep-alive mantidas abertas com o Zep"
+    )
+    zep_connect_timeout: float = Field(
+        default=5.0,
+        description="Timeout de conexão TCP/TLS com o Zep em segundos"
+    )
+    graph_search_cache_ttl: int = Field(
+        default=60,
+        description="TTL do cache local de buscas no graph em segundos (0 desabilita)"
+    )
+    graph_search_cache_size: int = Field(
+        default=4096,
+        description="Número máximo de buscas no graph mantidas em cache local"
+    )
+    graph_add_batch_size: int = Field(
+        default=64,
+        description="Máximo de escritas no graph agrupadas por lote"
+    )
+    graph_add_batch_interval_ms: int = Field(
+        default=20,
+        description="Janela de agrupamento de escritas no graph em ms"
+    )
+    graph_add_batch_concurrency: int = Field(
+        default=8,
+        description="Chamadas simultâneas ao Zep por lote de escritas no graph"
+    )
+    graph_add_max_in_flight_batches: int = Field(
+        default=32,
+        description="Máximo de lotes de escritas no graph em andamento ao mesmo tempo"
+    )
     
     # Database Configuration (PostgreSQL)
     database_url: Optional[str] = Field(
@@ -63,15 +96,55 @@ class Settings(BaseSettings):
     # Cache Configuration (Redis)
     redis_url: str = Field(
         default="redis://localhost:6379",
-        description="URL do Redis"
+        description="URL do Redis (redis://, rediss:// ou unix:///caminho/redis.sock)"
     )
     redis_password: Optional[str] = Field(
         default=None,
         description="Senha do Redis"
     )
     redis_db: int = Field(default=0, description="Banco do Redis")
+    redis_pool_size: int = Field(
+        default=50,
+        description="Máximo de conexões Redis por processo (pool bloqueante)"
+    )
+    redis_pool_timeout: float = Field(
+        default=5.0,
+        description="Tempo máximo (s) aguardando conexão livre no pool Redis"
+    )
     cache_ttl: int = Field(default=300, description="TTL do cache em segundos")
+    cache_stats_flush_interval: float = Field(
+        default=5.0,
+        description="Intervalo (s) de envio dos contadores de hit/miss ao Redis"
+    )
+    redis_info_cache_ttl: float = Field(
+        default=5.0,
+        description="TTL (s) do INFO do Redis usado nas estatísticas do cache (0 desabilita)"
+    )
+    session_stats_cache_ttl: int = Field(
+        default=15,
+        description="TTL (s) do cache de estatísticas de sessão"
+    )
+    memory_context_cache_ttl: int = Field(
+        default=5,
+        description="TTL (s) do cache de contexto/mensagens/fatos de sessão (0 desabilita)"
+    )
     cache_enabled: bool = Field(default=True, description="Cache habilitado")
+    cache_local_ttl: float = Field(
+        default=2.0,
+        description="TTL (s) do cache local em processo à frente do Redis (0 desabilita)"
+    )
+    cache_local_size: int = Field(
+        default=10000,
+        description="Número máximo de chaves no cache local em processo"
+    )
+    cache_client_tracking: bool = Field(
+        default=True,
+        description="Invalidação do cache local via client tracking do Redis 6+"
+    )
+    cache_compression_min_size: int = Field(
+        default=512,
+        description="Tamanho mínimo (bytes) para comprimir valores no cache (0 desabilita)"
+    )
     
     # Rate Limiting
     rate_limit_enabled: bool = Field(
@@ -94,6 +167,14 @@ class Settings(BaseSettings):
         default=24,
         description="Expiração do token em horas"
     )
+    token_cache_ttl: float = Field(
+        default=60.0,
+        description="TTL (s) do cache de tokens JWT já verificados (0 desabilita)"
+    )
+    token_cache_size: int = Field(
+        default=10000,
+        description="Número máximo de tokens verificados em cache"
+    )
     
     # Monitoring and Observability
     prometheus_enabled: bool = Field(
@@ -105,13 +186,56 @@ class Settings(BaseSettings):
         description="Security middleware habilitado"
     )
     metrics_port: int = Field(default=9090, description="Porta das métricas")
+    metrics_render_ttl: float = Field(
+        default=0.5,
+        description="Tempo (s) de reuso do payload serializado do /metrics"
+    )
+    system_metrics_interval: float = Field(
+        default=5.0,
+        description="Intervalo (s) de coleta das métricas de sistema em background"
+    )
     health_check_timeout: int = Field(
         default=10,
         description="Timeout do health check"
     )
+    check_timeouts: Dict[str, float] = Field(
+        default={
+            "configuration": 0.1,
+            "zep": 2.0,
+            "cache": 1.0,
+            "system": 1.5,
+            "database": 1.0
+        },
+        description="Timeout em segundos de cada check do health detalhado"
+    )
+    max_concurrent_zep_health_checks: int = Field(
+        default=2,
+        description="Máximo de health checks simultâneos contra o Zep"
+    )
+    resource_cache_ttl: float = Field(
+        default=5.0,
+        description="TTL das leituras de disco/memória nos health checks em segundos (0 desabilita)"
+    )
+    circuit_breaker_volume_threshold: int = Field(
+        default=5,
+        description="Chamadas mínimas na janela antes de o circuit breaker poder abrir"
+    )
+    circuit_breaker_error_threshold: float = Field(
+        default=50.0,
+        description="Percentual de erros na janela que abre o circuit breaker"
+    )
+    circuit_breaker_sleep_window: float = Field(
+        default=10.0,
+        description="Segundos com o circuito aberto antes da chamada de teste (half-open)"
+    )
     
     # Performance Optimization
     enable_gzip: bool = Field(default=True, description="GZIP habilitado")
+    enable_brotli: bool = Field(
+        default=True,
+        description="Brotli habilitado (fallback para GZIP em clientes sem 'br')"
+    )
+    brotli_quality: int = Field(default=4, ge=0, le=11, description="Qualidade do Brotli")
     max_request_size: int = Field(
         default=10485760,  # 10MB
         description="Tamanho máximo do request"
@@ -148,9 +272,9 @@ class Settings(BaseSettings):
         default=True,
         description="Headers de segurança habilitados"
     )
-    allowed_hosts: List[str] = Field(
-        default=["localhost", "127.0.0.1"],
-        description="Hosts permitidos"
+    allowed_hosts: FrozenSet[str] = Field(
+        default=frozenset({"localhost", "127.0.0.1"}),
+        description="Hosts permitidos (conjunto: checagem O(1) por request)"
     )
     
     # Logging
@@ -181,7 +305,7 @@ class Settings(BaseSettings):
     def parse_cors_origins(cls, v):
         """Parse CORS origins from string or list."""
         if isinstance(v, str):
-            return [origin.strip() for origin in v.split(",")]
+            return frozenset(origin.strip() for origin in v.split(",") if origin.strip())
         return v
     
     @field_validator("allowed_hosts", mode="before")
@@ -189,7 +313,16 @@ class Settings(BaseSettings):
     def parse_allowed_hosts(cls, v):
         """Parse allowed hosts from string or list."""
         if isinstance(v, str):
-            return [host.strip() for host in v.split(",")]
+            return frozenset(host.strip() for host in v.split(",") if host.strip())
+        return v
+    
+    @field_validator("redis_url")
+    @classmethod
+    def validate_redis_url(cls, v):
+        """Validate Redis URL scheme."""
+        valid_schemes = ("redis://", "rediss://", "unix://")
+        if not v.startswith(valid_schemes):
+            raise ValueError(f"Redis URL must start with one of {valid_schemes}")
         return v
     
     @field_validator("log_level")
@@ -210,6 +343,41 @@ class Settings(BaseSettings):
             raise ValueError(f"Log format must be one of {valid_formats}")
         return v.lower()
     
+    @cached_property
+    def health_config_snapshot(self) -> Dict[str, Any]:
+        """
+        Resultado pré-calculado da verificação de configuração do health check.
+        Invalidado automaticamente quando um dos campos envolvidos é alterado.
+        """
+        missing_configs = []
+        if not self.zep_api_key:
+            missing_configs.append("ZEP_API_KEY")
+        if not self.zep_api_url:
+            missing_configs.append("ZEP_API_URL")
+        if not self.api_secret_key or len(self.api_secret_key) < 32:
+            missing_configs.append("API_SECRET_KEY (must be 32+ chars)")
+
+        snapshot: Dict[str, Any] = {
+            "healthy": not missing_configs,
+            "response_time_ns": 0,
+            "details": {
+                "missing_configs": missing_configs or None,
+                "zep_url_configured": bool(self.zep_api_url),
+                "api_key_configured": bool(self.zep_api_key),
+                "secret_key_length": len(self.api_secret_key) if self.api_secret_key else 0
+            }
+        }
+        if missing_configs:
+            snapshot["error"] = f"Missing required configurations: {', '.join(missing_configs)}"
+        return snapshot
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if name in _HEALTH_CONFIG_FIELDS:
+            self.__dict__.pop("health_config_snapshot", None)
+        for callback in _CHANGE_CALLBACKS.get(name, ()):
+            callback()
+
     model_config = ConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -232,6 +400,24 @@ class Settings(BaseSettings):
     )
 
 
+# Campos que compõem o snapshot de configuração do health check
+_HEALTH_CONFIG_FIELDS = frozenset({"zep_api_key", "zep_api_url", "api_secret_key"})
+
+# Callbacks disparados quando um campo é alterado em runtime (ver on_settings_change)
+_CHANGE_CALLBACKS: Dict[str, List[Callable[[], None]]] = {}
+
+
+def on_settings_change(fields: Iterable[str], callback: Callable[[], None]) -> None:
+    """
+    Registra um callback chamado quando algum dos campos é reatribuído.
+    
+    Permite que módulos de hot path copiem configurações para constantes
+    locais sem perder alterações feitas em runtime (ex: testes).
+    """
+    for field in fields:
+        _CHANGE_CALLBACKS.setdefault(field, []).append(callback)
+
+
 # Singleton instance
 settings = Settings()
 
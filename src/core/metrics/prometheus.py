@@ -3,20 +3,32 @@ Sistema de métricas Prometheus para observabilidade completa.
 Coleta métricas de performance, uso e saúde da aplicação.
 """
 
+import asyncio
+import gzip
+import hashlib
+import os
+import re
 import time
 import psutil
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 import structlog
 from prometheus_client import (
-    Counter, Histogram, Gauge, Info, Enum,
+    Counter, Histogram, Summary, Gauge, Info, Enum,
     CollectorRegistry, generate_latest, CONTENT_TYPE_LATEST
 )
+from prometheus_client.openmetrics import exposition as openmetrics
+from prometheus_client.exposition import choose_encoder
 from contextlib import asynccontextmanager
+from starlette.requests import Request
+from starlette.responses import Response
 
 from src.core.config import settings
 
 logger = structlog.get_logger(__name__)
 
+# Segmento numérico indica path concreto (com IDs) em vez de template de rota
+_CONCRETE_PATH = re.compile(r"/\d+")
+
 
 class PrometheusMetrics:
     """
@@ -30,14 +42,32 @@ class PrometheusMetrics:
     - Rate limiting (requests, blocks)
     """
     
+    # Label de endpoint para requests sem rota (404) ou com path concreto
+    UNMATCHED_ENDPOINT = "unmatched"
+    
     def __init__(self, registry: Optional[CollectorRegistry] = None):
         self.registry = registry or CollectorRegistry()
-        self._start_time = time.time()
+        # Relógio monotônico: uptime não anda para trás com ajustes de NTP
+        self._start_time = time.perf_counter()
+        self._process = psutil.Process()
+        # Última coleta de sistema; renovada pela task de background
+        self._sys_snapshot: Dict[str, Any] = {}
+        # CPU% publicado pelo amostrador único (health.cpu_sampler)
+        self._cpu_percent = 0.0
+        self._system_task: Optional[asyncio.Task] = None
+        # Último payload do /metrics por content type: (instante monotônico, bytes, ETag)
+        self._last_render: Dict[str, Tuple[float, bytes, str]] = {}
+        # Versão gzip do payload acima por content type: (ETag de origem, bytes)
+        self._last_render_gz: Dict[str, Tuple[str, bytes]] = {}
         self._setup_metrics()
     
     def _setup_metrics(self):
         """Inicializa todas as métricas Prometheus."""
         
+        # Cache de children já resolvidos por (métrica, valores dos labels);
+        # record_* também guardam aqui a tupla de children de cada observação
+        self._label_cache: Dict[Tuple[Any, Tuple], Any] = {}
+        
         # === API Metrics ===
         self.api_requests_total = Counter(
             'api_requests_total',
@@ -50,23 +80,22 @@ class PrometheusMetrics:
             'api_request_duration_seconds',
             'API request duration in seconds',
             ['method', 'endpoint'],
-            buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+            buckets=(0.025, 0.1, 0.5, 2.5, 10.0),
             registry=self.registry
         )
         
-        self.api_request_size = Histogram(
+        # Tamanhos como Summary sem quantis: só _count/_sum, sem séries por bucket
+        self.api_request_size = Summary(
             'api_request_size_bytes',
             'API request size in bytes',
             ['method', 'endpoint'],
-            buckets=(100, 1000, 10000, 100000, 1000000),
             registry=self.registry
         )
         
-        self.api_response_size = Histogram(
+        self.api_response_size = Summary(
             'api_response_size_bytes',
             'API response size in bytes',
-            ['method', 'endpoint', 'status_code'],
-            buckets=(100, 1000, 10000, 100000, 1000000),
+            ['method', 'endpoint'],
             registry=self.registry
         )
         
@@ -74,7 +103,7 @@ class PrometheusMetrics:
         self.zep_operations_total = Counter(
             'zep_operations_total',
             'Total Zep operations',
-            ['operation', 'status', 'user_id_hash'],
+            ['operation', 'status'],
             registry=self.registry
         )
         
@@ -82,7 +111,7 @@ class PrometheusMetrics:
             'zep_operation_duration_seconds',
             'Zep operation duration in seconds',
             ['operation'],
-            buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0),
+            buckets=(0.05, 0.25, 1.0, 2.5, 5.0),
             registry=self.registry
         )
         
@@ -110,7 +139,7 @@ class PrometheusMetrics:
             'memory_context_length_chars',
             'Memory context string length in characters',
             ['session_type'],
-            buckets=(100, 500, 1000, 2000, 5000, 10000, 20000),
+            buckets=(500, 2000, 5000, 10000, 20000),
             registry=self.registry
         )
         
@@ -133,7 +162,7 @@ class PrometheusMetrics:
             'cache_operation_duration_seconds',
             'Cache operation duration in seconds',
             ['operation', 'prefix'],
-            buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+            buckets=(0.001, 0.01, 0.1),
             registry=self.registry
         )
         
@@ -211,7 +240,7 @@ class PrometheusMetrics:
             'health_check_duration_seconds',
             'Health check duration in seconds',
             ['check_type', 'status'],
-            buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0),
+            buckets=(0.01, 0.1, 0.5, 1.0, 5.0),
             registry=self.registry
         )
         
@@ -237,6 +266,20 @@ class PrometheusMetrics:
         
         self.app_status.state('healthy')
     
+    def _child(self, metric, key: Tuple):
+        """
+        Retorna o child da métrica para os valores de label informados.
+        
+        Evita o .labels() (hash + lookup sob lock) no caminho quente;
+        os valores devem seguir a ordem de declaração dos labels.
+        """
+        cache_key = (metric, key)
+        child = self._label_cache.get(cache_key)
+        if child is None:
+            child = metric.labels(*key)
+            self._label_cache[cache_key] = child
+        return child
+    
     # === Métodos para registrar métricas ===
     
     def record_api_request(
@@ -249,31 +292,38 @@ class PrometheusMetrics:
         response_size: int = 0,
         user_type: str = "anonymous"
     ):
-        """Registra métricas de request da API."""
-        self.api_requests_total.labels(
-            method=method,
-            endpoint=endpoint,
-            status_code=status_code,
-            user_type=user_type
-        ).inc()
-        
-        self.api_request_duration.labels(
-            method=method,
-            endpoint=endpoint
-        ).observe(duration)
+        """
+        Registra métricas de request da API.
+        
+        `endpoint` deve ser o template da rota (ex.: /api/v1/users/{user_id});
+        paths concretos são agrupados em UNMATCHED_ENDPOINT para limitar
+        a cardinalidade das séries.
+        """
+        if _CONCRETE_PATH.search(endpoint):
+            endpoint = self.UNMATCHED_ENDPOINT
+        
+        # Uma única consulta resolve todos os children da request
+        batch_key = ("api", (method, endpoint, status_code, user_type))
+        children = self._label_cache.get(batch_key)
+        if children is None:
+            key = (method, endpoint)
+            children = (
+                self._child(self.api_requests_total, batch_key[1]),
+                self._child(self.api_request_duration, key),
+                self._child(self.api_request_size, key),
+                self._child(self.api_response_size, key)
+            )
+            self._label_cache[batch_key] = children
+        total, duration_child, request_size_child, response_size_child = children
+        
+        total.inc()
+        duration_child.observe(duration)
         
         if request_size > 0:
-            self.api_request_size.labels(
-                method=method,
-                endpoint=endpoint
-            ).observe(request_size)
+            request_size_child.observe(request_size)
         
         if response_size > 0:
-            self.api_response_size.labels(
-                method=method,
-                endpoint=endpoint,
-                status_code=status_code
-            ).observe(response_size)
+            response_size_child.observe(response_size)
     
     def record_zep_operation(
         self,
@@ -282,16 +332,23 @@ class PrometheusMetrics:
         status: str = "success",
         user_id_hash: str = "anonymous"
     ):
-        """Registra métricas de operação Zep."""
-        self.zep_operations_total.labels(
-            operation=operation,
-            status=status,
-            user_id_hash=user_id_hash[:8]  # Apenas primeiros 8 chars para privacidade
-        ).inc()
+        """
+        Registra métricas de operação Zep.
+        
+        `user_id_hash` não vira label (uma série por usuário); é mantido
+        na assinatura por compatibilidade e o detalhe por usuário fica nos logs.
+        """
+        batch_key = ("zep", (operation, status))
+        children = self._label_cache.get(batch_key)
+        if children is None:
+            children = (
+                self._child(self.zep_operations_total, batch_key[1]),
+                self._child(self.zep_operation_duration, (operation,))
+            )
+            self._label_cache[batch_key] = children
         
-        self.zep_operation_duration.labels(
-            operation=operation
-        ).observe(duration)
+        children[0].inc()
+        children[1].observe(duration)
     
     def record_memory_operation(
         self,
@@ -303,16 +360,12 @@ class PrometheusMetrics:
     ):
         """Registra métricas de operação de memória."""
         if message_count > 0:
-            self.memory_messages_total.labels(
-                session_type=session_type,
-                role=role,
-                role_type=role_type
+            self._child(
+                self.memory_messages_total, (session_type, role, role_type)
             ).inc(message_count)
         
         if context_length > 0:
-            self.memory_context_length.labels(
-                session_type=session_type
-            ).observe(context_length)
+            self._child(self.memory_context_length, (session_type,)).observe(context_length)
     
     def record_cache_operation(
         self,
@@ -322,20 +375,21 @@ class PrometheusMetrics:
         status: str = "success"
     ):
         """Registra métricas de operação de cache."""
-        self.cache_operations_total.labels(
-            operation=operation,
-            prefix=prefix,
-            status=status
-        ).inc()
+        batch_key = ("cache", (operation, prefix, status))
+        children = self._label_cache.get(batch_key)
+        if children is None:
+            children = (
+                self._child(self.cache_operations_total, batch_key[1]),
+                self._child(self.cache_operation_duration, (operation, prefix))
+            )
+            self._label_cache[batch_key] = children
         
-        self.cache_operation_duration.labels(
-            operation=operation,
-            prefix=prefix
-        ).observe(duration)
+        children[0].inc()
+        children[1].observe(duration)
     
     def update_cache_hit_ratio(self, prefix: str, hit_ratio: float):
         """Atualiza ratio de cache hit."""
-        self.cache_hit_ratio.labels(prefix=prefix).set(hit_ratio)
+        self._child(self.cache_hit_ratio, (prefix,)).set(hit_ratio)
     
     def record_rate_limit(
         self,
@@ -344,16 +398,10 @@ class PrometheusMetrics:
         severity: str = "normal"
     ):
         """Registra métricas de rate limiting."""
-        self.rate_limit_checks_total.labels(
-            check_type=check_type,
-            result=result
-        ).inc()
+        self._child(self.rate_limit_checks_total, (check_type, result)).inc()
         
         if result == "blocked":
-            self.rate_limit_blocks_total.labels(
-                check_type=check_type,
-                severity=severity
-            ).inc()
+            self._child(self.rate_limit_blocks_total, (check_type, severity)).inc()
     
     def record_health_check(
         self,
@@ -363,46 +411,81 @@ class PrometheusMetrics:
         is_healthy: bool
     ):
         """Registra métricas de health check."""
-        self.health_check_duration.labels(
-            check_type=check_type,
-            status=status
-        ).observe(duration)
-        
-        self.dependency_status.labels(
-            dependency=check_type
-        ).set(1 if is_healthy else 0)
+        self._child(self.health_check_duration, (check_type, status)).observe(duration)
+        self._child(self.dependency_status, (check_type,)).set(1 if is_healthy else 0)
+    
+    def _collect_psutil_blocking(self):
+        """
+        Lê psutil e atualiza gauges e snapshot.
+        
+        Síncrono de propósito: roda numa thread via asyncio.to_thread,
+        então a leitura de disco/proc nunca bloqueia o event loop.
+        """
+        # CPU não é lido aqui: psutil.cpu_percent(interval=None) mede desde a
+        # chamada anterior, e um segundo amostrador distorceria as leituras
+        cpu_percent = self._cpu_percent
+        
+        # Memória do sistema
+        memory = psutil.virtual_memory()
+        self.system_memory_usage.labels(type='total').set(memory.total)
+        self.system_memory_usage.labels(type='available').set(memory.available)
+        self.system_memory_usage.labels(type='used').set(memory.used)
+        
+        # Memória do processo (oneshot agrupa as leituras de /proc)
+        with self._process.oneshot():
+            process_memory = self._process.memory_info()
+        self.process_memory_usage.labels(type='rss').set(process_memory.rss)
+        self.process_memory_usage.labels(type='vms').set(process_memory.vms)
+        
+        # Disco: statvfs direto, mesmo percent do psutil.disk_usage
+        # (used / (used + espaço livre para não-root)); f_frsize se cancela
+        st = os.statvfs('/')
+        used = st.f_blocks - st.f_bfree
+        disk_total = used + st.f_bavail
+        disk_percent = used / disk_total * 100 if disk_total else 0.0
+        self.system_disk_usage.labels(mount_point='/').set(disk_percent)
+        
+        # Uptime
+        current_uptime = time.perf_counter() - self._start_time
+        self.app_uptime.set(current_uptime)
+        
+        self._sys_snapshot = {
+            "cpu_percent": cpu_percent,
+            "memory_percent": memory.percent,
+            "disk_percent": disk_percent
+        }
+    
+    def set_cpu_percent(self, cpu_percent: float):
+        """Publica o CPU% amostrado em background (gauge e snapshot)."""
+        self._cpu_percent = cpu_percent
+        self.system_cpu_usage.set(cpu_percent)
     
     async def update_system_metrics(self):
-        """Atualiza métricas do sistema."""
+        """Atualiza métricas do sistema e o snapshot usado pelo resumo."""
         try:
-            # CPU
-            cpu_percent = psutil.cpu_percent()
-            self.system_cpu_usage.set(cpu_percent)
-            
-            # Memória do sistema
-            memory = psutil.virtual_memory()
-            self.system_memory_usage.labels(type='total').set(memory.total)
-            self.system_memory_usage.labels(type='available').set(memory.available)
-            self.system_memory_usage.labels(type='used').set(memory.used)
-            
-            # Memória do processo
-            process = psutil.Process()
-            process_memory = process.memory_info()
-            self.process_memory_usage.labels(type='rss').set(process_memory.rss)
-            self.process_memory_usage.labels(type='vms').set(process_memory.vms)
-            
-            # Disco
-            disk = psutil.disk_usage('/')
-            disk_percent = (disk.used / disk.total) * 100
-            self.system_disk_usage.labels(mount_point='/').set(disk_percent)
-            
-            # Uptime
-            current_uptime = time.time() - self._start_time
-            self.app_uptime.set(current_uptime)
-            
+            await asyncio.to_thread(self._collect_psutil_blocking)
         except Exception as e:
             logger.warning("system_metrics_update_failed", error=str(e))
     
+    async def _system_loop(self, interval: float):
+        """Coleta métricas de sistema periodicamente."""
+        while True:
+            await self.update_system_metrics()
+            await asyncio.sleep(interval)
+    
+    def start_system_metrics(self, interval: Optional[float] = None):
+        """Inicia a coleta de métricas de sistema em background."""
+        if self._system_task is None or self._system_task.done():
+            self._system_task = asyncio.create_task(
+                self._system_loop(interval or settings.system_metrics_interval)
+            )
+    
+    def stop_system_metrics(self):
+        """Cancela a coleta de métricas de sistema em background."""
+        if self._system_task is not None:
+            self._system_task.cancel()
+            self._system_task = None
+    
     def update_active_sessions(self, count: int):
         """Atualiza contador de sessões ativas."""
         self.memory_sessions_active.set(count)
@@ -420,22 +503,74 @@ class PrometheusMetrics:
         if status in valid_statuses:
             self.app_status.state(status)
     
-    def generate_metrics(self) -> bytes:
-        """Gera métricas em formato Prometheus."""
-        return generate_latest(self.registry)
+    def _render(self, content_type: str = CONTENT_TYPE_LATEST) -> Tuple[bytes, str]:
+        """
+        Serializa o registry, reaproveitando o payload dentro do TTL.
+        
+        generate_latest é O(séries); scrapers concorrentes (ou réplicas do
+        Prometheus) dentro da janela recebem os mesmos bytes.
+        """
+        now = time.monotonic()
+        last = self._last_render.get(content_type)
+        if last is not None and now - last[0] < settings.metrics_render_ttl:
+            return last[1], last[2]
+        
+        if content_type == openmetrics.CONTENT_TYPE_LATEST:
+            body = openmetrics.generate_latest(self.registry)
+        else:
+            body = generate_latest(self.registry)
+        etag = '"%s"' % hashlib.blake2b(body, digest_size=8).hexdigest()
+        self._last_render[content_type] = (now, body, etag)
+        return body, etag
+    
+    def generate_metrics(self, content_type: str = CONTENT_TYPE_LATEST) -> bytes:
+        """Gera métricas em formato Prometheus (texto ou OpenMetrics)."""
+        return self._render(content_type)[0]
+    
+    def _render_gz(self, content_type: str, body: bytes, etag: str) -> bytes:
+        """Comprime o payload uma vez por render; scrapes seguintes reusam os bytes."""
+        last = self._last_render_gz.get(content_type)
+        if last is not None and last[0] == etag:
+            return last[1]
+        
+        # Nível 3: ganho de tamanho próximo ao nível 6 com bem menos CPU
+        body_gz = gzip.compress(body, compresslevel=3, mtime=0)
+        self._last_render_gz[content_type] = (etag, body_gz)
+        return body_gz
+    
+    async def render(self, request: Request) -> Response:
+        """
+        Resposta do /metrics; 304 quando o If-None-Match bate com o ETag atual.
+        
+        O formato segue o Accept do scraper: OpenMetrics quando pedido,
+        texto clássico caso contrário (o client Python não gera protobuf).
+        """
+        _, content_type = choose_encoder(request.headers.get("accept"))
+        body, etag = self._render(content_type)
+        headers = {"Vary": "Accept, Accept-Encoding"}
+        
+        # Já comprimido aqui: os middlewares GZip/Brotli ignoram respostas
+        # com Content-Encoding definido
+        if "gzip" in request.headers.get("accept-encoding", ""):
+            body = self._render_gz(content_type, body, etag)
+            etag = etag[:-1] + '-gzip"'
+            headers["Content-Encoding"] = "gzip"
+        
+        headers["ETag"] = etag
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type=content_type, headers=headers)
     
     async def get_metrics_summary(self) -> Dict[str, Any]:
         """Retorna resumo das métricas em formato JSON."""
-        await self.update_system_metrics()
+        # Snapshot da task de background; só coleta se ainda não houver nenhum
+        if not self._sys_snapshot:
+            await self.update_system_metrics()
         
         return {
             "timestamp": time.time(),
-            "uptime_seconds": time.time() - self._start_time,
-            "system": {
-                "cpu_percent": psutil.cpu_percent(),
-                "memory_percent": psutil.virtual_memory().percent,
-                "disk_percent": psutil.disk_usage('/').percent
-            },
+            "uptime_seconds": time.perf_counter() - self._start_time,
+            "system": self._sys_snapshot,
             "application": {
                 "version": settings.api_version,
                 "debug": settings.debug,
@@ -454,28 +589,32 @@ async def timed_operation(metrics: PrometheusMetrics, operation_type: str, **lab
         async with timed_operation(metrics, "zep_operation", operation="memory_add"):
             result = await zep_client.add_memory(...)
     """
-    start_time = time.time()
+    # Labels resolvidos antes do try: o finally só mede e registra
+    operation = labels.get("operation", "unknown")
+    prefix = labels.get("prefix", "unknown")
+    user_id_hash = labels.get("user_id_hash", "anonymous")
     status = "success"
+    start = time.perf_counter()
     
     try:
         yield
-    except Exception as e:
+    except Exception:
         status = "error"
         raise
     finally:
-        duration = time.time() - start_time
+        duration = time.perf_counter() - start
         
         if operation_type == "zep_operation":
             metrics.record_zep_operation(
-                operation=labels.get("operation", "unknown"),
+                operation=operation,
                 duration=duration,
                 status=status,
-                user_id_hash=labels.get("user_id_hash", "anonymous")
+                user_id_hash=user_id_hash
             )
         elif operation_type == "cache_operation":
             metrics.record_cache_operation(
-                operation=labels.get("operation", "unknown"),
-                prefix=labels.get("prefix", "unknown"),
+                operation=operation,
+                prefix=prefix,
                 duration=duration,
                 status=status
             )
@@ -502,11 +641,9 @@ def get_metrics() -> PrometheusMetrics:
 def increment_api_request(method: str, endpoint: str, status_code: int, **kwargs):
     """Incrementa contador de requests da API."""
     metrics = get_metrics()
-    metrics.api_requests_total.labels(
-        method=method,
-        endpoint=endpoint,
-        status_code=status_code,
-        user_type=kwargs.get("user_type", "anonymous")
+    metrics._child(
+        metrics.api_requests_total,
+        (method, endpoint, status_code, kwargs.get("user_type", "anonymous"))
     ).inc()
 
 
@@ -54,8 +54,8 @@ class MemoryAddRequest(BaseModel):
     
     messages: List[MessageCreate] = Field(
         description="Lista de mensagens para adicionar",
-        min_items=1,
-        max_items=50  # Limite razoável para batch
+        min_length=1,
+        max_length=50  # Limite razoável para batch
     )
     return_context: bool = Field(
         default=False,
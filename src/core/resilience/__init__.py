@@ -0,0 +1,17 @@
+"""
+Módulo de resiliência para dependências externas.
+"""
+
+from .circuit_breaker import (
+    CircuitBreaker,
+    CircuitBreakerOpenError,
+    get_circuit_breaker,
+    get_circuit_breakers
+)
+
+__all__ = [
+    "CircuitBreaker",
+    "CircuitBreakerOpenError",
+    "get_circuit_breaker",
+    "get_circuit_breakers"
+]
@@ -0,0 +1,183 @@
+"""
+Circuit breaker em memória para dependências externas (Zep, Redis).
+Estados closed → open → half_open, alimentados pelas chamadas reais.
+"""
+
+import time
+from typing import Any, Dict, Optional
+
+import structlog
+
+from src.core.config import settings
+
+
+logger = structlog.get_logger(__name__)
+
+
+class CircuitBreakerOpenError(Exception):
+    """Chamada recusada porque o circuito está aberto."""
+    pass
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker com janela de contagem e sleep window.
+    
+    - closed: chamadas passam; abre quando a janela atinge o volume mínimo
+      e a taxa de erro passa do limite
+    - open: chamadas recusadas até o fim do sleep window
+    - half_open: uma chamada de teste; sucesso fecha, falha reabre
+    
+    Todo o estado é alterado sem await, portanto é atômico dentro do
+    event loop.
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(
+        self,
+        name: str,
+        request_volume_threshold: int = 5,
+        error_threshold_percentage: float = 50.0,
+        sleep_window: float = 10.0,
+        rolling_window: float = 10.0
+    ) -> None:
+        self.name = name
+        self.request_volume_threshold = request_volume_threshold
+        self.error_threshold_percentage = error_threshold_percentage
+        self.sleep_window = sleep_window
+        self.rolling_window = rolling_window
+        
+        self.state = self.CLOSED
+        self.failure_count = 0
+        self.success_count = 0
+        self.opened_at: Optional[float] = None
+        self.last_failure_at: Optional[float] = None
+        self._window_start = time.monotonic()
+        self._opened_monotonic = 0.0
+        self._trial_started: Optional[float] = None
+    
+    def allow_request(self) -> bool:
+        """Indica se uma chamada pode seguir para a dependência."""
+        if self.state == self.CLOSED:
+            return True
+        
+        if self.state == self.OPEN:
+            if time.monotonic() - self._opened_monotonic < self.sleep_window:
+                return False
+            self._transition(self.HALF_OPEN)
+        
+        # half_open: apenas uma chamada de teste por vez; um teste sem
+        # resultado após o sleep window (ex.: cancelado) libera outro
+        now = time.monotonic()
+        if self._trial_started is not None and now - self._trial_started < self.sleep_window:
+            return False
+        self._trial_started = now
+        return True
+    
+    def record_success(self) -> None:
+        """Registra uma chamada bem-sucedida."""
+        if self.state == self.HALF_OPEN:
+            self._transition(self.CLOSED)
+            return
+        self._roll_window()
+        self.success_count += 1
+    
+    def record_failure(self) -> None:
+        """Registra uma chamada com falha."""
+        self.last_failure_at = time.time()
+        if self.state == self.HALF_OPEN:
+            self._transition(self.OPEN)
+            return
+        
+        self._roll_window()
+        self.failure_count += 1
+        
+        total = self.failure_count + self.success_count
+        if (
+            self.state == self.CLOSED
+            and total >= self.request_volume_threshold
+            and self.failure_count * 100 / total >= self.error_threshold_percentage
+        ):
+            self._transition(self.OPEN)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Estado atual para exposição em endpoints (O(1), sem I/O)."""
+        # Reflete a transição open → half_open mesmo sem tráfego
+        if (
+            self.state == self.OPEN
+            and time.monotonic() - self._opened_monotonic >= self.sleep_window
+        ):
+            self._transition(self.HALF_OPEN)
+        
+        return {
+            "status": self.state,
+            "failure_count": self.failure_count,
+            "success_count": self.success_count,
+            "opened_at": self.opened_at,
+            "last_failure_at": self.last_failure_at
+        }
+    
+    def reset(self) -> None:
+        """Volta ao estado inicial (closed, contadores zerados)."""
+        self.state = self.CLOSED
+        self.opened_at = None
+        self.last_failure_at = None
+        self.failure_count = 0
+        self.success_count = 0
+        self._window_start = time.monotonic()
+        self._trial_started = None
+    
+    def _roll_window(self) -> None:
+        """Zera os contadores quando a janela de contagem expira."""
+        now = time.monotonic()
+        if now - self._window_start >= self.rolling_window:
+            self._window_start = now
+            self.failure_count = 0
+            self.success_count = 0
+    
+    def _transition(self, state: str) -> None:
+        """Muda de estado e ajusta contadores."""
+        previous = self.state
+        self.state = state
+        self._trial_started = None
+        
+        if state == self.OPEN:
+            self.opened_at = time.time()
+            self._opened_monotonic = time.monotonic()
+        elif state == self.CLOSED:
+            self.opened_at = None
+            self.failure_count = 0
+            self.success_count = 0
+            self._window_start = time.monotonic()
+        
+        logger.warning(
+            "circuit_breaker_state_changed",
+            breaker=self.name,
+            previous=previous,
+            state=state
+        )
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breakers() -> Dict[str, CircuitBreaker]:
+    """Todos os circuit breakers criados, por nome."""
+    return dict(_breakers)
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """Retorna o circuit breaker (singleton por nome) da dependência."""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        breaker = CircuitBreaker(
+            name,
+            request_volume_threshold=settings.circuit_breaker_volume_threshold,
+            error_threshold_percentage=settings.circuit_breaker_error_threshold,
+            sleep_window=settings.circuit_breaker_sleep_window
+        )
+        _breakers[name] = breaker
+    return breaker
@@ -1,5 +1,13 @@
 """Zep Client package - Cliente otimizado para Zep SDK."""
 
-from .client import OptimizedZepClient, get_zep_client, get_zep_client_sync
+from .client import (
+    OptimizedZepClient,
+    get_zep_client,
+    get_zep_client_sync
+)
 
-__all__ = ["OptimizedZepClient", "get_zep_client", "get_zep_client_sync"] 
\ No newline at end of file
+__all__ = [
+    "OptimizedZepClient",
+    "get_zep_client",
+    "get_zep_client_sync"
+] 
\ No newline at end of file
@@ -4,8 +4,11 @@ Implementa singleton pattern e connection pooling conforme best practices.
 """
 
 import asyncio
-from typing import Optional, Any, Dict, List
+import time
+from collections import OrderedDict
+from typing import Optional, Any, Awaitable, Callable, Dict, List, Tuple
 from contextlib import asynccontextmanager
+import httpx
 import structlog
 
 from zep_python.client import AsyncZep
@@ -13,6 +16,7 @@ from zep_python.types import Message
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 from src.core.config import settings
+from src.core.resilience import CircuitBreaker, CircuitBreakerOpenError, get_circuit_breaker
 
 
 logger = structlog.get_logger(__name__)
@@ -23,6 +27,38 @@ class ZepClientError(Exception):
     pass
 
 
+class _CircuitBreakerTransport(httpx.AsyncBaseTransport):
+    """
+    Transport HTTP que alimenta o circuit breaker do Zep.
+    
+    Falhas de rede e respostas 5xx contam como erro; com o circuito
+    aberto a chamada falha imediatamente, sem I/O.
+    """
+    
+    def __init__(self, transport: httpx.AsyncBaseTransport, breaker: CircuitBreaker) -> None:
+        self._transport = transport
+        self._breaker = breaker
+    
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if not self._breaker.allow_request():
+            raise CircuitBreakerOpenError(f"Circuit breaker '{self._breaker.name}' is open")
+        
+        try:
+            response = await self._transport.handle_async_request(request)
+        except Exception:
+            self._breaker.record_failure()
+            raise
+        
+        if response.status_code >= 500:
+            self._breaker.record_failure()
+        else:
+            self._breaker.record_success()
+        return response
+    
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
 class OptimizedZepClient:
     """
     Cliente Zep otimizado com singleton pattern e connection pooling.
@@ -36,8 +72,17 @@ class OptimizedZepClient:
     
     _instance: Optional["OptimizedZepClient"] = None
     _client: Optional[AsyncZep] = None
+    # Cliente HTTP compartilhado: keep-alive + pool de conexões com o Zep
+    _http: Optional[httpx.AsyncClient] = None
     _lock = asyncio.Lock()
     
+    # Cache local de buscas: chave -> (expira_em, resultado)
+    _search_cache: "OrderedDict[Tuple, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+    # Geração por graph (user:<id> / group:<id>), incrementada a cada escrita
+    _graph_generation: Dict[str, int] = {}
+    # Buscas em andamento, compartilhadas entre requests idênticas
+    _inflight: Dict[Tuple, "asyncio.Future[Any]"] = {}
+    
     def __new__(cls) -> "OptimizedZepClient":
         """Implementa singleton pattern."""
         if cls._instance is None:
@@ -58,16 +103,36 @@ class OptimizedZepClient:
         async with self._lock:
             if self._client is None:
                 try:
+                    # Um único AsyncClient de vida longa evita TCP/TLS a cada chamada;
+                    # HTTP/2 multiplexa requests concorrentes quando o Zep usa HTTPS
+                    self._http = httpx.AsyncClient(
+                        transport=_CircuitBreakerTransport(
+                            httpx.AsyncHTTPTransport(
+                                http2=True,
+                                limits=httpx.Limits(
+                                    max_connections=settings.zep_client_pool_size,
+                                    max_keepalive_connections=settings.zep_keepalive_connections
+                                )
+                            ),
+                            get_circuit_breaker("zep")
+                        ),
+                        timeout=httpx.Timeout(
+                            settings.zep_timeout,
+                            connect=settings.zep_connect_timeout
+                        )
+                    )
                     self._client = AsyncZep(
                         api_key=settings.zep_api_key,
                         base_url=settings.zep_api_url,
                         # Configurações de timeout e connection pooling
                         timeout=settings.zep_timeout,
+                        httpx_client=self._http,
                     )
                     logger.info(
                         "zep_client_initialized",
                         api_url=settings.zep_api_url,
-                        timeout=settings.zep_timeout
+                        timeout=settings.zep_timeout,
+                        pool_size=settings.zep_client_pool_size
                     )
                 except Exception as e:
                     logger.error(
@@ -80,9 +145,12 @@ class OptimizedZepClient:
     async def close(self) -> None:
         """Fecha o cliente Zep."""
         if self._client:
-            # O AsyncZep não tem método close explícito,
-            # mas podemos limpar a referência
+            # O AsyncZep não tem método close explícito; o pool HTTP
+            # compartilhado é fechado aqui
             self._client = None
+            if self._http is not None:
+                await self._http.aclose()
+                self._http = None
             logger.info("zep_client_closed")
     
     @property
@@ -92,6 +160,84 @@ class OptimizedZepClient:
             raise ZepClientError("Zep client not initialized. Call initialize() first.")
         return self._client
     
+    # Search Cache
+    
+    @staticmethod
+    def _graph_scope(user_id: Optional[str], group_id: Optional[str]) -> str:
+        """Identifica o graph alvo (usuário ou grupo) para cache e invalidação."""
+        return f"user:{user_id}" if user_id else f"group:{group_id}"
+    
+    def _search_cache_key(self, operation: str, scope: str, *params: Any) -> Tuple:
+        """Gera chave de cache incluindo a geração atual do graph."""
+        return (operation, scope, self._graph_generation.get(scope, 0)) + params
+    
+    def _search_cache_get(self, key: Tuple) -> Optional[Dict[str, Any]]:
+        """Retorna resultado em cache se ainda válido."""
+        entry = self._search_cache.get(key)
+        if entry is None:
+            return None
+        
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._search_cache.pop(key, None)
+            return None
+        
+        self._search_cache.move_to_end(key)
+        return value
+    
+    def _search_cache_set(self, key: Tuple, value: Dict[str, Any]) -> None:
+        """Armazena resultado no cache, removendo os mais antigos (LRU)."""
+        if settings.graph_search_cache_ttl <= 0:
+            return
+        
+        self._search_cache[key] = (time.monotonic() + settings.graph_search_cache_ttl, value)
+        self._search_cache.move_to_end(key)
+        while len(self._search_cache) > settings.graph_search_cache_size:
+            self._search_cache.popitem(last=False)
+    
+    async def _coalesce(self, key: Tuple, call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Executa a chamada ao Zep uma única vez por chave (single-flight).
+        
+        Requests concorrentes com a mesma chave aguardam o mesmo resultado
+        em vez de disparar chamadas duplicadas. O shield evita que o
+        cancelamento de um dos requests cancele a chamada compartilhada.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(call())
+            self._inflight[key] = task
+            
+            def _release(done: "asyncio.Future[Any]") -> None:
+                if self._inflight.get(key) is done:
+                    del self._inflight[key]
+            
+            task.add_done_callback(_release)
+        
+        return await asyncio.shield(task)
+    
+    def invalidate_graph_cache(
+        self,
+        user_id: Optional[str] = None,
+        group_id: Optional[str] = None
+    ) -> None:
+        """
+        Invalida buscas em cache de um graph.
+        
+        Incrementa a geração do graph; entradas antigas deixam de ser
+        encontradas e saem do cache por TTL/LRU.
+        """
+        scope = self._graph_scope(user_id, group_id)
+        self._graph_generation[scope] = self._graph_generation.get(scope, 0) + 1
+    
+    def graph_generation(
+        self,
+        user_id: Optional[str] = None,
+        group_id: Optional[str] = None
+    ) -> int:
+        """Geração atual do graph (incrementada a cada escrita via add_graph_data)."""
+        return self._graph_generation.get(self._graph_scope(user_id, group_id), 0)
+    
     # Memory Operations (Alto Nível)
     
     @retry(
@@ -227,6 +373,51 @@ class OptimizedZepClient:
             )
             raise ZepClientError(f"Failed to get memory: {e}")
     
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=4, max=10)
+    )
+    async def get_memory_counts(self, session_id: str) -> Dict[str, int]:
+        """
+        Contagens da memória de uma sessão sem baixar todas as mensagens.
+        
+        Busca a memória com só a última mensagem (contexto e fatos vêm
+        inteiros) e, em paralelo, uma página de 1 mensagem cujo total_count
+        é o número de mensagens da sessão.
+        
+        Args:
+            session_id: ID da sessão
+            
+        Returns:
+            message_count, facts_count e context_length
+            
+        Raises:
+            ZepClientError: Se houver erro na operação
+        """
+        try:
+            memory, page = await asyncio.gather(
+                self.client.memory.get(session_id=session_id, lastn=1),
+                self.client.memory.get_session_messages(session_id=session_id, limit=1)
+            )
+            
+            message_count = getattr(page, "total_count", None)
+            if message_count is None:
+                message_count = len(memory.messages or ())
+            
+            return {
+                "message_count": message_count,
+                "facts_count": len(memory.relevant_facts or ()),
+                "context_length": len(memory.context or "")
+            }
+            
+        except Exception as e:
+            logger.error(
+                "memory_counts_failed",
+                session_id=session_id,
+                error=str(e)
+            )
+            raise ZepClientError(f"Failed to get memory counts: {e}")
+    
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=4, max=10)
@@ -236,7 +427,8 @@ class OptimizedZepClient:
         user_id: str,
         query: str,
         search_scope: str = "facts",
-        limit: int = 10
+        limit: int = 10,
+        min_score: Optional[float] = None
     ) -> Dict[str, Any]:
         """
         Busca na memória do usuário.
@@ -246,6 +438,7 @@ class OptimizedZepClient:
             query: Query de busca
             search_scope: Escopo da busca ("facts", "messages", etc.)
             limit: Limite de resultados
+            min_score: Score mínimo, aplicado pelo Zep antes do limit
             
         Returns:
             Resultados da busca
@@ -253,6 +446,13 @@ class OptimizedZepClient:
         Raises:
             ZepClientError: Se houver erro na operação
         """
+        # Sem cache de resultado: add_memory alimenta o mesmo graph via sessão
+        # e não há mapeamento sessão→usuário para invalidar; só chamadas
+        # idênticas simultâneas são coalescidas
+        flight_key = self._search_cache_key(
+            "search_memory", self._graph_scope(user_id, None), query, search_scope, limit, min_score
+        )
+        
         try:
             logger.info(
                 "memory_search_started",
@@ -272,10 +472,18 @@ class OptimizedZepClient:
             
             # Note: Using graph.search as memory.search_sessions may not exist in Zep SDK 2.0.0
             # This provides similar functionality by searching the user's knowledge graph
-            results = await self.client.graph.search(
-                user_id=user_id,
-                query=query,
-                limit=limit
+            search_kwargs: Dict[str, Any] = {}
+            if min_score is not None:
+                search_kwargs["min_score"] = min_score
+            
+            results = await self._coalesce(
+                flight_key,
+                lambda: self.client.graph.search(
+                    user_id=user_id,
+                    query=query,
+                    limit=limit,
+                    **search_kwargs
+                )
             )
             
             logger.info(
@@ -351,6 +559,9 @@ class OptimizedZepClient:
                 type=data_type
             )
             
+            # Buscas anteriores deste graph não refletem os novos dados
+            self.invalidate_graph_cache(user_id=user_id, group_id=group_id)
+            
             logger.info(
                 "graph_add_completed",
                 target_id=target_id,
@@ -374,6 +585,35 @@ class OptimizedZepClient:
             )
             raise ZepClientError(f"Failed to add graph data: {e}")
     
+    async def add_graph_data_batch(
+        self,
+        items: List[Dict[str, Any]],
+        concurrency: int = 8
+    ) -> List[Any]:
+        """
+        Adiciona vários itens ao knowledge graph com concorrência limitada.
+        
+        O SDK não expõe endpoint de lote; cada item segue como uma chamada
+        add_graph_data, com no máximo `concurrency` chamadas simultâneas.
+        
+        Args:
+            items: Kwargs de add_graph_data para cada item
+            concurrency: Máximo de chamadas simultâneas ao Zep
+            
+        Returns:
+            Resultado ou exceção de cada item, na mesma ordem de `items`
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def _add(item: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.add_graph_data(**item)
+        
+        return await asyncio.gather(
+            *(_add(item) for item in items),
+            return_exceptions=True
+        )
+    
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=4, max=10)
@@ -383,16 +623,21 @@ class OptimizedZepClient:
         user_id: Optional[str] = None,
         group_id: Optional[str] = None,
         query: str = "",
-        limit: int = 10
+        limit: int = 10,
+        entity_type: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Busca no knowledge graph.
         
+        O filtro por entity_type é resolvido pelo Zep como busca indexada
+        em nós (search_filters.node_labels), em vez de scan + filtro local.
+        
         Args:
             user_id: ID do usuário (para graph de usuário)
             group_id: ID do grupo (para graph de grupo)
             query: Query de busca
             limit: Limite de resultados
+            entity_type: Filtrar nós por tipo de entidade (label)
             
         Returns:
             Resultados da busca no graph
@@ -407,6 +652,13 @@ class OptimizedZepClient:
             target_id = user_id or group_id
             target_type = "user" if user_id else "group"
             
+            cache_key = self._search_cache_key(
+                "search_graph", self._graph_scope(user_id, group_id), query, limit, entity_type
+            )
+            cached = self._search_cache_get(cache_key)
+            if cached is not None:
+                return cached
+            
             logger.info(
                 "graph_search_started",
                 target_id=target_id,
@@ -415,11 +667,20 @@ class OptimizedZepClient:
                 limit=limit
             )
             
-            results = await self.client.graph.search(
-                user_id=user_id,
-                group_id=group_id,
-                query=query,
-                limit=limit
+            search_kwargs: Dict[str, Any] = {}
+            if entity_type:
+                search_kwargs["scope"] = "nodes"
+                search_kwargs["search_filters"] = {"node_labels": [entity_type]}
+            
+            results = await self._coalesce(
+                cache_key,
+                lambda: self.client.graph.search(
+                    user_id=user_id,
+                    group_id=group_id,
+                    query=query,
+                    limit=limit,
+                    **search_kwargs
+                )
             )
             
             logger.info(
@@ -430,7 +691,7 @@ class OptimizedZepClient:
                 results_count=len(results) if results else 0
             )
             
-            return {
+            result = {
                 "target_id": target_id,
                 "target_type": target_type,
                 "query": query,
@@ -438,6 +699,9 @@ class OptimizedZepClient:
                 "total_count": len(results) if results else 0,
                 "success": True
             }
+            self._search_cache_set(cache_key, result)
+            
+            return result
             
         except Exception as e:
             logger.error(
@@ -3,32 +3,44 @@ Zep AI Memory API - Aplicação principal FastAPI.
 API REST enterprise-grade para Zep AI Memory platform.
 """
 
+import asyncio
+import logging
+import orjson
 import time
 import structlog
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator, Dict
 
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
-from fastapi.responses import JSONResponse
+
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:  # brotli-asgi é opcional; sem ele fica só o GZIP
+    BrotliMiddleware = None
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.openapi.docs import get_swagger_ui_html
 from fastapi.openapi.utils import get_openapi
 
-# Prometheus monitoring
-from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
-from fastapi import Response
-
 from src.core.config import settings
 from src.core.zep_client.client import get_zep_client_sync
 from src.core.metrics import get_metrics
+from src.core.cache import get_cache_instance
 from src.core.middleware import RateLimitMiddleware, SecurityMiddleware
 from src.api.v1 import memory, graph, users, health
 
 
+def _orjson_dumps(obj: Any, **kwargs: Any) -> str:
+    """Serializer do JSONRenderer via orjson (o LoggerFactory do stdlib espera str)."""
+    return orjson.dumps(obj, default=kwargs.get("default")).decode()
+
+
 # Setup structured logging
 structlog.configure(
     processors=[
+        # Campos ligados por request via bind_contextvars (ex.: session_id)
+        structlog.contextvars.merge_contextvars,
         structlog.stdlib.filter_by_level,
         structlog.stdlib.add_logger_name,
         structlog.stdlib.add_log_level,
@@ -37,11 +49,14 @@ structlog.configure(
         structlog.processors.StackInfoRenderer(),
         structlog.processors.format_exc_info,
         structlog.processors.UnicodeDecoder(),
-        structlog.processors.JSONRenderer() if settings.log_format == "json" else structlog.dev.ConsoleRenderer(),
+        structlog.processors.JSONRenderer(serializer=_orjson_dumps) if settings.log_format == "json" else structlog.dev.ConsoleRenderer(),
     ],
     context_class=dict,
     logger_factory=structlog.stdlib.LoggerFactory(),
-    wrapper_class=structlog.stdlib.BoundLogger,
+    # Chamadas abaixo do nível configurado retornam antes de qualquer processor
+    wrapper_class=structlog.make_filtering_bound_logger(
+        logging.getLevelName(settings.log_level.upper())
+    ),
     cache_logger_on_first_use=True,
 )
 
@@ -65,18 +80,36 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         zep_url=settings.zep_api_url
     )
     
+    # Readiness só é liberado ao fim da inicialização
+    app.state.is_ready = False
+    
+    # Amostragem de CPU em background para os health checks
+    cpu_sampler_task = asyncio.create_task(health.cpu_sampler(metrics))
+    metrics.start_system_metrics()
+    
     try:
-        # Inicializa o cliente Zep
-        zep_client = await get_zep_client_sync()
+        # Inicializa o cliente Zep uma única vez; as rotas leem de app.state
+        app.state.zep = await get_zep_client_sync()
         logger.info("zep_client_initialized_on_startup")
         
-        # Testa conexão com Zep
+        # Singletons resolvidos uma vez; handlers leem direto de app.state
+        app.state.metrics = metrics
+        app.state.cache = None
+        if settings.cache_enabled:
+            try:
+                app.state.cache = await get_cache_instance()
+            except Exception as e:
+                logger.warning("cache_initialization_failed", error=str(e))
+        health.bind_cache(app.state.cache)
+        
+        # Aquece conexões e as queries fixas do graph antes do primeiro request
         try:
-            # Aqui poderia fazer um health check inicial
+            await graph.warmup(app.state.zep)
             logger.info("zep_connection_verified")
         except Exception as e:
             logger.warning("zep_connection_check_failed", error=str(e))
         
+        app.state.is_ready = True
         yield
         
     except Exception as e:
@@ -85,6 +118,18 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     finally:
         # Shutdown
         logger.info("application_shutting_down")
+        app.state.is_ready = False
+        cpu_sampler_task.cancel()
+        metrics.stop_system_metrics()
+        health.bind_cache(None)
+        await graph.add_batcher.close()
+        zep_client = getattr(app.state, "zep", None)
+        if zep_client is not None:
+            await zep_client.close()
+        # Último flush das estatísticas do cache e fim das tasks de background
+        cache = getattr(app.state, "cache", None)
+        if cache is not None:
+            await cache.close()
 
 
 # Criar aplicação FastAPI
@@ -97,10 +142,11 @@ app = FastAPI(
     openapi_url="/openapi.json" if settings.docs_enabled or settings.debug else None,
     lifespan=lifespan,
     # Configurações de performance
+    default_response_class=ORJSONResponse,
     generate_unique_id_function=lambda route: f"{route.tags[0]}-{route.name}" if route.tags else route.name,
 )
 
-# Middleware para CORS
+# Middleware para CORS (frozenset: o Starlette testa a origem com `in` a cada request)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins,
@@ -109,8 +155,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Middleware para compressão GZIP
-if settings.enable_gzip:
+# Middleware para compressão: Brotli quando o cliente aceita 'br', GZIP caso contrário
+if settings.enable_brotli and BrotliMiddleware is not None:
+    app.add_middleware(
+        BrotliMiddleware,
+        quality=settings.brotli_quality,
+        minimum_size=1000,
+        gzip_fallback=settings.enable_gzip
+    )
+elif settings.enable_gzip:
     app.add_middleware(GZipMiddleware, minimum_size=1000)
 
 # Middleware de segurança
@@ -125,62 +178,28 @@ if settings.rate_limit_enabled:
 # Middleware personalizado para logging e métricas
 @app.middleware("http")
 async def logging_and_metrics_middleware(request: Request, call_next):
-    """Middleware para logging estruturado e métricas Prometheus."""
-    start_time = time.time()
+    """
+    Middleware para logging estruturado e métricas Prometheus.
     
-    # Informações da request
+    Emite um único registro por request; os handlers contribuem com
+    campos extras via request.state.log_extra.
+    """
+    start_time = time.perf_counter()
     method = request.method
-    url = str(request.url)
     path = request.url.path
-    user_agent = request.headers.get("user-agent", "")
-    client_ip = request.client.host if request.client else "unknown"
-    
-    logger.info(
-        "request_started",
-        method=method,
-        path=path,
-        client_ip=client_ip,
-        user_agent=user_agent
-    )
     
     try:
         # Processar request
         response = await call_next(request)
         
-        # Calcular duração
-        duration = time.time() - start_time
-        
-        # Atualizar métricas Prometheus usando o sistema novo
-        user_type = "authenticated" if hasattr(request.state, "user") else "anonymous"
-        
-        metrics.record_api_request(
-            method=method,
-            endpoint=path,
-            status_code=response.status_code,
-            duration=duration,
-            user_type=user_type
-        )
-        
-        # Log da response
-        logger.info(
-            "request_completed",
-            method=method,
-            path=path,
-            status_code=response.status_code,
-            duration_ms=round(duration * 1000, 2),
-            client_ip=client_ip
-        )
-        
-        return response
-        
     except Exception as e:
         # Calcular duração mesmo em caso de erro
-        duration = time.time() - start_time
+        duration = time.perf_counter() - start_time
         
         # Métricas para erro
         metrics.record_api_request(
             method=method,
-            endpoint=path,
+            endpoint=_metrics_endpoint(request),
             status_code=500,
             duration=duration,
             user_type="anonymous"
@@ -189,15 +208,65 @@ async def logging_and_metrics_middleware(request: Request, call_next):
         # Log do erro
         logger.error(
             "request_failed",
-            method=method,
-            path=path,
-            error=str(e),
-            duration_ms=round(duration * 1000, 2),
-            client_ip=client_ip
+            **_request_log_fields(request, method, path, duration),
+            error=str(e)
         )
         
         # Re-raise para o FastAPI tratar
         raise
+    
+    # Calcular duração
+    duration = time.perf_counter() - start_time
+    
+    # Atualizar métricas Prometheus usando o sistema novo
+    user_type = "authenticated" if hasattr(request.state, "user") else "anonymous"
+    
+    metrics.record_api_request(
+        method=method,
+        endpoint=_metrics_endpoint(request),
+        status_code=response.status_code,
+        duration=duration,
+        user_type=user_type
+    )
+    
+    # Registro único da request
+    logger.info(
+        "request_completed",
+        **_request_log_fields(request, method, path, duration),
+        status_code=response.status_code
+    )
+    
+    return response
+
+
+def _metrics_endpoint(request: Request) -> str:
+    """Template da rota para o label de endpoint (path concreto geraria uma série por ID)."""
+    route = request.scope.get("route")
+    return getattr(route, "path_format", None) or metrics.UNMATCHED_ENDPOINT
+
+
+def _request_log_fields(
+    request: Request, method: str, path: str, duration: float
+) -> Dict[str, Any]:
+    """Campos do registro único de request (rota, ids do path e extras do handler)."""
+    route = request.scope.get("route")
+    fields: Dict[str, Any] = {
+        "method": method,
+        "path": path,
+        "route": getattr(route, "path", path),
+        "duration_ms": round(duration * 1000, 2),
+        "client_ip": request.client.host if request.client else "unknown"
+    }
+    # Tamanho do corpo via Content-Length: O(1), sem ler nem serializar o body
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit():
+        fields["request_size"] = int(content_length)
+    path_params = request.path_params
+    for key in ("user_id", "group_id"):
+        if key in path_params:
+            fields[key] = path_params[key]
+    fields.update(getattr(request.state, "log_extra", None) or {})
+    return fields
 
 
 # Exception handlers globais
@@ -245,16 +314,13 @@ async def general_exception_handler(request: Request, exc: Exception):
 
 # Rota para métricas Prometheus
 @app.get("/metrics", include_in_schema=False)
-async def get_metrics():
+async def get_metrics(request: Request):
     """Endpoint para métricas Prometheus."""
     if not settings.prometheus_enabled:
         raise HTTPException(status_code=404, detail="Metrics disabled")
     
-    # Usar o registry do sistema de métricas
-    return Response(
-        content=metrics.generate_metrics(),
-        media_type=CONTENT_TYPE_LATEST
-    )
+    # Payload do registry cacheado por METRICS_RENDER_TTL, com ETag
+    return await metrics.render(request)
 
 
 # Rota raiz
@@ -362,7 +428,9 @@ if __name__ == "__main__":
         "src.main:app",
         host=settings.host,
         port=settings.port,
+        loop="uvloop",
+        http="httptools",
         reload=settings.debug,
         log_level=settings.log_level.lower(),
-        access_log=True,
+        access_log=False,
     ) 
\ No newline at end of file
@@ -19,6 +19,7 @@ os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
 os.environ.setdefault("PROMETHEUS_ENABLED", "false")
 os.environ.setdefault("SECURITY_HEADERS_ENABLED", "false")
 os.environ.setdefault("SECURITY_MIDDLEWARE_ENABLED", "false")
+os.environ.setdefault("RESOURCE_CACHE_TTL", "0")
 
 from src.core.config import settings
 
@@ -47,6 +48,17 @@ def reset_settings():
         setattr(settings, field_name, value)
 
 
+@pytest.fixture(autouse=True)
+def reset_circuit_breakers():
+    """Fixture para isolar o estado dos circuit breakers entre testes."""
+    from src.core.resilience import get_circuit_breakers
+    
+    yield
+    
+    for breaker in get_circuit_breakers().values():
+        breaker.reset()
+
+
 @pytest.fixture
 def test_settings():
     """Fixture para configurações de teste."""
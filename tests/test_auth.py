@@ -2,16 +2,23 @@
 Testes para sistema de autenticação JWT.
 """
 
+import time
 import pytest
 from datetime import datetime, timedelta
+from unittest.mock import patch
 from fastapi import HTTPException
+from jose import jwt, JWTError
+from jose.exceptions import ExpiredSignatureError
 
+from src.core.auth import jwt_auth
 from src.core.auth.jwt_auth import (
     create_access_token,
     verify_token,
     TokenData,
     AuthError,
-    generate_test_token
+    generate_test_token,
+    _sign,
+    _decode
 )
 from src.core.config import settings
 
@@ -63,6 +70,19 @@ class TestJWTAuth:
         assert token_data.scopes == scopes
         assert isinstance(token_data.exp, datetime)
     
+    def test_verify_token_uses_cache(self):
+        """Testa que um token já verificado não é decodificado de novo."""
+        from unittest.mock import patch
+        from src.core.auth import jwt_auth
+        
+        token = create_access_token(user_id="cached_user", scopes=["read"])
+        first = verify_token(token)
+        
+        with patch.object(jwt_auth.jwt, "decode", side_effect=AssertionError("decode called")):
+            second = verify_token(token)
+        
+        assert second is first
+    
     def test_verify_invalid_token(self):
         """Testa verificação de token inválido."""
         invalid_token = "invalid.token.here"
@@ -279,4 +299,59 @@ class TestRequireScopes:
         user_complete = TokenData(user_id="user2", scopes=["read", "write", "admin"])
         
         result = require_read_write(user_complete)
-        assert result == user_complete
\ No newline at end of file
+        assert result == user_complete
+
+class TestHS256FastPath:
+    """Testes para o encode/decode HS256 próprio (_sign/_decode)."""
+    
+    SECRET = "fast-path-secret"
+    
+    def _claims(self, **extra):
+        now = int(time.time())
+        return {"sub": "fast_user", "scopes": ["read"], "iat": now, "exp": now + 60, **extra}
+    
+    def test_sign_interops_with_jose(self):
+        """Testa que o token de _sign é aceito pelo python-jose."""
+        claims = self._claims()
+        
+        token = _sign(claims, self.SECRET)
+        
+        assert jwt.decode(token, self.SECRET, algorithms=["HS256"]) == claims
+        assert _decode(token, self.SECRET) == claims
+    
+    def test_tampered_signature_rejected(self):
+        """Testa que uma assinatura trocada é rejeitada no fast path."""
+        claims = self._claims()
+        signing_input = _sign(claims, self.SECRET).rsplit(".", 1)[0]
+        forged_signature = _sign(claims, "other-secret").rsplit(".", 1)[1]
+        
+        with pytest.raises(JWTError):
+            _decode(f"{signing_input}.{forged_signature}", self.SECRET)
+    
+    def test_expired_token_raises(self):
+        """Testa que um token expirado no fast path lança ExpiredSignatureError."""
+        token = _sign(self._claims(exp=int(time.time()) - 10), self.SECRET)
+        
+        with patch.object(jwt_auth.jwt, "decode", side_effect=AssertionError("jose called")):
+            with pytest.raises(ExpiredSignatureError):
+                _decode(token, self.SECRET)
+    
+    def test_extra_claims_fall_back_to_jose(self):
+        """Testa que claims fora do formato emitido são decodificados pelo jose."""
+        claims = self._claims(role="operator")
+        token = _sign(claims, self.SECRET)
+        
+        with patch.object(jwt_auth.jwt, "decode", wraps=jwt.decode) as jose_decode:
+            assert _decode(token, self.SECRET) == claims
+        
+        jose_decode.assert_called_once()
+    
+    def test_different_header_falls_back_to_jose(self):
+        """Testa que um header diferente do padrão é decodificado pelo jose."""
+        claims = self._claims()
+        token = jwt.encode(claims, self.SECRET, algorithm="HS256", headers={"kid": "k1"})
+        
+        with patch.object(jwt_auth.jwt, "decode", wraps=jwt.decode) as jose_decode:
+            assert _decode(token, self.SECRET) == claims
+        
+        jose_decode.assert_called_once()
@@ -8,6 +8,7 @@ from unittest.mock import AsyncMock, patch, MagicMock
 
 from src.core.cache.redis_cache import RedisCache, CacheError, cached
 from src.core.config import settings
+from src.core.resilience import get_circuit_breaker
 
 
 @pytest.fixture
@@ -19,6 +20,10 @@ async def cache_instance():
     mock_redis = AsyncMock()
     cache._redis_pool = mock_redis
     
+    # L1 em processo e circuit breaker são compartilhados pelo singleton
+    cache._local.clear()
+    get_circuit_breaker("cache").reset()
+    
     return cache, mock_redis
 
 
@@ -64,12 +69,32 @@ class TestRedisCache:
         deserialized = cache._deserialize_data(serialized)
         assert deserialized == data_str
     
+    async def test_serialize_compresses_large_values(self):
+        """Testa compressão transparente de valores grandes."""
+        cache = RedisCache()
+        
+        data = {"context": "x" * (settings.cache_compression_min_size * 4)}
+        serialized = cache._serialize_data(data)
+        
+        assert serialized.startswith(b"\x01")
+        assert len(serialized) < settings.cache_compression_min_size
+        assert cache._deserialize_data(serialized) == data
+        
+        # Valores pequenos seguem como JSON puro
+        assert cache._serialize_data({"a": 1}) == b'{"a":1}'
+    
+    async def test_deserialize_legacy_plain_string(self):
+        """Testa leitura de valores antigos gravados sem JSON."""
+        cache = RedisCache()
+        
+        assert cache._deserialize_data(b"plain value") == "plain value"
+    
     async def test_get_cache_hit(self, cache_instance):
         """Testa cache hit (dados encontrados)."""
         cache, mock_redis = cache_instance
         
         # Configurar mock para retornar dados
-        test_data = '{"cached": "data"}'
+        test_data = b'{"cached": "data"}'
         mock_redis.get.return_value = test_data
         
         # Simular cache habilitado
@@ -109,6 +134,43 @@ class TestRedisCache:
         finally:
             settings.cache_enabled = original_cache_enabled
     
+    async def test_get_served_from_local_cache(self, cache_instance):
+        """Testa que chaves quentes são servidas do L1 sem ir ao Redis."""
+        cache, mock_redis = cache_instance
+        mock_redis.get.return_value = b'{"cached": "data"}'
+        
+        original_cache_enabled = settings.cache_enabled
+        settings.cache_enabled = True
+        
+        try:
+            assert await cache.get("test", "key1") == {"cached": "data"}
+            assert await cache.get("test", "key1") == {"cached": "data"}
+            mock_redis.get.assert_called_once()
+            
+            # delete invalida o L1
+            await cache.delete("test", "key1")
+            mock_redis.get.return_value = None
+            assert await cache.get("test", "key1") is None
+            assert mock_redis.get.call_count == 2
+        finally:
+            settings.cache_enabled = original_cache_enabled
+    
+    async def test_invalidate_local_cache(self, cache_instance):
+        """Testa invalidações do client tracking aplicadas ao L1."""
+        cache, _ = cache_instance
+        key1 = cache._generate_key("test", "key1")
+        key2 = cache._generate_key("test", "key2")
+        cache._local_set(key1, b"1", 60)
+        cache._local_set(key2, b"2", 60)
+        
+        cache._invalidate_local([key1.encode()])
+        assert cache._local_get(key1) is None
+        assert cache._local_get(key2) == b"2"
+        
+        # FLUSHDB/FLUSHALL chega como lista nula
+        cache._invalidate_local(None)
+        assert cache._local_get(key2) is None
+    
     async def test_get_cache_disabled(self, cache_instance):
         """Testa get quando cache está desabilitado."""
         cache, mock_redis = cache_instance
@@ -225,12 +287,12 @@ class TestRedisCache:
                 yield key
         
         mock_redis.scan_iter = mock_scan_iter
-        mock_redis.delete.return_value = 3
+        mock_redis.unlink.return_value = 3
         
         result = await cache.clear_pattern("test:*")
         
-        # Verificar chamada delete
-        mock_redis.delete.assert_called_once_with("key1", "key2", "key3")
+        # Verificar chamada unlink
+        mock_redis.unlink.assert_called_once_with("key1", "key2", "key3")
         
         # Resultado deve ser 3
         assert result == 3
@@ -255,19 +317,27 @@ class TestRedisCache:
         large_data_ttl = cache._calculate_dynamic_ttl("test", 20000)
         assert small_data_ttl > large_data_ttl
     
+    async def test_settings_change_reloads_cache_flags(self):
+        """Testa que alterações em settings chegam às constantes do módulo."""
+        cache = RedisCache()
+        
+        original_ttl = settings.cache_ttl
+        settings.cache_ttl = 1000
+        
+        try:
+            assert cache._calculate_dynamic_ttl("test", 100) == 1000
+        finally:
+            settings.cache_ttl = original_ttl
+        
+        assert cache._calculate_dynamic_ttl("test", 100) == original_ttl
+    
     async def test_get_cache_stats(self, cache_instance):
         """Testa obtenção de estatísticas do cache."""
         cache, mock_redis = cache_instance
         
         # Configurar mocks
-        mock_redis.hgetall.return_value = {"hits": "100", "misses": "20"}
-        
-        # Mock scan_iter como async iterator
-        async def mock_scan_iter(*args, **kwargs):
-            for key in ["key1", "key2", "key3"]:
-                yield key
-        
-        mock_redis.scan_iter = mock_scan_iter
+        mock_redis.hgetall.return_value = {b"hits": b"100", b"misses": b"20"}
+        mock_redis.dbsize.return_value = 3
         mock_redis.info.return_value = {
             "redis_version": "6.2.0",
             "connected_clients": 5,
@@ -285,6 +355,72 @@ class TestRedisCache:
         assert stats["active_keys"] == 3
         assert "redis_info" in stats
 
+    
+    async def test_open_breaker_skips_redis(self, cache_instance):
+        """Testa que com o breaker aberto as operações não chamam o Redis."""
+        cache, mock_redis = cache_instance
+        
+        with patch.object(get_circuit_breaker("cache"), "allow_request", return_value=False):
+            assert await cache.get("test", "key", default="fallback") == "fallback"
+            assert await cache.set("test", "key", value={"a": 1}) is False
+            assert await cache.delete("test", "key") is False
+            assert await cache.get_many([("test", "a"), ("test", "b")]) == [None, None]
+            assert await cache.set_many([(("test", "a"), 1)], ttl=60) is False
+            assert await cache.delete_many([("test", "a")]) == 0
+            assert await cache.acquire_fill_lock("test", "key") is True
+            assert await cache.clear_pattern("zep_api:test:*") == 0
+        
+        mock_redis.get.assert_not_called()
+        mock_redis.setex.assert_not_called()
+        mock_redis.delete.assert_not_called()
+        mock_redis.mget.assert_not_called()
+        mock_redis.pipeline.assert_not_called()
+        mock_redis.lock.assert_not_called()
+        mock_redis.scan_iter.assert_not_called()
+    
+    async def test_flush_stats(self, cache_instance):
+        """Testa envio dos contadores locais de hit/miss ao Redis."""
+        cache, _ = cache_instance
+        script = AsyncMock()
+        cache._stats_script = script
+        cache._hits, cache._misses = 3, 1
+        
+        try:
+            await cache._flush_stats()
+            
+            script.assert_called_once()
+            assert script.call_args.kwargs["args"] == [3, 1]
+            assert (cache._hits, cache._misses) == (0, 0)
+            
+            # Falha no Redis devolve os contadores para o próximo flush
+            script.side_effect = Exception("Redis down")
+            cache._hits = 2
+            await cache._flush_stats()
+            assert (cache._hits, cache._misses) == (2, 0)
+        finally:
+            cache._stats_script = None
+            cache._hits = cache._misses = 0
+    
+    async def test_redis_info_cached(self, cache_instance):
+        """Testa que o INFO do Redis é reutilizado dentro do TTL."""
+        cache, mock_redis = cache_instance
+        mock_redis.info.return_value = {"redis_version": "7.2.0"}
+        cache._info_cache = (0.0, {})
+        
+        original_ttl = settings.redis_info_cache_ttl
+        settings.redis_info_cache_ttl = 60.0
+        
+        try:
+            first = await cache._get_redis_info()
+            second = await cache._get_redis_info()
+            
+            assert first == second
+            assert first["version"] == "7.2.0"
+            mock_redis.info.assert_called_once_with("server", "clients", "memory")
+        finally:
+            settings.redis_info_cache_ttl = original_ttl
+            cache._info_cache = (0.0, {})
+
 
 @pytest.mark.asyncio
 class TestCachedDecorator:
@@ -295,7 +431,7 @@ class TestCachedDecorator:
         with patch('src.core.cache.redis_cache.get_cache_instance') as mock_get_cache:
             # Setup mock cache
             mock_cache = AsyncMock()
-            mock_cache.get.return_value = None  # Cache miss
+            mock_cache.get.side_effect = lambda *args, default=None: default  # Cache miss
             mock_get_cache.return_value = mock_cache
             
             @cached("test", ttl=300)
@@ -335,6 +471,86 @@ class TestCachedDecorator:
             mock_cache.get.assert_called_once()
             mock_cache.set.assert_not_called()
 
+    
+    async def test_cached_decorator_caches_none(self):
+        """Testa que um None armazenado é hit e não reexecuta a função."""
+        with patch('src.core.cache.redis_cache.get_cache_instance') as mock_get_cache:
+            mock_cache = AsyncMock()
+            mock_cache.get.return_value = None  # None armazenado
+            mock_get_cache.return_value = mock_cache
+            calls = []
+            
+            @cached("test", ttl=300)
+            async def test_function(arg1):
+                calls.append(arg1)
+                return None
+            
+            assert await test_function("a") is None
+            assert calls == []
+            mock_cache.set.assert_not_called()
+    
+    async def test_cached_decorator_waits_for_fill_lock_owner(self):
+        """Testa que, sem o lock, o request aguarda o valor em vez de recalcular."""
+        from src.core.cache.redis_cache import _MISS
+        
+        with patch('src.core.cache.redis_cache.get_cache_instance') as mock_get_cache, \
+             patch('src.core.cache.redis_cache._FILL_WAIT_INTERVAL', 0):
+            mock_cache = AsyncMock()
+            mock_cache.get.side_effect = [_MISS, _MISS, "filled_by_owner"]
+            mock_cache.acquire_fill_lock.return_value = False  # Outro request preenchendo
+            mock_get_cache.return_value = mock_cache
+            calls = []
+            
+            @cached("test", ttl=300)
+            async def test_function(arg1):
+                calls.append(arg1)
+                return "fresh"
+            
+            assert await test_function("a") == "filled_by_owner"
+            assert calls == []
+            mock_cache.set.assert_not_called()
+            mock_cache.release_fill_lock.assert_not_called()
+    
+    async def test_cached_decorator_wait_counts_single_miss(self, cache_instance):
+        """Testa que a espera pelo lock conta um único miss por consulta."""
+        cache, mock_redis = cache_instance
+        settings.cache_enabled = True
+        cache._hits = cache._misses = 0
+        mock_redis.get.side_effect = [None, None, None, cache._serialize_data("filled_by_owner")]
+        
+        try:
+            with patch('src.core.cache.redis_cache.get_cache_instance', return_value=cache), \
+                 patch.object(cache, 'acquire_fill_lock', return_value=False), \
+                 patch('src.core.cache.redis_cache._FILL_WAIT_INTERVAL', 0):
+                
+                @cached("test", ttl=300)
+                async def test_function(arg1):
+                    return "fresh"
+                
+                assert await test_function("a") == "filled_by_owner"
+            
+            assert (cache._hits, cache._misses) == (0, 1)
+        finally:
+            cache._hits = cache._misses = 0
+    
+    async def test_cached_decorator_kwargs_order(self):
+        """Testa que a ordem dos kwargs não altera a chave."""
+        with patch('src.core.cache.redis_cache.get_cache_instance') as mock_get_cache:
+            mock_cache = AsyncMock()
+            mock_cache.get.side_effect = lambda *args, default=None: default
+            mock_get_cache.return_value = mock_cache
+            
+            @cached("test", ttl=300)
+            async def test_function(arg1, limit=10, offset=0):
+                return [arg1, limit, offset]
+            
+            await test_function("a", limit=5, offset=2)
+            await test_function("a", offset=2, limit=5)
+            
+            first, second = mock_cache.get.call_args_list
+            assert first == second
+            assert first.args == ("test", "test_function", "a", "limit=5", "offset=2")
+
 
 class TestCacheUtils:
     """Testes para utilitários de cache."""
@@ -357,6 +573,21 @@ class TestCacheUtils:
             # Initialize deve ser chamado apenas uma vez
             assert mock_init.call_count == 1
     
+    @pytest.mark.asyncio
+    async def test_get_cache_instance_concurrent_init(self):
+        """Testa que inicializações concorrentes criam um único cache."""
+        from src.core.cache import redis_cache
+        
+        async def slow_init(self):
+            await asyncio.sleep(0.01)
+        
+        with patch.object(redis_cache, '_cache_instance', None), \
+             patch.object(RedisCache, 'initialize', autospec=True, side_effect=slow_init) as mock_init:
+            instances = await asyncio.gather(*(redis_cache.get_cache_instance() for _ in range(5)))
+            
+            assert all(instance is instances[0] for instance in instances)
+            assert mock_init.call_count == 1
+    
     @pytest.mark.asyncio
     async def test_get_cache_context_manager(self):
         """Testa context manager do cache."""
@@ -390,6 +621,33 @@ class TestCacheErrors:
         finally:
             settings.cache_enabled = original_cache_enabled
     
+    @pytest.mark.asyncio
+    async def test_initialization_unix_socket(self):
+        """Testa que URLs unix:// não recebem opções de keepalive TCP."""
+        RedisCache._instance = None
+        RedisCache._redis_pool = None
+        
+        cache = RedisCache()
+        original_url = settings.redis_url
+        settings.redis_url = "unix:///var/run/redis/redis.sock"
+        
+        try:
+            with patch('redis.asyncio.BlockingConnectionPool.from_url') as mock_from_url, \
+                 patch('redis.asyncio.Redis.from_pool') as mock_from_pool:
+                mock_redis = AsyncMock()
+                mock_redis.ping.side_effect = Exception("Connection failed")
+                mock_from_pool.return_value = mock_redis
+                
+                with pytest.raises(CacheError):
+                    await cache.initialize()
+                
+                assert mock_from_url.call_args.args[0] == "unix:///var/run/redis/redis.sock"
+                assert "socket_keepalive" not in mock_from_url.call_args.kwargs
+        finally:
+            settings.redis_url = original_url
+            RedisCache._instance = None
+            RedisCache._redis_pool = None
+    
     @pytest.mark.asyncio
     async def test_initialization_error(self):
         """Testa erro na inicialização do Redis."""
@@ -399,10 +657,10 @@ class TestCacheErrors:
         
         cache = RedisCache()
         
-        with patch('redis.asyncio.from_url') as mock_from_url:
+        with patch('redis.asyncio.Redis.from_pool') as mock_from_pool:
             mock_redis = AsyncMock()
             mock_redis.ping.side_effect = Exception("Connection failed")
-            mock_from_url.return_value = mock_redis
+            mock_from_pool.return_value = mock_redis
             
             # Deve lançar CacheError
             with pytest.raises(CacheError, match="Failed to initialize Redis"):
@@ -0,0 +1,80 @@
+"""
+Testes para o circuit breaker de dependências externas.
+"""
+
+from unittest.mock import patch
+
+from src.core.resilience import CircuitBreaker
+
+
+def _breaker() -> CircuitBreaker:
+    return CircuitBreaker(
+        "test",
+        request_volume_threshold=4,
+        error_threshold_percentage=50.0,
+        sleep_window=10.0
+    )
+
+
+class TestCircuitBreaker:
+    """Testes para transições de estado do CircuitBreaker."""
+    
+    def test_starts_closed(self):
+        """Testa que o breaker começa fechado e permite chamadas."""
+        breaker = _breaker()
+        
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert breaker.allow_request() is True
+    
+    def test_opens_after_error_threshold(self):
+        """Testa abertura quando volume e taxa de erro atingem o limite."""
+        breaker = _breaker()
+        
+        breaker.record_success()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.CLOSED  # Volume abaixo do mínimo
+        
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.allow_request() is False
+        assert breaker.snapshot()["opened_at"] is not None
+    
+    def test_half_open_after_sleep_window(self):
+        """Testa chamada de teste única após o sleep window."""
+        breaker = _breaker()
+        for _ in range(4):
+            breaker.record_failure()
+        
+        with patch("src.core.resilience.circuit_breaker.time.monotonic",
+                   return_value=breaker._opened_monotonic + 11):
+            assert breaker.allow_request() is True
+            assert breaker.state == CircuitBreaker.HALF_OPEN
+            assert breaker.allow_request() is False  # Apenas um teste por vez
+    
+    def test_half_open_success_closes(self):
+        """Testa que sucesso no half-open fecha o circuito."""
+        breaker = _breaker()
+        for _ in range(4):
+            breaker.record_failure()
+        
+        with patch("src.core.resilience.circuit_breaker.time.monotonic",
+                   return_value=breaker._opened_monotonic + 11):
+            breaker.allow_request()
+        breaker.record_success()
+        
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert breaker.failure_count == 0
+    
+    def test_half_open_failure_reopens(self):
+        """Testa que falha no half-open reabre o circuito."""
+        breaker = _breaker()
+        for _ in range(4):
+            breaker.record_failure()
+        
+        with patch("src.core.resilience.circuit_breaker.time.monotonic",
+                   return_value=breaker._opened_monotonic + 11):
+            breaker.allow_request()
+        breaker.record_failure()
+        
+        assert breaker.state == CircuitBreaker.OPEN
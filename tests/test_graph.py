@@ -0,0 +1,58 @@
+"""
+Testes para o micro-batching de escritas no graph.
+"""
+
+import asyncio
+
+import pytest
+
+from src.api.v1.graph import _AddBatcher
+
+
+class _FakeZepClient:
+    """Cliente Zep falso: itens com slow=True só terminam quando liberados."""
+
+    def __init__(self):
+        self.release = asyncio.Event()
+
+    async def add_graph_data_batch(self, items, concurrency=8):
+        if any(item.get("slow") for item in items):
+            await self.release.wait()
+        return [{"added": item["data"]} for item in items]
+
+
+class TestAddBatcher:
+    """Testes para o _AddBatcher."""
+
+    @pytest.mark.asyncio
+    async def test_slow_batch_does_not_delay_later_batch(self):
+        """Testa que um lote lento não bloqueia o despacho do lote seguinte."""
+        batcher = _AddBatcher(batch_size=1, flush_interval=0, concurrency=1, max_in_flight=4)
+        zep_client = _FakeZepClient()
+
+        try:
+            slow = asyncio.ensure_future(batcher.submit(zep_client, data="slow", slow=True))
+            await asyncio.sleep(0)
+
+            fast = await asyncio.wait_for(batcher.submit(zep_client, data="fast"), timeout=1.0)
+
+            assert fast == {"added": "fast"}
+            assert not slow.done()
+
+            zep_client.release.set()
+            assert await asyncio.wait_for(slow, timeout=1.0) == {"added": "slow"}
+        finally:
+            await batcher.close()
+
+    @pytest.mark.asyncio
+    async def test_close_fails_in_flight_batches(self):
+        """Testa que close() falha as escritas de lotes ainda em andamento."""
+        batcher = _AddBatcher(batch_size=1, flush_interval=0, concurrency=1, max_in_flight=4)
+        zep_client = _FakeZepClient()
+
+        pending = asyncio.ensure_future(batcher.submit(zep_client, data="slow", slow=True))
+        await asyncio.sleep(0.01)
+        await batcher.close()
+
+        with pytest.raises(RuntimeError, match="closed"):
+            await pending
@@ -44,23 +44,30 @@ class TestHealthEndpoints:
     
     def test_readiness_probe_success(self, client):
         """Testa readiness probe quando tudo está saudável."""
-        with patch('src.api.v1.health._check_configuration') as mock_config, \
-             patch('src.api.v1.health._check_zep_connectivity') as mock_zep:
-            
-            # Configurar mocks para retornar sucesso
-            mock_config.return_value = {"healthy": True, "response_time": 5.0}
-            mock_zep.return_value = {"healthy": True, "response_time": 100.0}
-            
-            response = client.get("/health/ready")
-            
-            assert response.status_code == 200
-            
-            data = response.json()
-            assert data["status"] == "ready"
-            assert data["healthy"] is True
-            assert "checks" in data
-            assert data["checks"]["configuration"]["healthy"] is True
-            assert data["checks"]["zep"]["healthy"] is True
+        app.state.is_ready = True
+        
+        try:
+            with patch('src.api.v1.health._check_configuration') as mock_config, \
+                 patch('src.api.v1.health._check_zep_connectivity') as mock_zep:
+                
+                # Configurar mocks para retornar sucesso
+                mock_config.return_value = {"healthy": True, "response_time_ns": 5.0}
+                
+                response = client.get("/health/ready")
+                
+                assert response.status_code == 200
+                
+                data = response.json()
+                assert data["status"] == "ready"
+                assert data["healthy"] is True
+                assert "checks" in data
+                assert data["checks"]["configuration"]["healthy"] is True
+                assert data["checks"]["zep"]["healthy"] is True
+                
+                # Readiness não faz chamadas de rede ao Zep
+                mock_zep.assert_not_called()
+        finally:
+            app.state.is_ready = False
     
     def test_readiness_probe_unhealthy(self, client):
         """Testa readiness probe quando serviços estão indisponíveis."""
@@ -88,11 +95,11 @@ class TestHealthEndpoints:
              patch('src.api.v1.health._check_database_connectivity') as mock_db:
             
             # Configurar todos os mocks para sucesso
-            mock_config.return_value = {"healthy": True, "response_time": 5.0}
-            mock_zep.return_value = {"healthy": True, "response_time": 100.0}
-            mock_cache.return_value = {"healthy": True, "response_time": 10.0}
-            mock_system.return_value = {"healthy": True, "response_time": 15.0}
-            mock_db.return_value = {"healthy": True, "response_time": 20.0}
+            mock_config.return_value = {"healthy": True, "response_time_ns": 5.0}
+            mock_zep.return_value = {"healthy": True, "response_time_ns": 100.0}
+            mock_cache.return_value = {"healthy": True, "response_time_ns": 10.0}
+            mock_system.return_value = {"healthy": True, "response_time_ns": 15.0}
+            mock_db.return_value = {"healthy": True, "response_time_ns": 20.0}
             
             response = client.get("/health/detailed")
             
@@ -114,16 +121,21 @@ class TestHealthEndpoints:
     
     def test_detailed_health_check_degraded(self, client):
         """Testa health check com serviços opcionais degradados."""
-        with patch('src.api.v1.health._check_configuration') as mock_config, \
+        from src.api.v1.health import _CHECK_NAMES
+        
+        # Cache e database habilitados para que seus checks rodem
+        with patch('src.api.v1.health._ACTIVE_CHECKS', _CHECK_NAMES), \
+             patch.dict('src.api.v1.health._SKIPPED_CHECKS', clear=True), \
+             patch('src.api.v1.health._check_configuration') as mock_config, \
              patch('src.api.v1.health._check_zep_connectivity') as mock_zep, \
              patch('src.api.v1.health._check_cache_connectivity') as mock_cache, \
              patch('src.api.v1.health._check_system_resources') as mock_system, \
              patch('src.api.v1.health._check_database_connectivity') as mock_db:
             
             # Serviços críticos saudáveis
-            mock_config.return_value = {"healthy": True, "response_time": 5.0}
-            mock_zep.return_value = {"healthy": True, "response_time": 100.0}
-            mock_system.return_value = {"healthy": True, "response_time": 15.0}
+            mock_config.return_value = {"healthy": True, "response_time_ns": 5.0}
+            mock_zep.return_value = {"healthy": True, "response_time_ns": 100.0}
+            mock_system.return_value = {"healthy": True, "response_time_ns": 15.0}
             
             # Serviços opcionais com problemas
             mock_cache.return_value = {"healthy": False, "error": "Redis down"}
@@ -149,11 +161,11 @@ class TestHealthEndpoints:
              patch('src.api.v1.health._check_database_connectivity') as mock_db:
             
             # Serviço crítico falhando
-            mock_config.return_value = {"healthy": True, "response_time": 5.0}
+            mock_config.return_value = {"healthy": True, "response_time_ns": 5.0}
             mock_zep.return_value = {"healthy": False, "error": "Zep unreachable"}
-            mock_cache.return_value = {"healthy": True, "response_time": 10.0}
-            mock_system.return_value = {"healthy": True, "response_time": 15.0}
-            mock_db.return_value = {"healthy": True, "response_time": 20.0}
+            mock_cache.return_value = {"healthy": True, "response_time_ns": 10.0}
+            mock_system.return_value = {"healthy": True, "response_time_ns": 15.0}
+            mock_db.return_value = {"healthy": True, "response_time_ns": 20.0}
             
             response = client.get("/health/detailed")
             
@@ -203,9 +215,9 @@ class TestHealthEndpoints:
              patch('src.api.v1.health._check_system_resources') as mock_system:
             
             # Configurar mocks
-            mock_zep.return_value = {"healthy": True, "response_time": 100.0}
-            mock_cache.return_value = {"healthy": True, "response_time": 10.0}
-            mock_system.return_value = {"healthy": True, "response_time": 15.0}
+            mock_zep.return_value = {"healthy": True, "response_time_ns": 100.0}
+            mock_cache.return_value = {"healthy": True, "response_time_ns": 10.0}
+            mock_system.return_value = {"healthy": True, "response_time_ns": 15.0}
             
             response = client.get("/health/circuit-breaker")
             
@@ -253,7 +265,7 @@ class TestHealthCheckFunctions:
             result = await _check_configuration()
             
             assert result["healthy"] is True
-            assert "response_time" in result
+            assert "response_time_ns" in result
             assert result["details"]["missing_configs"] is None
         finally:
             # Restaurar valores originais
@@ -291,54 +303,49 @@ class TestHealthCheckFunctions:
         """Testa verificação de conectividade Zep bem-sucedida."""
         from src.api.v1.health import _check_zep_connectivity
         
-        with patch('src.api.v1.health.get_zep_client_sync') as mock_get_client:
-            # Mock do cliente Zep
-            mock_client = AsyncMock()
-            mock_client.get_memory = AsyncMock(return_value={
-                "session_id": "health_check_session",
-                "context": "",
-                "messages": [],
-                "relevant_facts": []
-            })
-            mock_get_client.return_value = mock_client
-            
-            result = await _check_zep_connectivity()
-            
-            assert result["healthy"] is True
-            assert "response_time" in result
-            assert result["details"]["operational"] is True
+        # Mock do cliente Zep (em produção vem de app.state.zep)
+        mock_client = AsyncMock()
+        mock_client.get_memory = AsyncMock(return_value={
+            "session_id": "health_check_session",
+            "context": "",
+            "messages": [],
+            "relevant_facts": []
+        })
+        
+        result = await _check_zep_connectivity(mock_client)
+        
+        assert result["healthy"] is True
+        assert "response_time_ns" in result
+        assert result["details"]["operational"] is True
     
     @pytest.mark.asyncio
     async def test_check_zep_connectivity_failure(self):
         """Testa verificação de conectividade Zep com falha."""
         from src.api.v1.health import _check_zep_connectivity
         
-        with patch('src.api.v1.health.get_zep_client_sync') as mock_get_client:
-            # Mock que lança exceção
-            mock_get_client.side_effect = Exception("Connection failed")
-            
-            result = await _check_zep_connectivity()
-            
-            assert result["healthy"] is False
-            assert "error" in result
-            assert "Connection failed" in result["error"]
-    
-    @pytest.mark.asyncio
-    async def test_check_cache_connectivity_disabled(self):
-        """Testa verificação de cache quando está desabilitado."""
-        from src.api.v1.health import _check_cache_connectivity
+        # Cliente que falha na chamada ao Zep
+        mock_client = AsyncMock()
+        mock_client.get_memory = AsyncMock(side_effect=Exception("Connection failed"))
         
-        # Simular cache desabilitado
-        original_cache_enabled = settings.cache_enabled
-        settings.cache_enabled = False
+        result = await _check_zep_connectivity(mock_client)
         
-        try:
-            result = await _check_cache_connectivity()
-            
-            assert result["healthy"] is True
-            assert result["details"]["status"] == "disabled"
-        finally:
-            settings.cache_enabled = original_cache_enabled
+        assert result["healthy"] is False
+        assert "Connection failed" in result["details"]["error"]
+        
+        # Sem cliente em app.state (startup não concluído)
+        result = await _check_zep_connectivity(None)
+        
+        assert result["healthy"] is False
+        assert "not initialized" in result["error"]
+    
+    def test_check_cache_connectivity_disabled(self):
+        """Testa que o cache desabilitado no startup tem resultado fixo."""
+        from src.api.v1.health import _ACTIVE_CHECKS, _SKIPPED_CHECKS
+        
+        # conftest sobe a aplicação com CACHE_ENABLED=false
+        assert "cache" not in _ACTIVE_CHECKS
+        assert _SKIPPED_CHECKS["cache"]["healthy"] is True
+        assert _SKIPPED_CHECKS["cache"]["details"]["status"] == "disabled"
     
     @pytest.mark.asyncio
     async def test_check_cache_connectivity_success(self):
@@ -350,29 +357,36 @@ class TestHealthCheckFunctions:
         settings.cache_enabled = True
         
         try:
+            # Mock both the cache instance AND the initialization
             with patch('src.api.v1.health.get_cache_instance') as mock_get_cache:
+                
                 # Mock do cache
                 mock_cache = AsyncMock()
-                mock_cache.redis = AsyncMock()
-                mock_cache.redis.ping = AsyncMock(return_value=True)
+                mock_cache.redis = MagicMock()
                 
-                # Create a store to track set/get operations
+                # Pipeline que executa set/get/delete sobre um store local
                 cache_store = {}
+                queued = []
+                pipe = MagicMock()
+                pipe.set.side_effect = lambda key, value, ex=None: queued.append(("set", key, value))
+                pipe.get.side_effect = lambda key: queued.append(("get", key, None))
+                pipe.delete.side_effect = lambda key: queued.append(("delete", key, None))
                 
-                async def mock_set(namespace, key, value, ttl=None):
-                    cache_store[f"{namespace}:{key}"] = value
-                    return True
-                
-                async def mock_get(namespace, key):
-                    return cache_store.get(f"{namespace}:{key}")
+                async def mock_execute():
+                    results = []
+                    for op, key, value in queued:
+                        if op == "set":
+                            cache_store[key] = value
+                            results.append(True)
+                        elif op == "get":
+                            results.append(cache_store.get(key))
+                        else:
+                            results.append(1 if cache_store.pop(key, None) is not None else 0)
+                    queued.clear()
+                    return results
                 
-                async def mock_delete(namespace, key):
-                    cache_store.pop(f"{namespace}:{key}", None)
-                    return True
-                
-                mock_cache.set = mock_set
-                mock_cache.get = mock_get
-                mock_cache.delete = mock_delete
+                pipe.execute = mock_execute
+                mock_cache.redis.pipeline.return_value = pipe
                 mock_cache.get_cache_stats = AsyncMock(return_value={
                     "hit_ratio": 0.8,
                     "active_keys": 50,
@@ -392,13 +406,15 @@ class TestHealthCheckFunctions:
         """Testa verificação de recursos do sistema."""
         from src.api.v1.health import _check_system_resources
         
-        with patch('psutil.cpu_percent') as mock_cpu, \
+        mock_process_instance = MagicMock()
+        
+        # CPU vem do sampler em background e o Process é criado no import
+        with patch('src.api.v1.health._last_cpu', 50.0), \
              patch('psutil.virtual_memory') as mock_memory, \
              patch('psutil.disk_usage') as mock_disk, \
-             patch('psutil.Process') as mock_process:
+             patch('src.api.v1.health._PROCESS', mock_process_instance):
             
             # Mock dos recursos do sistema
-            mock_cpu.return_value = 50.0  # 50% CPU
             
             mock_memory_info = MagicMock()
             mock_memory_info.total = 8 * 1024**3  # 8GB
@@ -412,12 +428,10 @@ class TestHealthCheckFunctions:
             mock_disk_info.free = 50 * 1024**3   # 50GB livre
             mock_disk.return_value = mock_disk_info
             
-            mock_process_instance = MagicMock()
             mock_memory_info_process = MagicMock()
             mock_memory_info_process.rss = 100 * 1024**2  # 100MB
             mock_process_instance.memory_info.return_value = mock_memory_info_process
             mock_process_instance.memory_percent.return_value = 1.2
-            mock_process.return_value = mock_process_instance
             
             result = await _check_system_resources()
             
@@ -0,0 +1,201 @@
+"""
+Testes para o coletor de métricas Prometheus.
+"""
+
+import gzip
+from typing import Optional
+from unittest.mock import patch
+
+import psutil
+import pytest
+from prometheus_client import CollectorRegistry
+from starlette.requests import Request
+
+from src.core.metrics import PrometheusMetrics, timed_operation
+
+
+def _metrics() -> PrometheusMetrics:
+    return PrometheusMetrics(registry=CollectorRegistry())
+
+
+def _request(headers: Optional[dict] = None) -> Request:
+    raw = [(k.encode(), v.encode()) for k, v in (headers or {}).items()]
+    return Request({"type": "http", "method": "GET", "path": "/metrics", "headers": raw})
+
+
+def _sample(metrics: PrometheusMetrics, name: str, labels: dict) -> float:
+    return metrics.registry.get_sample_value(name, labels)
+
+
+class TestPrometheusMetrics:
+    """Testes para os métodos record_* do PrometheusMetrics."""
+
+    def test_child_cache_reuses_labeled_child(self):
+        """Testa que o child de uma combinação de labels é resolvido uma vez."""
+        metrics = _metrics()
+
+        first = metrics._child(metrics.cache_operations_total, ("get", "user", "hit"))
+        second = metrics._child(metrics.cache_operations_total, ("get", "user", "hit"))
+
+        assert first is second
+        assert first is metrics.cache_operations_total.labels("get", "user", "hit")
+
+    def test_record_api_request(self):
+        """Testa contadores e histogramas de request da API."""
+        metrics = _metrics()
+
+        for _ in range(2):
+            metrics.record_api_request("GET", "/health", 200, 0.01, user_type="anonymous")
+
+        labels = {"method": "GET", "endpoint": "/health"}
+        assert _sample(
+            metrics, "api_requests_total",
+            {**labels, "status_code": "200", "user_type": "anonymous"}
+        ) == 2
+        assert _sample(metrics, "api_request_duration_seconds_count", labels) == 2
+
+    def test_record_api_request_groups_concrete_paths(self):
+        """Testa que paths com IDs numéricos não criam séries próprias."""
+        metrics = _metrics()
+
+        metrics.record_api_request("GET", "/api/v1/users/123", 200, 0.01)
+        metrics.record_api_request("GET", "/api/v1/users/456", 200, 0.01)
+
+        assert _sample(
+            metrics, "api_request_duration_seconds_count",
+            {"method": "GET", "endpoint": PrometheusMetrics.UNMATCHED_ENDPOINT}
+        ) == 2
+
+    def test_record_zep_operation_without_user_label(self):
+        """Testa que operações Zep não são rotuladas por usuário."""
+        metrics = _metrics()
+
+        metrics.record_zep_operation("memory_add", 0.1, user_id_hash="abcdef123456")
+        metrics.record_zep_operation("memory_add", 0.1, user_id_hash="fedcba654321")
+
+        assert _sample(
+            metrics, "zep_operations_total",
+            {"operation": "memory_add", "status": "success"}
+        ) == 2
+
+    @pytest.mark.asyncio
+    async def test_metrics_summary_reuses_snapshot(self):
+        """Testa que o resumo usa o snapshot em vez de nova coleta do psutil."""
+        metrics = _metrics()
+        await metrics.update_system_metrics()
+
+        with patch("src.core.metrics.prometheus.psutil") as mock_psutil:
+            summary = await metrics.get_metrics_summary()
+
+        mock_psutil.cpu_percent.assert_not_called()
+        mock_psutil.virtual_memory.assert_not_called()
+        assert set(summary["system"]) == {"cpu_percent", "memory_percent", "disk_percent"}
+
+    @pytest.mark.asyncio
+    async def test_timed_operation_records_errors(self):
+        """Testa que timed_operation registra duração e status de erro."""
+        metrics = _metrics()
+
+        with pytest.raises(ValueError):
+            async with timed_operation(metrics, "cache_operation", operation="get", prefix="user"):
+                raise ValueError("boom")
+
+        assert _sample(
+            metrics, "cache_operations_total",
+            {"operation": "get", "prefix": "user", "status": "error"}
+        ) == 1
+        assert _sample(
+            metrics, "cache_operation_duration_seconds_count",
+            {"operation": "get", "prefix": "user"}
+        ) == 1
+
+    @pytest.mark.asyncio
+    async def test_render_cache_and_etag(self):
+        """Testa reuso do payload dentro do TTL e 304 com If-None-Match."""
+        metrics = _metrics()
+
+        first = await metrics.render(_request())
+        etag = first.headers["etag"]
+        metrics.record_cache_operation("get", "user", 0.001)
+
+        # Dentro do TTL o payload é reaproveitado mesmo com novas observações
+        assert metrics.generate_metrics() == first.body
+
+        not_modified = await metrics.render(_request({"if-none-match": etag}))
+        assert not_modified.status_code == 304
+        assert not_modified.body == b""
+
+    @pytest.mark.asyncio
+    async def test_render_negotiates_openmetrics(self):
+        """Testa que o Accept do scraper escolhe o formato de exposição."""
+        metrics = _metrics()
+
+        text = await metrics.render(_request())
+        om = await metrics.render(_request({"accept": "application/openmetrics-text; version=1.0.0"}))
+
+        assert text.headers["content-type"].startswith("text/plain")
+        assert om.headers["content-type"].startswith("application/openmetrics-text")
+        assert om.body.endswith(b"# EOF\n")
+
+    @pytest.mark.asyncio
+    async def test_render_serves_cached_gzip(self):
+        """Testa que o payload gzip é comprimido uma vez por render."""
+        metrics = _metrics()
+        headers = {"accept-encoding": "gzip, deflate"}
+
+        with patch("src.core.metrics.prometheus.gzip.compress", wraps=gzip.compress) as compress:
+            first = await metrics.render(_request(headers))
+            second = await metrics.render(_request(headers))
+
+        compress.assert_called_once()
+        assert first.headers["content-encoding"] == "gzip"
+        assert gzip.decompress(second.body) == metrics.generate_metrics()
+        assert first.headers["etag"] != (await metrics.render(_request())).headers["etag"]
+
+    def test_response_size_without_status_label(self):
+        """Testa que o tamanho da resposta não é rotulado por status code."""
+        metrics = _metrics()
+
+        metrics.record_api_request("GET", "/health", 200, 0.01, response_size=100)
+        metrics.record_api_request("GET", "/health", 503, 0.01, response_size=300)
+
+        labels = {"method": "GET", "endpoint": "/health"}
+        assert _sample(metrics, "api_response_size_bytes_count", labels) == 2
+        assert _sample(metrics, "api_response_size_bytes_sum", labels) == 400
+
+    def test_record_api_request_resolves_children_once(self):
+        """Testa que requests repetidas não voltam a chamar .labels()."""
+        metrics = _metrics()
+        metrics.record_api_request("GET", "/health", 200, 0.01)
+
+        with patch.object(metrics.api_requests_total, "labels") as labels:
+            metrics.record_api_request("GET", "/health", 200, 0.02, request_size=10)
+
+        labels.assert_not_called()
+        assert _sample(
+            metrics, "api_request_duration_seconds_count",
+            {"method": "GET", "endpoint": "/health"}
+        ) == 2
+
+    @pytest.mark.asyncio
+    async def test_system_metrics_use_published_cpu(self):
+        """Testa que a coleta de sistema não amostra CPU por conta própria."""
+        metrics = _metrics()
+        metrics.set_cpu_percent(42.0)
+
+        with patch("src.core.metrics.prometheus.psutil.cpu_percent") as cpu_percent:
+            await metrics.update_system_metrics()
+
+        cpu_percent.assert_not_called()
+        assert _sample(metrics, "system_cpu_usage_percent", {}) == 42.0
+        assert metrics._sys_snapshot["cpu_percent"] == 42.0
+
+    @pytest.mark.asyncio
+    async def test_disk_usage_matches_psutil(self):
+        """Testa que o percent de disco usa o mesmo denominador do psutil."""
+        metrics = _metrics()
+
+        await metrics.update_system_metrics()
+
+        disk_percent = _sample(metrics, "system_disk_usage_percent", {"mount_point": "/"})
+        assert disk_percent == pytest.approx(psutil.disk_usage("/").percent, abs=0.1)